@@ -1,25 +1,30 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from sqlmodel import Session
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
+from sqlmodel.ext.asyncio.session import AsyncSession
 import os
 import json
-from openai import OpenAI
-import httpx
 import time
+import asyncio
 
 # Feature Flag: Google Gemini (via HTTPX fallback)
 # We do not import google.generativeai to prevent Vercel crashes
 HAS_GEMINI = True 
 
-from backend.database.session import get_session
-from backend.models.task import TaskCreate, TaskUpdate
+from backend.database.session import get_async_session
+from backend.models.task import TaskBatchOperation, TaskBatchResult, TaskCreate, TaskUpdate
 from backend.models.chat_message import ChatMessageCreate, ChatMessageRead
 from backend.services.task_service import TaskService
 from backend.services.chat_service import ChatService
-from backend.repositories.task_repository import TaskRepository
-from backend.repositories.chat_repository import ChatRepository
+from backend.repositories.task_repository import AsyncTaskRepository
+from backend.repositories.chat_repository import AsyncChatRepository
 from backend.core.security import get_current_user_id
+from backend.core.etag import conditional_get
+from backend.core.config import settings
+from backend.core.intent_router import Command, intent_router
+from backend.core.llm_clients import llm_clients
+from backend.core.provider_router import provider_router
+from backend.core.serialization import ServerSentEvent, event_stream, json_response
 
 router = APIRouter()
 
@@ -30,6 +35,7 @@ router = APIRouter()
 PRIMARY_MODEL = "openai/gpt-4o-mini"     # Best for tool calling
 GEMINI_MODEL = "gemini-2.5-flash"        # Stable Google model
 FORCE_USE_BACKUP = os.getenv("FORCE_USE_BACKUP", "False").lower() == "true"
+COMMAND_SOURCE = "Command (no model)"
 
 # --- Models ---
 class Message(BaseModel):
@@ -153,12 +159,12 @@ TOOLS = [
 
 # --- Helper Functions ---
 def get_task_service():
-    return TaskService(TaskRepository())
+    return TaskService(AsyncTaskRepository())
 
 def get_chat_service():
-    return ChatService(ChatRepository())
+    return ChatService(AsyncChatRepository())
 
-def execute_tool(tool_name: str, args: Dict, session: Session, user_id: str, task_service: TaskService):
+async def execute_tool(tool_name: str, args: Dict, session: AsyncSession, user_id: str, task_service: TaskService):
     try:
         print(f"🔧 Executing Tool: {tool_name} with args: {args}")
         if tool_name == "add_task":
@@ -169,11 +175,11 @@ def execute_tool(tool_name: str, args: Dict, session: Session, user_id: str, tas
                 priority=args.get("priority", "medium").lower(), 
                 category=args.get("category", "General")
             )
-            new_task = task_service.create_task(session, task_data, user_id)
+            new_task = await task_service.create_task(session, task_data, user_id)
             return f"✅ Task Added! (ID: {new_task.id}, Title: {new_task.description})"
 
         elif tool_name == "list_tasks":
-            tasks = task_service.get_all_tasks(session, user_id)
+            tasks = await task_service.get_all_tasks(session, user_id)
             status = args.get("status", "all")
             filtered = [t for t in tasks if (status == "all") or (status == "pending" and not t.completed) or (status == "completed" and t.completed)]
             if not filtered: return "📋 No tasks found."
@@ -183,9 +189,9 @@ def execute_tool(tool_name: str, args: Dict, session: Session, user_id: str, tas
             t_id = args.get("task_id")
             name = args.get("task_name")
             if not t_id and name:
-                res = task_service.search_tasks(session, name, user_id)
+                res = await task_service.search_tasks(session, name, user_id, limit=1)
                 if res: t_id = res[0].id
-            if t_id and task_service.complete_task(session, int(t_id), user_id, True):
+            if t_id and await task_service.complete_task(session, int(t_id), user_id, True):
                 return f"✅ Task {t_id} Completed!"
             return "❌ Task not found."
 
@@ -193,24 +199,24 @@ def execute_tool(tool_name: str, args: Dict, session: Session, user_id: str, tas
             t_id = args.get("task_id")
             name = args.get("task_name")
             if not t_id and name:
-                res = task_service.search_tasks(session, name, user_id)
+                res = await task_service.search_tasks(session, name, user_id, limit=1)
                 if res: t_id = res[0].id
-            if t_id and task_service.delete_task(session, int(t_id), user_id):
+            if t_id and await task_service.delete_task(session, int(t_id), user_id):
                 return f"🗑️ Task {t_id} Deleted."
             return "❌ Task not found."
 
         elif tool_name == "search_tasks":
-            results = task_service.search_tasks(session, args.get("query", ""), user_id)
+            results = await task_service.search_tasks(session, args.get("query", ""), user_id)
             if not results: return "🔍 No matches found."
             return "🔍 **Found:**\n" + "\n".join([f"- {t.description} (ID: {t.id})" for t in results])
             
         elif tool_name == "get_task_analytics":
-            stats = task_service.get_task_analytics(session, user_id)
-            return f"📊 Stats: {stats['total_tasks']} Total, {stats['completed_tasks']} Done, {stats['pending_tasks']} Pending."
+            stats = await task_service.get_task_analytics(session, user_id)
+            return f"📊 Stats: {stats['total']} Total, {stats['completed']} Done, {stats['pending']} Pending."
 
         elif tool_name == "clear_completed":
-            count = task_service.clear_completed_tasks(session, user_id)
-            return f"🗑️ Cleared {count} completed tasks."
+            deleted_ids = await task_service.clear_completed_tasks(session, user_id)
+            return f"🗑️ Cleared {len(deleted_ids)} completed tasks."
             
         elif tool_name == "update_task":
              t_id = args.get("task_id")
@@ -219,7 +225,7 @@ def execute_tool(tool_name: str, args: Dict, session: Session, user_id: str, tas
              if args.get("new_title"): update_data["description"] = args["new_title"]
              if args.get("new_priority"): update_data["priority"] = args["new_priority"]
              if args.get("new_category"): update_data["category"] = args["new_category"]
-             if task_service.update_task(session, int(t_id), user_id, TaskUpdate(**update_data)):
+             if await task_service.update_task(session, int(t_id), user_id, TaskUpdate(**update_data)):
                  return f"✅ Task {t_id} Updated."
              return "❌ Update failed."
 
@@ -227,6 +233,131 @@ def execute_tool(tool_name: str, args: Dict, session: Session, user_id: str, tas
     except Exception as e:
         print(f"❌ Tool Execution Error: {e}")
         return f"Error executing {tool_name}: {str(e)}"
+    finally:
+        # The result is a string by now: give the connection back to the pool
+        # (a refresh or read leaves a transaction open) before the follow-up
+        # model call, which can take seconds
+        await _release(session)
+
+
+async def _release(session: AsyncSession) -> None:
+    """
+    End the session's transaction so its connection goes back to the pool.
+
+    Unlike close(), this leaves the caller's objects attached to the session
+    (and loaded: sessions here use expire_on_commit=False). A transaction
+    left failed by a tool error is rolled back instead.
+    """
+    if not session.in_transaction():
+        return
+    try:
+        await session.commit()
+    except Exception:
+        await session.rollback()
+
+# Tools that only read: several in one turn run side by side
+READ_ONLY_TOOLS = {"list_tasks", "search_tasks", "get_task_analytics"}
+# Tools that change one task: several in one turn are applied as one batch
+BATCH_TOOLS = {"add_task", "complete_task", "delete_task", "update_task"}
+
+
+async def execute_tools(calls: List[Tuple[str, Dict]], session: AsyncSession, user_id: str, task_service: TaskService) -> List[str]:
+    """
+    The results of every tool call of a turn, in order. The task changes
+    are applied together through task_service.apply_batch (one transaction),
+    then clear_completed; the read-only tools run last, concurrently, each
+    on a session of its own, so they see the turn's changes. A single call
+    is just execute_tool.
+    """
+    if len(calls) == 1:
+        return [await execute_tool(*calls[0], session, user_id, task_service)]
+    print(f"🔧 Executing {len(calls)} tools: {[name for name, _ in calls]}")
+    results: List[Optional[str]] = [None] * len(calls)
+    try:
+        writes = [i for i, (name, _) in enumerate(calls) if name in BATCH_TOOLS]
+        if writes:
+            replies = await _apply_tools([calls[i] for i in writes], session, user_id, task_service)
+            for i, reply in zip(writes, replies):
+                results[i] = reply
+        for i, (name, args) in enumerate(calls):
+            if name not in BATCH_TOOLS and name not in READ_ONLY_TOOLS:
+                results[i] = await execute_tool(name, args, session, user_id, task_service)
+    finally:
+        await _release(session)
+
+    async def read(name: str, args: Dict) -> str:
+        async with AsyncSession(session.bind, expire_on_commit=False) as own:
+            return await execute_tool(name, args, own, user_id, task_service)
+
+    reads = [i for i, (name, _) in enumerate(calls) if name in READ_ONLY_TOOLS]
+    replies = await asyncio.gather(*(read(*calls[i]) for i in reads))
+    for i, reply in zip(reads, replies):
+        results[i] = reply
+    return results
+
+
+async def _tool_operation(name: str, args: Dict, session: AsyncSession, user_id: str, task_service: TaskService) -> Union[TaskBatchOperation, str]:
+    """The batch operation for a task-changing tool call, or its reply when there is nothing to apply."""
+    if name == "add_task":
+        title = args.get("title")
+        if not title: return "❌ Error: 'title' is required for add_task"
+        task = TaskCreate(description=title, priority=args.get("priority", "medium").lower(), category=args.get("category", "General"))
+        return TaskBatchOperation(op="create", task=task)
+
+    t_id = args.get("task_id")
+    if name in ("complete_task", "delete_task"):
+        if not t_id and args.get("task_name"):
+            res = await task_service.search_tasks(session, args["task_name"], user_id, limit=1)
+            if res: t_id = res[0].id
+        if not t_id: return "❌ Task not found."
+        return TaskBatchOperation(op="complete" if name == "complete_task" else "delete", task_id=int(t_id))
+
+    if not t_id: return "❌ Task ID required."
+    update_data = {}
+    if args.get("new_title"): update_data["description"] = args["new_title"]
+    if args.get("new_priority"): update_data["priority"] = args["new_priority"]
+    if args.get("new_category"): update_data["category"] = args["new_category"]
+    return TaskBatchOperation(op="update", task_id=int(t_id), changes=TaskUpdate(**update_data))
+
+
+def _batch_reply(result: TaskBatchResult) -> str:
+    """execute_tool's reply for one applied batch operation."""
+    if result.status == "not_found":
+        return "❌ Update failed." if result.op == "update" else "❌ Task not found."
+    if result.op == "create":
+        return f"✅ Task Added! (ID: {result.task_id}, Title: {result.task.description})"
+    if result.op == "complete":
+        return f"✅ Task {result.task_id} Completed!"
+    if result.op == "delete":
+        return f"🗑️ Task {result.task_id} Deleted."
+    return f"✅ Task {result.task_id} Updated."
+
+
+async def _apply_tools(calls: List[Tuple[str, Dict]], session: AsyncSession, user_id: str, task_service: TaskService) -> List[str]:
+    """Replies to task-changing tool calls, applied as one batch; a failed batch fails them all."""
+    replies: List[Optional[str]] = []
+    pending: List[Tuple[int, TaskBatchOperation]] = []
+    for name, args in calls:
+        try:
+            op = await _tool_operation(name, args, session, user_id, task_service)
+        except Exception as e:
+            print(f"❌ Tool Execution Error: {e}")
+            op = f"Error executing {name}: {str(e)}"
+        if isinstance(op, str):
+            replies.append(op)
+        else:
+            pending.append((len(replies), op))
+            replies.append(None)
+    if pending:
+        try:
+            batch = await task_service.apply_batch(session, user_id, [op for _, op in pending])
+            for (i, _), result in zip(pending, batch):
+                replies[i] = _batch_reply(result)
+        except Exception as e:
+            print(f"❌ Tool Execution Error: {e}")
+            for i, _ in pending:
+                replies[i] = f"Error executing {calls[i][0]}: {str(e)}"
+    return replies
 
 # --- Mock Classes for Gemini Fallback ---
 class MockToolCall:
@@ -250,18 +381,7 @@ class MockCompletion:
         self.choices = [MockChoice(message)]
 
 # --- Google Gemini Direct HTTP Client ---
-async def call_google_direct(messages, system_instruction):
-    """
-    Async Fallback using httpx to call Google Gemini API directly.
-    """
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key: 
-        print("❌ GOOGLE_API_KEY not found.")
-        raise Exception("GOOGLE_API_KEY missing")
-
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={api_key}"
-    
-    # Message formatting
+def _gemini_payload(messages, system_instruction) -> dict:
     contents = []
     for m in messages:
         role = "user" if m['role'] == "user" else "model"
@@ -270,16 +390,53 @@ async def call_google_direct(messages, system_instruction):
     
     if not contents: contents.append({"role": "user", "parts": [{"text": "Hello"}]})
 
-    payload = {
+    return {
         "contents": contents,
         "systemInstruction": {"parts": [{"text": system_instruction}]},
         "generationConfig": {"temperature": 0.7, "maxOutputTokens": 800}
     }
 
+
+def _gemini_api_key() -> str:
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key: 
+        print("❌ GOOGLE_API_KEY not found.")
+        raise Exception("GOOGLE_API_KEY missing")
+    return api_key
+
+
+def parse_gemini_tools(text: str) -> List[Tuple[str, Any]]:
+    """
+    [(tool name, args)] if Gemini's text is a `{"tool": ..., "args": ...}`
+    JSON tool call or a list of them; empty for any other answer.
+    """
+    clean_text = text.strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text.replace("```json", "").replace("```", "").strip()
+    
+    if clean_text.startswith(("{", "[")) and '"tool":' in clean_text:
+        try:
+            js = json.loads(clean_text)
+            calls = js if isinstance(js, list) else [js]
+            if calls and all(isinstance(c, dict) and "tool" in c and "args" in c for c in calls):
+                return [(c["tool"], c["args"]) for c in calls]
+        except Exception as e:
+            print(f"Failed to parse JSON tool from Gemini: {e}")
+    return []
+
+
+async def call_google_direct(messages, system_instruction):
+    """
+    Async Fallback using httpx to call Google Gemini API directly.
+    """
+    api_key = _gemini_api_key()
+    url = f"/models/{GEMINI_MODEL}:generateContent"
+    payload = _gemini_payload(messages, system_instruction)
+
     try:
         print("🌍 Calling Google Gemini (HTTP)...")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=30.0)
+        async with llm_clients.slot("gemini"):
+            response = await llm_clients.http("gemini").post(url, params={"key": api_key}, json=payload, timeout=settings.llm_call_timeout_seconds)
             
             if response.status_code != 200:
                 print(f"❌ Google API Error: {response.status_code} - {response.text}")
@@ -294,18 +451,10 @@ async def call_google_direct(messages, system_instruction):
             
             # Simple Tool Logic (Mock)
             tool_calls = None
-            clean_text = text.strip()
-            if clean_text.startswith("```json"):
-                clean_text = clean_text.replace("```json", "").replace("```", "").strip()
-            
-            if clean_text.startswith("{") and '"tool":' in clean_text:
-                try:
-                    js = json.loads(clean_text)
-                    if "tool" in js and "args" in js:
-                        tool_calls = [MockToolCall(js["tool"], js["args"])]
-                        text = None # Suppress text if tool call
-                except Exception as e:
-                    print(f"Failed to parse JSON tool from Gemini: {e}")
+            tools = parse_gemini_tools(text)
+            if tools:
+                tool_calls = [MockToolCall(*tool) for tool in tools]
+                text = None # Suppress text if tool call
 
             return MockCompletion(MockMessage(text, tool_calls)), "Google (Direct HTTP)"
 
@@ -313,16 +462,31 @@ async def call_google_direct(messages, system_instruction):
         print(f"❌ Google Fallback Exception: {e}")
         raise e
 
-# --- Main Endpoint ---
 
-@router.post("/", response_model=ChatResponse)
-@router.post("", response_model=ChatResponse, include_in_schema=False)
-async def chat_with_ai(
-    request: ChatRequest,
-    session: Session = Depends(get_session),
-    task_service: TaskService = Depends(get_task_service),
-    user_id: str = Depends(get_current_user_id)
-):
+async def stream_google_direct(messages, system_instruction) -> AsyncIterator[str]:
+    """call_google_direct as streamGenerateContent: yields the text as Gemini produces it."""
+    api_key = _gemini_api_key()
+    url = f"/models/{GEMINI_MODEL}:streamGenerateContent"
+    print("🌍 Streaming Google Gemini (HTTP)...")
+    async with llm_clients.slot("gemini"):
+        async with llm_clients.http("gemini").stream("POST", url, params={"alt": "sse", "key": api_key},
+                                                     json=_gemini_payload(messages, system_instruction), timeout=settings.llm_call_timeout_seconds) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                print(f"❌ Google API Error: {response.status_code} - {body[:500]!r}")
+                raise Exception(f"Google API {response.status_code}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = json.loads(line[5:])
+                for candidate in data.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+
+# --- Main Endpoint ---
+def build_messages(request: ChatRequest, user_id: str) -> Tuple[List[Dict], str]:
+    """The conversation sent to the model (prompt, one-shot example, request messages) and the system prompt."""
     # SIMPLIFIED SYSTEM PROMPT WITH ONE-SHOT EXAMPLE
     system_prompt = f"""You are a JSON-only tool executor for Todo App.
     User ID: {user_id}
@@ -336,6 +500,7 @@ async def chat_with_ai(
     
     FORMAT:
     {{ "tool": "tool_name", "args": {{ "arg_name": "value" }} }}
+    For several actions, a JSON list of these objects.
     """
     
     # One-shot example to guide the model
@@ -352,94 +517,323 @@ async def chat_with_ai(
     if messages[-1]["role"] == "user":
         messages[-1]["content"] += "\n(Output JSON only)"
 
-    # FORCE BACKUP MODE
-    if FORCE_USE_BACKUP:
-        try:
-            res, src = await call_google_direct(messages, system_prompt)
-            msg = res.choices[0].message
-            if msg.tool_calls:
-                tc = msg.tool_calls[0]
-                args = json.loads(tc.function.arguments)
-                result = execute_tool(tc.function.name, args, session, user_id, task_service)
-                # Confirm
-                final_prompt = system_prompt + f"\n\nTool Result: {result}"
-                res_final, _ = await call_google_direct(messages, final_prompt)
-                return ChatResponse(response=res_final.choices[0].message.content or result, source=src)
-            return ChatResponse(response=msg.content, source=src)
-        except Exception as e:
-            return ChatResponse(response=f"Gemini Error: {str(e)}", source="System Error")
+    return messages, system_prompt
 
-    # PRIMARY (OpenRouter)
-    try:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        if not api_key: raise Exception("Missing OPENROUTER_API_KEY")
-        
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-            default_headers={"HTTP-Referer": "https://vercel.app", "X-Title": "TodoApp"}
+
+def route_command(request: ChatRequest) -> Optional[Command]:
+    """The tool call for the user's latest message when core/intent_router.py recognizes it."""
+    if not request.messages or request.messages[-1].role != "user":
+        return None
+    return intent_router.route(request.messages[-1].content)
+
+
+def summarized(tool_name: str) -> bool:
+    """Whether the model phrases this tool's result (a follow-up call) instead of its template."""
+    return tool_name in settings.chat_summarized_tools
+
+
+def _source(provider: str) -> str:
+    if provider == "openrouter":
+        return f"Primary ({PRIMARY_MODEL})"
+    return "Google (Direct HTTP)" if FORCE_USE_BACKUP else "Google (Fallback)"
+
+
+def _tool_args(msg) -> List[Dict]:
+    """The arguments of each of the message's tool calls."""
+    calls = []
+    for tc in msg.tool_calls:
+        args = json.loads(tc.function.arguments)
+        # Ensure args is dict
+        if isinstance(args, str): args = json.loads(args)
+        calls.append(args)
+    return calls
+
+
+async def _openrouter_message(messages, tools: bool = True):
+    print(f"🤖 Calling OpenRouter ({PRIMARY_MODEL})...")
+    options = {"tools": TOOLS, "tool_choice": "auto"} if tools else {}
+    async with llm_clients.slot("openrouter"):
+        completion = await llm_clients.openrouter().chat.completions.create(
+            model=PRIMARY_MODEL,
+            messages=messages,
+            **options
         )
-        
-        print(f"🤖 Calling OpenRouter ({PRIMARY_MODEL})...")
-        completion = client.chat.completions.create(
+    msg = completion.choices[0].message
+    if msg.tool_calls: _tool_args(msg)  # unparsable arguments: let the next provider answer
+    return msg
+
+
+async def _gemini_message(messages, system_instruction):
+    res, _ = await call_google_direct(messages, system_instruction)
+    msg = res.choices[0].message
+    if msg.tool_calls: _tool_args(msg)
+    return msg
+
+
+@router.post("/", response_model=ChatResponse)
+@router.post("", response_model=ChatResponse, include_in_schema=False)
+async def chat_with_ai(
+    request: ChatRequest,
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+):
+    command = route_command(request)
+    if command:
+        result = await execute_tool(*command, session, user_id, task_service)
+        return ChatResponse(response=result, source=COMMAND_SOURCE)
+
+    messages, system_prompt = build_messages(request, user_id)
+    # FORCE BACKUP MODE: Gemini only; otherwise OpenRouter first, Gemini as
+    # fallback (and hedge, see core/provider_router.py)
+    providers = ["gemini"] if FORCE_USE_BACKUP else ["openrouter", "gemini"]
+    calls = {
+        "openrouter": lambda: _openrouter_message(messages),
+        "gemini": lambda: _gemini_message(messages, system_prompt),
+    }
+
+    try:
+        provider, msg = await provider_router.first([(p, calls[p]) for p in providers])
+    except Exception as e:
+        print(f"❌ CRITICAL: No provider answered: {e}")
+        if FORCE_USE_BACKUP:
+            return ChatResponse(response=f"Gemini Error: {str(e)}", source="System Error")
+        return ChatResponse(response=f"⚠️ System Overload. Please try again. (Details: {e})", source="System Error")
+
+    if not msg.tool_calls:
+        return ChatResponse(response=msg.content or "✅ Done", source=_source(provider))
+
+    tool_calls = [(tc.function.name, args) for tc, args in zip(msg.tool_calls, _tool_args(msg))]
+    results = await execute_tools(tool_calls, session, user_id, task_service)
+    result = "\n".join(results)
+    if not any(summarized(name) for name, _ in tool_calls):
+        return ChatResponse(response=result, source=_source(provider))
+
+    # Follow up: the tools have run, so any provider can phrase their
+    # results (all in one call); if none does, the results are the answer
+    assistant = {
+        "role": "assistant",
+        "content": msg.content,
+        "tool_calls": [{"id": tc.id, "type": "function", "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
+                       for tc in msg.tool_calls]
+    }
+    tool_messages = [{"role": "tool", "tool_call_id": tc.id, "content": str(r)} for tc, r in zip(msg.tool_calls, results)]
+    follow_ups = {
+        "openrouter": lambda: _openrouter_message(messages + [assistant] + tool_messages, tools=False),
+        "gemini": lambda: _gemini_message(messages, system_prompt + f"\n\nTool Result: {result}"),
+    }
+    order = [provider] + [p for p in providers if p != provider]
+    try:
+        provider, final = await provider_router.first([(p, follow_ups[p]) for p in order])
+        return ChatResponse(response=final.content or result, source=_source(provider))
+    except Exception as e:
+        print(f"⚠️ Follow-up failed: {e}")
+        return ChatResponse(response=result, source=_source(provider))
+
+# --- Streaming Endpoint ---
+class _StreamState:
+    """What a chat stream has produced so far, for the final `done` event and fallback decisions."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_ms: Optional[int] = None
+        self.text: List[str] = []
+        self.tool_result: Optional[str] = None  # every tool's result, one per line
+        self.tool_results: List[str] = []
+
+    def token(self, text: str) -> ServerSentEvent:
+        if self.first_token_ms is None:
+            self.first_token_ms = round((time.perf_counter() - self.started) * 1000)
+        self.text.append(text)
+        return ("token", {"text": text}, None)
+
+
+async def _run_tools(tools: List[Tuple[str, Any]], state: _StreamState, session, user_id, task_service) -> AsyncIterator[ServerSentEvent]:
+    """A `tool` event per call, execute_tools, then a `tool_result` event per call."""
+    tools = [(name, json.loads(args) if isinstance(args, str) else args) for name, args in tools]
+    for name, args in tools:
+        yield ("tool", {"name": name, "args": args}, None)
+    state.tool_results = await execute_tools(tools, session, user_id, task_service)
+    state.tool_result = "\n".join(state.tool_results)
+    for (name, _), result in zip(tools, state.tool_results):
+        yield ("tool_result", {"name": name, "result": result}, None)
+
+
+async def stream_openrouter(messages, state: _StreamState, session, user_id, task_service) -> AsyncIterator[ServerSentEvent]:
+    """The primary path of chat_with_ai with stream=True: tokens as OpenRouter sends them."""
+    client = llm_clients.openrouter()
+
+    print(f"🤖 Streaming OpenRouter ({PRIMARY_MODEL})...")
+    # Tool calls arrive in fragments: name and arguments are concatenated per index
+    calls: Dict[int, Dict[str, str]] = {}
+    async with llm_clients.slot("openrouter"):
+        stream = await client.chat.completions.create(
             model=PRIMARY_MODEL,
             messages=messages,
             tools=TOOLS,
-            tool_choice="auto"
+            tool_choice="auto",
+            stream=True,
+            timeout=settings.llm_call_timeout_seconds  # between chunks: a stalled stream fails over
         )
-        
-        msg = completion.choices[0].message
-        
-        if msg.tool_calls:
-            tc = msg.tool_calls[0]
-            func = tc.function
-            args = json.loads(func.arguments)
-            result = execute_tool(func.name, args, session, user_id, task_service)
-            
-            # Follow up
-            messages.append(msg)
-            messages.append({"role": "tool", "tool_call_id": tc.id, "content": str(result)})
-            
-            final_res = client.chat.completions.create(
-                model=PRIMARY_MODEL,
-                messages=messages
-            )
-            return ChatResponse(response=final_res.choices[0].message.content, source=f"Primary ({PRIMARY_MODEL})")
-            
-        return ChatResponse(response=msg.content or "✅ Done", source=f"Primary ({PRIMARY_MODEL})")
+        async for chunk in stream:
+            if not chunk.choices: continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                yield state.token(delta.content)
+            for fragment in delta.tool_calls or []:
+                call = calls.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+                if fragment.id: call["id"] = fragment.id
+                if fragment.function:
+                    call["name"] += fragment.function.name or ""
+                    call["arguments"] += fragment.function.arguments or ""
+
+    if not calls:
+        return
+
+    ordered = [calls[index] for index in sorted(calls)]
+    tools = [(call["name"], call["arguments"] or "{}") for call in ordered]
+    async for event in _run_tools(tools, state, session, user_id, task_service):
+        yield event
+    if not any(summarized(call["name"]) for call in ordered):
+        return
+
+    # Follow up: every result in one call
+    messages.append({
+        "role": "assistant",
+        "content": "".join(state.text) or None,
+        "tool_calls": [{"id": call["id"], "type": "function", "function": {"name": call["name"], "arguments": call["arguments"]}}
+                       for call in ordered]
+    })
+    messages.extend({"role": "tool", "tool_call_id": call["id"], "content": str(result)}
+                    for call, result in zip(ordered, state.tool_results))
+    async with llm_clients.slot("openrouter"):
+        final_stream = await client.chat.completions.create(
+            model=PRIMARY_MODEL, messages=messages, stream=True, timeout=settings.llm_call_timeout_seconds
+        )
+        async for chunk in final_stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield state.token(chunk.choices[0].delta.content)
 
-    except Exception as e:
-        print(f"⚠️ Primary Failed: {e}. Switching to Gemini Fallback...")
+
+async def stream_gemini(messages, system_prompt, state: _StreamState, session, user_id, task_service) -> AsyncIterator[ServerSentEvent]:
+    """
+    The Gemini path of chat_with_ai over streamGenerateContent.
+
+    Gemini calls tools by answering with JSON, so output that starts like
+    JSON (or a code fence) is held back until it is complete; anything else
+    is streamed from its first token.
+    """
+    held = ""
+    streaming = False
+    async for text in stream_google_direct(messages, system_prompt):
+        if streaming:
+            yield state.token(text)
+            continue
+        held += text
+        start = held.lstrip()
+        if start and not start.startswith(("{", "[", "`")):
+            streaming = True
+            yield state.token(held)
+
+    if streaming:
+        return
+    tools = parse_gemini_tools(held)
+    if not tools:
+        if held.strip(): yield state.token(held)
+        return
+
+    async for event in _run_tools(tools, state, session, user_id, task_service):
+        yield event
+    if not any(summarized(name) for name, _ in tools):
+        return
+    final_sys = system_prompt + f"\n\nTool Result: {state.tool_result}"
+    async for text in stream_google_direct(messages, final_sys):
+        yield state.token(text)
+
+
+async def chat_events(messages, system_prompt, session, user_id, task_service) -> AsyncIterator[ServerSentEvent]:
+    """
+    The events of one streamed chat turn, with chat_with_ai's fallback:
+    Gemini takes over if OpenRouter fails (or its circuit is open) before
+    anything was sent; streams are not hedged. A
+    failure after a tool ran ends the turn with the tool's result instead
+    of running the tool again.
+    """
+    state = _StreamState()
+    source = response = None
+
+    if not FORCE_USE_BACKUP:
         try:
-            res, src = await call_google_direct(messages, system_prompt)
-            msg = res.choices[0].message
-            if msg.tool_calls:
-                tc = msg.tool_calls[0]
-                args = json.loads(tc.function.arguments)
-                # Ensure args is dict
-                if isinstance(args, str): args = json.loads(args)
-                result = execute_tool(tc.function.name, args, session, user_id, task_service)
-                
-                final_sys = system_prompt + f"\n\nTool Executed: {result}"
-                final_res, _ = await call_google_direct(messages, final_sys)
-                return ChatResponse(response=final_res.choices[0].message.content or result, source="Google (Fallback)")
-                
-            return ChatResponse(response=msg.content, source="Google (Fallback)")
-            
-        except Exception as fallback_error:
-            print(f"❌ CRITICAL: Both Providers Failed. Primary: {e}, Fallback: {fallback_error}")
-            return ChatResponse(response=f"⚠️ System Overload. Please try again. (Details: {fallback_error})", source="System Error")
+            async for event in provider_router.stream(
+                "openrouter", stream_openrouter(list(messages), state, session, user_id, task_service)
+            ):
+                yield event
+            source = f"Primary ({PRIMARY_MODEL})"
+        except Exception as e:
+            print(f"⚠️ Primary stream failed: {e}")
+            if state.tool_result is not None:
+                source, response = f"Primary ({PRIMARY_MODEL})", state.tool_result
+            elif state.text:
+                yield ("error", {"message": f"⚠️ Response interrupted. (Details: {e})"}, None)
+                return
+            else:
+                print("Switching to Gemini Fallback...")
+
+    if source is None:
+        source = "Google (Direct HTTP)" if FORCE_USE_BACKUP else "Google (Fallback)"
+        try:
+            async for event in provider_router.stream(
+                "gemini", stream_gemini(messages, system_prompt, state, session, user_id, task_service)
+            ):
+                yield event
+        except Exception as e:
+            print(f"❌ Gemini stream failed: {e}")
+            if state.tool_result is None:
+                yield ("error", {"message": f"⚠️ System Overload. Please try again. (Details: {e})"}, None)
+                return
+            response = state.tool_result
+
+    response = response or "".join(state.text) or state.tool_result or "✅ Done"
+    yield ("done", {"response": response, "source": source, "first_token_ms": state.first_token_ms}, None)
+
+
+async def command_events(command: Command, session, user_id, task_service) -> AsyncIterator[ServerSentEvent]:
+    """chat_events for a recognized command: the tool's events, its result as the response."""
+    state = _StreamState()
+    async for event in _run_tools([command], state, session, user_id, task_service):
+        yield event
+    yield ("done", {"response": state.tool_result, "source": COMMAND_SOURCE, "first_token_ms": None}, None)
+
+
+@router.post("/stream")
+async def chat_with_ai_stream(
+    request: ChatRequest,
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    chat_with_ai as server-sent events, sent while they are produced:
+    `tool` and `tool_result` around a tool call, `token` for each piece of
+    the model's answer, then `done` with the whole response and its source
+    (or `error`).
+    """
+    command = route_command(request)
+    if command:
+        return event_stream(command_events(command, session, user_id, task_service), retry_ms=None)
+    messages, system_prompt = build_messages(request, user_id)
+    return event_stream(chat_events(messages, system_prompt, session, user_id, task_service), retry_ms=None)
 
 # --- History Endpoints ---
-@router.get("/history", response_model=List[ChatMessageRead])
-def get_chat_history(session: Session = Depends(get_session), chat_service: ChatService = Depends(get_chat_service), user_id: str = Depends(get_current_user_id)):
-    return chat_service.get_user_history(session, user_id, 20)
+@router.get("/history", response_model=List[ChatMessageRead], dependencies=[Depends(conditional_get)])
+async def get_chat_history(response: Response, session: AsyncSession = Depends(get_async_session), chat_service: ChatService = Depends(get_chat_service), user_id: str = Depends(get_current_user_id)):
+    return json_response(await chat_service.get_user_history(session, user_id, 20), response)
 
 @router.delete("/history")
-def clear_chat_history(session: Session = Depends(get_session), chat_service: ChatService = Depends(get_chat_service), user_id: str = Depends(get_current_user_id)):
-    count = chat_service.clear_history(session, user_id)
+async def clear_chat_history(session: AsyncSession = Depends(get_async_session), chat_service: ChatService = Depends(get_chat_service), user_id: str = Depends(get_current_user_id)):
+    count = await chat_service.clear_history(session, user_id)
     return {"message": "Cleared", "count": count}
 
 @router.post("/save-message")
-def save_chat_message(message: ChatMessageCreate, session: Session = Depends(get_session), chat_service: ChatService = Depends(get_chat_service), user_id: str = Depends(get_current_user_id)):
-    return chat_service.save_message(session, message, user_id, message.conversation_id)
+async def save_chat_message(message: ChatMessageCreate, session: AsyncSession = Depends(get_async_session), chat_service: ChatService = Depends(get_chat_service), user_id: str = Depends(get_current_user_id)):
+    return await chat_service.save_message(session, message, user_id, message.conversation_id)
@@ -1,10 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
-from backend.database.session import get_session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.database.session import get_async_session
 from backend.core.security import get_current_user_id
+from backend.core.export import export_response
+from backend.models.chat_message import ChatMessageRead
 from backend.models.conversation import ConversationCreate, ConversationRead
-from backend.repositories.chat_repository import ChatRepository
+from backend.repositories.chat_repository import AsyncChatRepository
 from backend.services.conversation_service import ConversationService
 
 router = APIRouter()
@@ -12,57 +14,75 @@ router = APIRouter()
 
 def get_conversation_service():
     """Dependency to get ConversationService instance."""
-    repository = ChatRepository()
+    repository = AsyncChatRepository()
     return ConversationService(repository)
 
 
 @router.post("", response_model=ConversationRead)
 @router.post("/", response_model=ConversationRead, include_in_schema=False)
-def create_conversation(
+async def create_conversation(
     conversation_data: ConversationCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     conversation_service: ConversationService = Depends(get_conversation_service),
     user_id: str = Depends(get_current_user_id)
 ):
     """Create a new conversation."""
-    return conversation_service.create_conversation(session, user_id, conversation_data.title)
+    return await conversation_service.create_conversation(session, user_id, conversation_data.title)
 
 
 @router.get("", response_model=List[ConversationRead])
 @router.get("/", response_model=List[ConversationRead], include_in_schema=False)
-def list_conversations(
-    session: Session = Depends(get_session),
+async def list_conversations(
+    session: AsyncSession = Depends(get_async_session),
     conversation_service: ConversationService = Depends(get_conversation_service),
     user_id: str = Depends(get_current_user_id)
 ):
     """Get all conversations for the authenticated user."""
-    return conversation_service.get_user_conversations(session, user_id)
+    return await conversation_service.get_user_conversations(session, user_id)
+
+
+@router.get("/{conversation_id}/export")
+async def export_conversation(
+    conversation_id: int,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip-encode the response body"),
+    session: AsyncSession = Depends(get_async_session),
+    conversation_service: ConversationService = Depends(get_conversation_service),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Download a conversation's messages as NDJSON or CSV, streamed from a server-side cursor."""
+    batches = await conversation_service.export_conversation(session, conversation_id, user_id)
+    if batches is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return export_response(
+        batches, list(ChatMessageRead.model_fields), export_format, f"conversation-{conversation_id}", gzip
+    )
 
 
 @router.patch("/{conversation_id}", response_model=ConversationRead)
-def rename_conversation(
+async def rename_conversation(
     conversation_id: int,
     conversation_data: ConversationCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     conversation_service: ConversationService = Depends(get_conversation_service),
     user_id: str = Depends(get_current_user_id)
 ):
     """Rename a conversation."""
-    result = conversation_service.rename_conversation(session, conversation_id, user_id, conversation_data.title)
+    result = await conversation_service.rename_conversation(session, conversation_id, user_id, conversation_data.title)
     if not result:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return result
 
 
 @router.delete("/{conversation_id}")
-def delete_conversation(
+async def delete_conversation(
     conversation_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     conversation_service: ConversationService = Depends(get_conversation_service),
     user_id: str = Depends(get_current_user_id)
 ):
     """Delete a conversation and all its messages."""
-    success = conversation_service.delete_conversation(session, conversation_id, user_id)
+    success = await conversation_service.delete_conversation(session, conversation_id, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"message": f"Conversation {conversation_id} deleted successfully"}
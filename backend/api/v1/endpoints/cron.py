@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Query, Request, HTTPException
 from sqlmodel import Session, select
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import List, Optional
 import requests
 import json
@@ -8,6 +8,9 @@ import json
 from backend.database.session import get_session
 from backend.models.task import Task
 from backend.core.config import settings
+from backend.core.cache import task_cache
+from backend.core.change_hub import task_changes
+from backend.models.types import utc_isoformat, utcnow
 
 router = APIRouter()
 
@@ -24,50 +27,48 @@ def check_reminders(db: Session = Depends(get_session)):
     print("⏰ Cron Job: Checking for reminders...")
     
     # Logic: due_date <= now + 15 mins AND notification_sent = False AND status = pending
-    now = datetime.now()
-    threshold = now + timedelta(minutes=15)
-    
-    # We'll fetch all pending un-notified tasks and filter by date in Python for simplicity with strings
-    # Or strict SQL query if dates are ISO sorted
+    threshold = utcnow() + timedelta(minutes=15)
+
+    # Overdue or due soon; a range scan on the partial ix_tasks_reminder_due index
     statement = select(Task).where(
         Task.completed == False,
         Task.notification_sent == False,
-        Task.due_date != None
+        Task.due_date <= threshold
     )
     tasks = db.exec(statement).all()
     
     reminders_sent = 0
+    # Collected as we go: after the commit the tasks are expired, and reading
+    # task.user_id would cost a SELECT per task
+    reminded_users = set()
     
     for task in tasks:
+        # Publish Event
+        payload = {
+            "type": "reminder",
+            "user_id": task.user_id,
+            "task_id": task.id,
+            "title": f"Reminder: {task.description}",
+            "body": f"This task is due at {utc_isoformat(task.due_date)}!"
+        }
+        
+        publish_url = f"http://localhost:{DAPR_HTTP_PORT}/v1.0/publish/{PUBSUB_NAME}/{NOTIFICATIONS_TOPIC}"
         try:
-            due_at = datetime.fromisoformat(task.due_date)
-            # Check if overdue or due soon
-            if due_at <= threshold:
-                # Publish Event
-                payload = {
-                    "type": "reminder",
-                    "user_id": task.user_id,
-                    "task_id": task.id,
-                    "title": f"Reminder: {task.description}",
-                    "body": f"This task is due at {task.due_date}!"
-                }
-                
-                publish_url = f"http://localhost:{DAPR_HTTP_PORT}/v1.0/publish/{PUBSUB_NAME}/{NOTIFICATIONS_TOPIC}"
-                try:
-                    requests.post(publish_url, json=payload, timeout=2)
-                    
-                    # Mark as sent
-                    task.notification_sent = True
-                    db.add(task)
-                    reminders_sent += 1
-                    print(f"   🔔 Sent reminder for task {task.id}")
-                except Exception as e:
-                    print(f"   ❌ Failed to publish reminder: {e}")
-
-        except ValueError:
-            continue # Skip bad date formats
+            requests.post(publish_url, json=payload, timeout=2)
+            
+            # Mark as sent
+            task.notification_sent = True
+            db.add(task)
+            reminded_users.add(task.user_id)
+            reminders_sent += 1
+            print(f"   🔔 Sent reminder for task {task.id}")
+        except Exception as e:
+            print(f"   ❌ Failed to publish reminder: {e}")
             
     if reminders_sent > 0:
         db.commit()
+        for user_id in reminded_users:
+            task_cache.invalidate(user_id)
+            task_changes.publish(user_id)
     
     return {"status": "ok", "reminders_sent": reminders_sent}
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Request, Depends
-from sqlmodel import Session
-from backend.database.session import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.database.session import get_async_session
 from backend.consumers.recurring_consumer import process_task_event
 from backend.consumers.notification_consumer import process_notification
 
 router = APIRouter()
 
 @router.post("/task-completed")
-async def handle_task_completed(request: Request, db: Session = Depends(get_session)):
+async def handle_task_completed(request: Request, db: AsyncSession = Depends(get_async_session)):
     """
     Dapr Subscriber for 'task-events' topic.
     Content-Type: application/cloudevents+json
@@ -19,7 +19,7 @@ async def handle_task_completed(request: Request, db: Session = Depends(get_sess
         # Let's inspect 'data' field.
         data = body.get("data", body)
         
-        process_task_event(data, db)
+        await process_task_event(data, db)
         return {"status": "ok"}
     except Exception as e:
         print(f"Error handling task event: {e}")
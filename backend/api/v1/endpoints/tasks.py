@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from typing import List, Optional
-from sqlmodel import Session
-from backend.database.session import get_session
-from backend.models.task import Task, TaskCreate, TaskUpdate
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.database.session import get_async_session
+from backend.models.task import (
+    Task, TaskBatchRequest, TaskBatchResult, TaskChanges, TaskCreate, TaskImportResult, TaskUpdate,
+)
+from backend.core.config import settings
+from backend.core.etag import conditional_get
+from backend.core.export import export_response
+from backend.core.change_hub import HubFull
+from backend.core.serialization import event_stream, json_response
 from backend.services.task_service import TaskService
-from backend.repositories.task_repository import TaskRepository
+from backend.repositories.task_repository import AsyncTaskRepository, parse_fields
 
 
 from backend.core.security import get_current_user_id
@@ -13,7 +20,7 @@ router = APIRouter()
 
 
 def get_task_service():
-    repository = TaskRepository()
+    repository = AsyncTaskRepository()
     return TaskService(repository)
 
 
@@ -21,64 +28,240 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 
 # ... imports ...
 
-@router.get("", response_model=List[Task])
-def read_tasks(
+@router.get("", response_model=List[Task], dependencies=[Depends(conditional_get)])
+async def read_tasks(
+    response: Response,
     priority: Optional[str] = Query(None, description="Filter by priority (High, Medium, Low)"),
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="Match tasks with any or all of the tags"),
     search: Optional[str] = Query(None, description="Search term for title/category"),
     sort_by: Optional[str] = Query(None, description="Field to sort by (e.g., priority, created_at)"),
     order: str = Query("asc", description="Sort order (asc or desc)"),
-    session: Session = Depends(get_session),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,description,completed; id is always included"),
+    session: AsyncSession = Depends(get_async_session),
     task_service: TaskService = Depends(get_task_service),
     user_id: str = Depends(get_current_user_id)
-) -> List[Task]:
-    """Get all tasks for the authenticated user."""
-    return task_service.get_all_tasks(
+):
+    """
+    Get tasks for the authenticated user.
+
+    Responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
+    Without `limit` every matching task is returned. With `limit` the result
+    is one page and, if more rows follow, the `X-Next-Cursor` response header
+    carries the cursor to pass back for the next page. `fields` limits each
+    task to the listed columns, which are the only ones selected from the database.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Rows come back as column dicts and are encoded as-is (no response_model
+    # validation); response_model only documents their shape
+    if limit is not None or cursor:
+        try:
+            page, next_cursor = await task_service.get_task_rows_page(
+                session,
+                user_id,
+                limit or 100,
+                cursor=cursor,
+                priority=priority,
+                tags=tags,
+                search=search,
+                sort_by=sort_by,
+                order=order,
+                tag_mode=tag_mode,
+                fields=selected
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return json_response(page, response)
+
+    rows = await task_service.get_task_rows(
         session, 
         user_id, 
         priority=priority, 
         tags=tags, 
         search=search, 
         sort_by=sort_by, 
-        order=order
+        order=order,
+        tag_mode=tag_mode,
+        fields=selected
     )
+    return json_response(rows, response)
 
 
 @router.post("", response_model=Task)
-def create_task(
+async def create_task(
     task: TaskCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     task_service: TaskService = Depends(get_task_service),
     user_id: str = Depends(get_current_user_id)
 ) -> Task:
     """Create a new task for the authenticated user."""
-    return task_service.create_task(session, task, user_id)
+    return await task_service.create_task(session, task, user_id)
+
+
+@router.post("/batch", response_model=List[TaskBatchResult])
+async def batch_tasks(
+    request: TaskBatchRequest,
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+) -> List[TaskBatchResult]:
+    """
+    Apply many create/update/complete/delete operations in one transaction,
+    with the effect of running them in request order.
+
+    Returns one result per operation, in request order.
+    """
+    if len(request.operations) > settings.task_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {settings.task_batch_max_size} operations)"
+        )
+    return await task_service.apply_batch(session, user_id, request.operations)
+
+
+@router.post("/import", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+) -> TaskImportResult:
+    """
+    Bulk-create tasks from an NDJSON or CSV request body (what /export produces).
+
+    The body is parsed as it arrives and written in batches (COPY on
+    Postgres). Rows that fail validation or are rejected by the database are
+    reported by line number and skipped; the rest of the upload is imported.
+    """
+    return await task_service.import_tasks(session, user_id, request.stream(), import_format)
+
+
+@router.get("/export")
+async def export_tasks(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip-encode the response body"),
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Download all of the authenticated user's tasks as NDJSON or CSV.
+
+    Rows are streamed from a server-side cursor as they are read, so memory
+    use does not depend on how many tasks the user has.
+    """
+    return export_response(
+        task_service.export_tasks(session, user_id), list(Task.model_fields), export_format, "tasks", gzip
+    )
+
+
+@router.get("/changes", response_model=TaskChanges)
+async def read_task_changes(
+    since: int = Query(0, ge=0, description="cursor from the previous call; 0 for every task"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,description,completed; id is always included"),
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Delta sync: the tasks created or updated and the ids of tasks deleted
+    after `since`, plus the cursor to pass as `since` next time.
+
+    Apply `deleted` before `changes`. A client that is already up to date
+    gets empty lists back for one primary-key lookup. When `reset` is true
+    the server did not recognise `since` and `changes` is the complete list.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(await task_service.get_changes(session, user_id, since, selected))
+
+
+@router.get("/stream")
+async def stream_task_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="cursor to start after; the Last-Event-ID header takes precedence"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,description,completed; id is always included"),
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Server-sent events for the user's tasks.
+
+    Each `changes` event carries a GET /changes body with its cursor as the
+    event id: one right away, then one whenever the tasks change, including
+    changes made by the chatbot, the recurring task consumer, reminders and
+    other devices. A reconnecting client resumes from Last-Event-ID without
+    missing anything. Writes made while the client is slow to read are
+    merged into its next event. A keep-alive comment is sent every
+    task_stream_heartbeat_seconds.
+    """
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id:
+        if not last_event_id.isdigit():
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be a cursor from this stream")
+        since = int(last_event_id)
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        deltas = task_service.watch_changes(session, user_id, since, selected)
+    except HubFull:
+        raise HTTPException(status_code=503, detail="Too many open streams", headers={"Retry-After": "30"})
+    return event_stream(("changes", delta, delta["cursor"]) if delta else None async for delta in deltas)
+
+
+@router.get("/stats")
+async def read_task_stats(
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+) -> dict:
+    """Get task counts by completion and priority for the authenticated user."""
+    return await task_service.get_task_analytics(session, user_id)
 
 
 @router.get("/{task_id}", response_model=Task)
-def read_task(
+async def read_task(
     task_id: int,
-    session: Session = Depends(get_session),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,description,completed; id is always included"),
+    session: AsyncSession = Depends(get_async_session),
     task_service: TaskService = Depends(get_task_service),
     user_id: str = Depends(get_current_user_id)
-) -> Task:
-    """Get a specific task (only if it belongs to the user)."""
-    task = task_service.get_task(session, task_id, user_id)
+):
+    """Get a specific task (only if it belongs to the user), optionally only the `fields` columns."""
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    task = await task_service.get_task_row(session, task_id, user_id, selected)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return json_response(task)
 
 
 @router.put("/{task_id}", response_model=Task)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     task_service: TaskService = Depends(get_task_service),
     user_id: str = Depends(get_current_user_id)
 ) -> Task:
     """Update a task (only if it belongs to the user)."""
-    updated_task = task_service.update_task(session, task_id, user_id, task_update)
+    updated_task = await task_service.update_task(session, task_id, user_id, task_update)
     if not updated_task:
         raise HTTPException(status_code=404, detail="Task not found")
     return updated_task
@@ -90,29 +273,40 @@ class CompleteRequest(BaseModel):
     completed: bool
 
 @router.patch("/{task_id}/complete", response_model=Task)
-def complete_task(
+async def complete_task(
     task_id: int,
     request: CompleteRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     task_service: TaskService = Depends(get_task_service),
     user_id: str = Depends(get_current_user_id)
 ) -> Task:
     """Toggle task completion (only if it belongs to the user)."""
-    task = task_service.complete_task(session, task_id, user_id, request.completed)
+    task = await task_service.complete_task(session, task_id, user_id, request.completed)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
+@router.delete("/completed")
+async def clear_completed_tasks(
+    session: AsyncSession = Depends(get_async_session),
+    task_service: TaskService = Depends(get_task_service),
+    user_id: str = Depends(get_current_user_id)
+) -> dict:
+    """Delete all completed tasks of the authenticated user."""
+    deleted_ids = await task_service.clear_completed_tasks(session, user_id)
+    return {"message": f"Cleared {len(deleted_ids)} completed tasks", "count": len(deleted_ids), "ids": deleted_ids}
+
+
 @router.delete("/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     task_service: TaskService = Depends(get_task_service),
     user_id: str = Depends(get_current_user_id)
 ) -> dict:
     """Delete a task (only if it belongs to the user)."""
-    deleted = task_service.delete_task(session, task_id, user_id)
+    deleted = await task_service.delete_task(session, task_id, user_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Task not found")
     return {"message": "Task deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Benchmark task analytics: the old load-everything path vs the GROUP BY
+aggregate vs the trigger-maintained task_stats counters.
+
+Usage:
+    python backend/benchmark_analytics.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_analytics.py
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.database.migrations import migrate
+from backend.models.task import Task
+from backend.repositories.task_repository import TaskRepository
+
+SIZES = [10_000, 100_000]
+REPEATS = 5
+USER_ID = "bench_user"
+
+
+def legacy_analytics(session: Session, user_id: str) -> dict:
+    """The previous implementation: load every task, then count in Python."""
+    tasks = list(session.exec(select(Task).where(Task.user_id == user_id)).all())
+    total = len(tasks)
+    completed = sum(1 for t in tasks if t.completed)
+    high = sum(1 for t in tasks if str(t.priority).lower() == 'high')
+    medium = sum(1 for t in tasks if str(t.priority).lower() == 'medium')
+    low = sum(1 for t in tasks if str(t.priority).lower() == 'low')
+    return {"total": total, "completed": completed, "high": high, "medium": medium, "low": low}
+
+
+def timed(fn) -> float:
+    """Best-of-N wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(url: str) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    repo = TaskRepository()
+
+    loaded = 0
+    print(f"{'tasks':>8} | {'legacy (ms)':>12} | {'group by (ms)':>13} | {'counters (ms)':>13}")
+    for size in SIZES:
+        with Session(engine) as session:
+            rows = [
+                {
+                    "description": f"Task {i}",
+                    "completed": random.random() < 0.4,
+                    "priority": random.choice(["High", "Medium", "Low"]),
+                    "tags": [],
+                    "user_id": USER_ID,
+                }
+                for i in range(loaded, size)
+            ]
+            for start in range(0, len(rows), 5000):
+                session.execute(insert(Task), rows[start:start + 5000])
+            session.commit()
+            loaded = size
+
+            legacy = timed(lambda: legacy_analytics(session, USER_ID))
+            grouped = timed(lambda: repo.count_tasks(session, USER_ID))
+            # expunge so every counter read is a real round trip, not an identity-map hit
+            counters = timed(lambda: (repo.get_task_stats(session, USER_ID), session.expunge_all()))
+            print(f"{size:>8} | {legacy:>12.2f} | {grouped:>13.2f} | {counters:>13.2f}")
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        run(database_url)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
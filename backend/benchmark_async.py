@@ -0,0 +1,121 @@
+"""
+Benchmark request throughput under concurrency: sync Session endpoints vs
+AsyncSession endpoints.
+
+Each simulated request is one chat turn: a wait for an external service (the
+model provider), then a tool call that creates a task and reads the user's
+task counters. FastAPI runs a `def` endpoint on its thread pool (40 threads
+by default), so the sync variant goes through the same anyio limiter and
+tops out at 40 requests per external-call latency; the async variant awaits
+on the event loop and is bounded by CPU and the connection pool instead.
+
+Usage:
+    python backend/benchmark_async.py                   # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_async.py
+    BENCH_IO_MS=2000 python backend/benchmark_async.py  # slower external call (default 500)
+
+The threads column is the peak number of threads in the process, so it
+includes aiosqlite's one thread per connection on SQLite. The target
+database's tables are dropped and recreated.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anyio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.core.cache import NullCache
+from backend.database.migrations import migrate
+from backend.database.session import async_database_url
+from backend.models.task import TaskCreate
+from backend.repositories.task_repository import AsyncTaskRepository, TaskRepository
+
+CONCURRENCY = [10, 100, 400]
+REQUESTS = 800
+THREADPOOL_SIZE = 40  # anyio's default limiter, used by FastAPI for def endpoints
+IO_SECONDS = float(os.getenv("BENCH_IO_MS", "500")) / 1000
+POOL = dict(pool_size=10, max_overflow=20, pool_timeout=120)
+
+
+def sync_request(engine, repo: TaskRepository, user_id: str) -> None:
+    time.sleep(IO_SECONDS)
+    with Session(engine) as session:
+        repo.create_task(session, TaskCreate(description="bench"), user_id)
+        repo.get_task_stats(session, user_id)
+
+
+async def async_request(engine, repo: AsyncTaskRepository, user_id: str) -> None:
+    await asyncio.sleep(IO_SECONDS)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await repo.create_task(session, TaskCreate(description="bench"), user_id)
+        await repo.get_task_stats(session, user_id)
+
+
+async def drive(concurrency: int, handle) -> tuple:
+    """Run REQUESTS calls of `handle` from `concurrency` clients; returns (req/s, p95 ms)."""
+    latencies = []
+    remaining = iter(range(REQUESTS))
+
+    async def client(n: int) -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            await handle(f"bench_user_{n % 50}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p95 = statistics.quantiles(latencies, n=20)[18] * 1000
+    return REQUESTS / elapsed, p95
+
+
+async def run(url: str) -> None:
+    engine = create_engine(url, **({} if url.startswith("sqlite") else POOL))
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    async_engine = create_async_engine(async_database_url(url), **({} if url.startswith("sqlite") else POOL))
+
+    sync_repo = TaskRepository(NullCache())
+    async_repo = AsyncTaskRepository(NullCache())
+    limiter = anyio.CapacityLimiter(THREADPOOL_SIZE)
+    peak_threads = 0
+
+    async def sync_handle(user_id: str) -> None:
+        nonlocal peak_threads
+        peak_threads = max(peak_threads, threading.active_count())
+        await anyio.to_thread.run_sync(sync_request, engine, sync_repo, user_id, limiter=limiter)
+
+    async def async_handle(user_id: str) -> None:
+        nonlocal peak_threads
+        peak_threads = max(peak_threads, threading.active_count())
+        await async_request(async_engine, async_repo, user_id)
+
+    print(f"external call {IO_SECONDS * 1000:.0f} ms, {REQUESTS} requests per run")
+    print(f"{'variant':<8} | {'clients':>7} | {'req/s':>8} | {'p95 ms':>8} | {'threads':>7}")
+    # async first: the sync runs leave idle worker threads behind
+    for label, handle in (("async", async_handle), ("sync", sync_handle)):
+        for concurrency in CONCURRENCY:
+            peak_threads = 0
+            throughput, p95 = await drive(concurrency, handle)
+            print(f"{label:<8} | {concurrency:>7} | {throughput:>8.0f} | {p95:>8.1f} | {peak_threads:>7}")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
@@ -0,0 +1,77 @@
+"""
+Benchmark POST /api/tasks/batch against the loop of single-task requests the
+frontend and chat tools make today (create, complete, delete N tasks).
+
+Usage:
+    python backend/benchmark_batch.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_batch.py
+
+Requests go through the real FastAPI app in-process (fastapi.testclient), so
+the numbers include routing, validation, serialization and every commit.
+The target database's tables are dropped and recreated.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = [10, 100, 500]
+
+
+def run() -> None:
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from sqlmodel import SQLModel
+    from backend.core.security import ALGORITHM, SECRET_KEY
+    from backend.database.migrations import migrate
+    from backend.database.session import engine
+    from backend.index import app
+
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+
+    client = TestClient(app)
+    client.headers["Authorization"] = "Bearer " + jwt.encode({"sub": "bench_user"}, SECRET_KEY, algorithm=ALGORITHM)
+
+    def single_calls(n: int) -> None:
+        ids = [client.post("/api/tasks", json={"description": f"Task {i}"}).json()["id"] for i in range(n)]
+        for task_id in ids:
+            client.patch(f"/api/tasks/{task_id}/complete", json={"completed": True})
+        for task_id in ids:
+            client.delete(f"/api/tasks/{task_id}")
+
+    def batched(n: int) -> None:
+        created = client.post("/api/tasks/batch", json={"operations": [
+            {"op": "create", "task": {"description": f"Task {i}"}} for i in range(n)
+        ]}).json()
+        ids = [result["task_id"] for result in created]
+        client.post("/api/tasks/batch", json={"operations": [
+            {"op": "complete", "task_id": task_id} for task_id in ids
+        ]})
+        client.post("/api/tasks/batch", json={"operations": [
+            {"op": "delete", "task_id": task_id} for task_id in ids
+        ]})
+
+    print(f"{'tasks':>6} | {'single calls (ms)':>17} | {'batch (ms)':>10} | {'speedup':>7}")
+    for n in SIZES:
+        start = time.perf_counter()
+        single_calls(n)
+        single = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        batched(n)
+        batch = (time.perf_counter() - start) * 1000
+        print(f"{n:>6} | {single:>17.1f} | {batch:>10.1f} | {single / batch:>6.1f}x")
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+        run()
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            run()
@@ -0,0 +1,187 @@
+"""
+Chat latency and model calls with and without the command parser
+(core/intent_router.py), over a recorded set of chat messages.
+
+UTTERANCES is a day of one user's chat, in order: mostly short commands
+(add, complete, list, delete, search), some free-form questions. It is
+sent one message at a time to POST /api/chat, on a fresh database, with
+the parser off (every message goes to the model) and on.
+
+The fake OpenRouter answers each call after MODEL_SECONDS: with the tool
+call the message asks for (as a model that always gets it right would),
+a plain answer for free-form messages, and a confirmation after a tool
+result. Reported: per-message latency, model calls made, and the parser's
+hit rate from /api/health.
+
+Usage:
+    python backend/benchmark_chat_commands.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_chat_commands.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from jose import jwt
+from sqlmodel import SQLModel, create_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend.core.intent_router import parse
+from backend.core.security import ALGORITHM, SECRET_KEY
+from backend.database.migrations import migrate
+
+MODEL_SECONDS = 0.8
+PROVIDER_PORT = 8797
+API_PORT = 8798
+HOST = "127.0.0.1"
+
+UTTERANCES = [
+    "add task buy milk",
+    "Add a task to call the dentist",
+    "add a new task called Pay rent, with high priority",
+    "/add book flights !high #Travel",
+    "create task: renew passport",
+    "list pending",
+    "What should I focus on first today?",
+    "complete 1",
+    "show my tasks",
+    "remind me to water the plants",
+    "mark 2 as done",
+    "delete groceries",
+    "search rent",
+    "How do I split a big task into smaller ones?",
+    "/done 4",
+    "stats",
+    "add task email the landlord about the heating",
+    "rename task 6 to Water the balcony plants",
+    "list completed",
+    "set 3 to low",
+    "Can you add task pick up dry cleaning?",
+    "Is it better to batch errands or do them as they come up?",
+    "finish book flights",
+    "find tasks about passport",
+    "delete it",
+    "remove task 7",
+    "my tasks",
+    "Summarize what I got done this week",
+    "add task prepare slides for Monday (high)",
+    "clear completed",
+    "/list",
+    "complete renew passport",
+    "Thanks, that's all for now!",
+    "add task buy birthday present for Sam",
+    "what are my pending tasks",
+    "delete all my tasks",
+    "/search slides",
+    "show my stats",
+    "Plan my week around the Monday presentation",
+    "list",
+]
+
+model_calls = 0
+
+
+async def completions(request):
+    global model_calls
+    model_calls += 1
+    body = await request.json()
+    await asyncio.sleep(MODEL_SECONDS)
+    message = {"role": "assistant", "content": "Sure, here is what I suggest."}
+    if any(m["role"] == "tool" for m in body["messages"]):
+        message["content"] = "Done! " + body["messages"][-1]["content"]
+    else:
+        command = parse(body["messages"][-1]["content"].replace("\n(Output JSON only)", ""))
+        if command is None and body["messages"][-1]["content"].startswith("delete"):
+            command = ("list_tasks", {"status": "all"})  # asks which one: shows the list
+        if command:
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "call_1", "type": "function",
+                 "function": {"name": command[0], "arguments": json.dumps(command[1])}}]}
+    return JSONResponse({"id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "message": message, "finish_reason": "stop"}]})
+
+
+provider = Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(url: str) -> None:
+    global model_calls
+    server = uvicorn.Server(uvicorn.Config(provider, host=HOST, port=PROVIDER_PORT, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    token = jwt.encode({"sub": "bench_commands"}, SECRET_KEY, algorithm=ALGORITHM)
+    print(f"{len(UTTERANCES)} recorded messages, {MODEL_SECONDS}s per model call")
+    print(f"{'config':<16} | {'p50 ms':>7} | {'p95 ms':>7} | {'total s':>7} | {'model calls':>11} | {'hit rate':>8}")
+    try:
+        for config, enabled in (("model only", "false"), ("command parser", "true")):
+            engine = create_engine(url)
+            SQLModel.metadata.drop_all(engine)
+            migrate(engine)
+            engine.dispose()
+            env = dict(
+                os.environ,
+                DATABASE_URL=url,
+                OPENROUTER_API_KEY="bench",
+                GOOGLE_API_KEY="bench",
+                OPENROUTER_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1",
+                LLM_HEDGE_ENABLED="false",
+                CHAT_INTENT_ROUTER=enabled,
+                PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            )
+            api_server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "backend.index:app", "--host", HOST, "--port", str(API_PORT),
+                 "--log-level", "warning"],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+            try:
+                async with httpx.AsyncClient(base_url=f"http://{HOST}:{API_PORT}", headers=headers, timeout=60) as api:
+                    for _ in range(100):
+                        try:
+                            await api.get("/api/health")
+                            break
+                        except httpx.TransportError:
+                            await asyncio.sleep(0.2)
+                    model_calls, latencies = 0, []
+                    start = time.perf_counter()
+                    for text in UTTERANCES:
+                        sent = time.perf_counter()
+                        response = await api.post("/api/chat", json={"messages": [{"role": "user", "content": text}]})
+                        response.raise_for_status()
+                        latencies.append((time.perf_counter() - sent) * 1000)
+                    total = time.perf_counter() - start
+                    commands = (await api.get("/api/health")).json()["chat_commands"]
+            finally:
+                api_server.terminate()
+                api_server.wait()
+            hit_rate = f"{commands['hit_rate']:.0%}" if commands["hit_rate"] is not None else "-"
+            print(f"{config:<16} | {statistics.median(latencies):>7.0f} | {percentile(latencies, 0.95):>7.0f} | "
+                  f"{total:>7.1f} | {model_calls:>11} | {hit_rate:>8}")
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
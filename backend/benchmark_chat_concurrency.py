@@ -0,0 +1,159 @@
+"""
+Concurrency check for POST /api/chat: CHATS chats sent at once to one
+worker, against the slow fake provider of benchmark_chat_stream.py (each
+model call takes FIRST_TOKEN_SECONDS + ANSWER_TOKENS * TOKEN_SECONDS).
+
+When the pipeline is asynchronous the chats overlap and the burst takes
+about as long as the slowest single chat; a blocking provider call would
+hold the event loop and make them run one after another. GET /api/health
+is polled during the burst to show whether the worker stays responsive.
+Exits non-zero when the chats serialized. Chats are sent over raw
+sockets: httpx's connection pool costs more CPU at this concurrency than
+the server does.
+
+Half of the chats ask for a task (tool call + follow-up, two model calls),
+half for a plain answer. Both provider paths are checked: OpenRouter, and
+Gemini with FORCE_USE_BACKUP. The per-provider concurrency limit is raised
+to CHATS so the check measures the event loop, not the limit.
+
+Usage:
+    python backend/benchmark_chat_concurrency.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_chat_concurrency.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import psutil
+import uvicorn
+from jose import jwt
+from sqlmodel import SQLModel, create_engine
+
+from backend.benchmark_chat_stream import (
+    ANSWER_TOKENS, API_PORT, FIRST_TOKEN_SECONDS, HOST, PROVIDER_PORT, TOKEN_SECONDS, provider,
+)
+from backend.core.security import ALGORITHM, SECRET_KEY
+from backend.database.migrations import migrate
+
+CHATS = int(os.getenv("BENCH_CHATS", "100"))
+CALL_SECONDS = FIRST_TOKEN_SECONDS + ANSWER_TOKENS * TOKEN_SECONDS
+# Overlapping chats finish within a few calls' time; serialized ones take CHATS times as long
+LIMIT_SECONDS = 4 * 2 * CALL_SECONDS
+
+
+def chat_request(i: int) -> bytes:
+    prompt = "Add a task to buy milk" if i % 2 else "How should I plan my week?"
+    body = json.dumps({"messages": [{"role": "user", "content": prompt}]}).encode()
+    token = jwt.encode({"sub": f"bench_chat_{i}"}, SECRET_KEY, algorithm=ALGORITHM)
+    return (
+        f"POST /api/chat HTTP/1.1\r\nHost: {HOST}\r\nAuthorization: Bearer {token}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    ).encode() + body
+
+
+async def burst(api: httpx.AsyncClient) -> tuple:
+    """(seconds for all chats, each chat's seconds, health probe latencies)"""
+    durations, probes = [], []
+    finished = asyncio.Event()
+    requests = [chat_request(i) for i in range(CHATS)]
+
+    async def chat(request: bytes) -> None:
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(HOST, API_PORT)
+        writer.write(request)
+        response = await reader.read()  # Connection: close
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200") or json.loads(body)["source"] == "System Error":
+            raise RuntimeError(response.decode(errors="replace"))
+        durations.append(time.perf_counter() - start)
+
+    async def probe() -> None:
+        while not finished.is_set():
+            start = time.perf_counter()
+            await api.get("/api/health")
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.1)
+
+    probing = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(chat(request) for request in requests))
+    elapsed = time.perf_counter() - start
+    finished.set()
+    await probing
+    return elapsed, durations, probes
+
+
+async def run(url: str) -> bool:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    engine.dispose()
+
+    server = uvicorn.Server(uvicorn.Config(provider, host=HOST, port=PROVIDER_PORT, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    print(f"{CHATS} concurrent chats, {CALL_SECONDS:.1f}s per model call, {url.split(':')[0]}")
+    print(f"{'path':<11} | {'burst s':>7} | {'serial s':>8} | {'slowest chat s':>14} | {'health max ms':>13} | {'server CPU s':>12}")
+    ok = True
+    try:
+        for path, force_backup in (("openrouter", "False"), ("gemini", "True")):
+            env = dict(
+                os.environ,
+                DATABASE_URL=url,
+                OPENROUTER_API_KEY="bench",
+                GOOGLE_API_KEY="bench",
+                OPENROUTER_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1",
+                GEMINI_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1beta",
+                OPENROUTER_MAX_CONCURRENCY=str(CHATS),
+                GEMINI_MAX_CONCURRENCY=str(CHATS),
+                FORCE_USE_BACKUP=force_backup,
+                PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            )
+            api_server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "backend.index:app", "--host", HOST, "--port", str(API_PORT),
+                 "--log-level", "warning"],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                async with httpx.AsyncClient(base_url=f"http://{HOST}:{API_PORT}", timeout=600) as api:
+                    for _ in range(100):
+                        try:
+                            await api.get("/api/health")
+                            break
+                        except httpx.TransportError:
+                            await asyncio.sleep(0.2)
+                    process = psutil.Process(api_server.pid)
+                    cpu = sum(process.cpu_times()[:2])
+                    elapsed, durations, probes = await burst(api)
+                    cpu = sum(process.cpu_times()[:2]) - cpu
+            finally:
+                api_server.terminate()
+                api_server.wait()
+            serial = CHATS * 1.5 * CALL_SECONDS  # half the chats make two calls
+            print(f"{path:<11} | {elapsed:>7.2f} | {serial:>8.0f} | {max(durations):>14.2f} | {max(probes) * 1000:>13.0f} | {cpu:>12.2f}")
+            if elapsed > LIMIT_SECONDS:
+                print(f"{path}: chats serialized ({elapsed:.1f}s > {LIMIT_SECONDS:.1f}s)")
+                ok = False
+    finally:
+        server.should_exit = True
+        await serving
+    return ok
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        passed = asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            passed = asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,183 @@
+"""
+Chat latency through a primary provider incident: sequential fallback vs
+circuit breakers vs breakers + hedging (core/provider_router.py).
+
+Starts the API under uvicorn against a local fake of both providers and
+sends chats (plain answers, one model call each, CONCURRENCY at a time)
+through four phases:
+
+- healthy: OpenRouter answers in PRIMARY_SECONDS, with TAIL_SHARE of its
+  answers taking TAIL_SECONDS (the tail hedging is for)
+- slow: OpenRouter answers after SLOW_SECONDS (a brownout)
+- down: OpenRouter returns 503
+- recovered: OpenRouter answering in PRIMARY_SECONDS again (no tail, so
+  the half-open probe is not a slow one), after the circuit's open period
+
+Gemini always answers in GEMINI_SECONDS. Each phase reports latency
+percentiles and the share of chats OpenRouter answered.
+
+Usage:
+    python backend/benchmark_chat_failover.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_chat_failover.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from jose import jwt
+from sqlmodel import SQLModel, create_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend.core.security import ALGORITHM, SECRET_KEY
+from backend.database.migrations import migrate
+
+PRIMARY_SECONDS = 0.3
+TAIL_SHARE = 0.05
+TAIL_SECONDS = 4.0
+SLOW_SECONDS = 12.0
+GEMINI_SECONDS = 0.5
+OPEN_SECONDS = 5
+CHATS = {"healthy": 100, "slow": 20, "down": 20, "recovered": 40}
+CONCURRENCY = 10
+PROVIDER_PORT = 8795
+API_PORT = 8796
+HOST = "127.0.0.1"
+
+CONFIGS = {
+    # What chat.py did before: try OpenRouter until it fails, then Gemini
+    "sequential fallback": {"LLM_HEDGE_ENABLED": "false", "LLM_BREAKER_MIN_CALLS": "1000000",
+                            "LLM_CALL_TIMEOUT_SECONDS": "600"},
+    "circuit breakers": {"LLM_HEDGE_ENABLED": "false"},
+    "breakers + hedging": {},
+}
+
+primary_mode = "healthy"
+randomness = random.Random(42)
+
+
+async def completions(request):
+    body = await request.json()
+    if primary_mode == "down":
+        return JSONResponse({"error": {"message": "unavailable"}}, status_code=503)
+    if primary_mode == "slow":
+        await asyncio.sleep(SLOW_SECONDS)
+    elif primary_mode == "healthy":
+        await asyncio.sleep(TAIL_SECONDS if randomness.random() < TAIL_SHARE else PRIMARY_SECONDS)
+    else:
+        await asyncio.sleep(PRIMARY_SECONDS)
+    return JSONResponse({"id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "finish_reason": "stop",
+                                      "message": {"role": "assistant", "content": "From OpenRouter."}}]})
+
+
+async def generate(request):
+    await asyncio.sleep(GEMINI_SECONDS)
+    return JSONResponse({"candidates": [{"content": {"role": "model", "parts": [{"text": "From Gemini."}]}}]})
+
+
+provider = Starlette(routes=[
+    Route("/v1/chat/completions", completions, methods=["POST"]),
+    Route("/v1beta/models/{model}:generateContent", generate, methods=["POST"]),
+])
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def phase(api: httpx.AsyncClient, count: int) -> tuple:
+    """(latencies, share answered by OpenRouter)"""
+    gate = asyncio.Semaphore(CONCURRENCY)
+    latencies, primary = [], 0
+
+    async def chat() -> None:
+        nonlocal primary
+        async with gate:
+            start = time.perf_counter()
+            response = await api.post("/api/chat", json={"messages": [{"role": "user", "content": "Plan my week"}]})
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+            primary += response.json()["source"].startswith("Primary")
+
+    await asyncio.gather(*(chat() for _ in range(count)))
+    return latencies, primary / count
+
+
+async def run(url: str) -> None:
+    global primary_mode
+    server = uvicorn.Server(uvicorn.Config(provider, host=HOST, port=PROVIDER_PORT, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    token = jwt.encode({"sub": "bench_failover"}, SECRET_KEY, algorithm=ALGORITHM)
+    print(f"OpenRouter {PRIMARY_SECONDS}s ({TAIL_SHARE:.0%} at {TAIL_SECONDS}s), brownout {SLOW_SECONDS}s; "
+          f"Gemini {GEMINI_SECONDS}s; {CONCURRENCY} chats at a time")
+    print(f"{'config':<20} | {'phase':<9} | {'chats':>5} | {'p50 s':>6} | {'p95 s':>6} | {'max s':>6} | {'primary':>7}")
+    try:
+        for config, overrides in CONFIGS.items():
+            randomness.seed(42)  # the same slow answers in every config
+            engine = create_engine(url)
+            SQLModel.metadata.drop_all(engine)
+            migrate(engine)
+            engine.dispose()
+            env = dict(
+                os.environ,
+                DATABASE_URL=url,
+                OPENROUTER_API_KEY="bench",
+                GOOGLE_API_KEY="bench",
+                OPENROUTER_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1",
+                GEMINI_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1beta",
+                LLM_BREAKER_OPEN_SECONDS=str(OPEN_SECONDS),
+                PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                **overrides,
+            )
+            api_server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "backend.index:app", "--host", HOST, "--port", str(API_PORT),
+                 "--log-level", "warning"],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+            try:
+                async with httpx.AsyncClient(base_url=f"http://{HOST}:{API_PORT}", headers=headers, timeout=600) as api:
+                    for _ in range(100):
+                        try:
+                            await api.get("/api/health")
+                            break
+                        except httpx.TransportError:
+                            await asyncio.sleep(0.2)
+                    for name, count in CHATS.items():
+                        primary_mode = name
+                        if name == "recovered":
+                            await asyncio.sleep(OPEN_SECONDS + 1)
+                        latencies, share = await phase(api, count)
+                        print(f"{config:<20} | {name:<9} | {count:>5} | {statistics.median(latencies):>6.2f} | "
+                              f"{percentile(latencies, 0.95):>6.2f} | {max(latencies):>6.2f} | {share:>7.0%}")
+                    providers = (await api.get("/api/health")).json()["llm_providers"]
+                    print(f"{'':<20} | {providers}")
+            finally:
+                api_server.terminate()
+                api_server.wait()
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
@@ -0,0 +1,211 @@
+"""
+Time to first token: POST /api/chat (one JSON response) vs POST
+/api/chat/stream (server-sent events).
+
+Starts the API under uvicorn on a fresh database, pointed at a local fake
+of both providers (an OpenAI-compatible /chat/completions for the OpenRouter
+path, generateContent / streamGenerateContent for Gemini) that answers
+after FIRST_TOKEN_SECONDS and then produces a token every TOKEN_SECONDS,
+like a hosted model. Each provider path is measured for a plain answer and
+for a tool call (add_task) followed by the model's confirmation.
+
+For the JSON endpoint the first token arrives with the whole response; for
+the stream it is the first `token` event.
+
+Usage:
+    python backend/benchmark_chat_stream.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_chat_stream.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from jose import jwt
+from sqlmodel import SQLModel, create_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from backend.core.security import ALGORITHM, SECRET_KEY
+from backend.database.migrations import migrate
+
+FIRST_TOKEN_SECONDS = 0.4
+TOKEN_SECONDS = 0.02
+ANSWER_TOKENS = 60
+REPEATS = 5
+PROVIDER_PORT = 8791
+API_PORT = 8792
+HOST = "127.0.0.1"
+
+ANSWER = [f"word{i} " for i in range(ANSWER_TOKENS)]
+TOOL_ARGS = '{"title": "Buy milk", "priority": "High"}'
+
+
+def wants_tool(prompt: str, followed_up: bool) -> bool:
+    return "add" in prompt.lower() and not followed_up
+
+
+# --- Fake providers ---
+async def openai_completions(request):
+    body = await request.json()
+    prompt = body["messages"][-1]["content"] or ""
+    tool = wants_tool(prompt, any(m["role"] == "tool" for m in body["messages"]))
+    if not body.get("stream"):
+        await asyncio.sleep(FIRST_TOKEN_SECONDS + (0 if tool else TOKEN_SECONDS * ANSWER_TOKENS))
+        message = {"role": "assistant", "content": None if tool else "".join(ANSWER)}
+        if tool:
+            message["tool_calls"] = [{"id": "call_1", "type": "function",
+                                      "function": {"name": "add_task", "arguments": TOOL_ARGS}}]
+        return JSONResponse({"id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+                             "choices": [{"index": 0, "message": message, "finish_reason": "stop"}]})
+
+    def chunk(delta: dict) -> bytes:
+        return b"data: " + json.dumps({"id": "bench", "object": "chat.completion.chunk", "created": 0,
+                                        "model": body["model"],
+                                        "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}).encode() + b"\n\n"
+
+    async def chunks():
+        await asyncio.sleep(FIRST_TOKEN_SECONDS)
+        if tool:
+            yield chunk({"role": "assistant", "tool_calls": [
+                {"index": 0, "id": "call_1", "type": "function", "function": {"name": "add_task", "arguments": ""}}]})
+            for start in range(0, len(TOOL_ARGS), 10):
+                yield chunk({"tool_calls": [{"index": 0, "function": {"arguments": TOOL_ARGS[start:start + 10]}}]})
+        else:
+            for text in ANSWER:
+                yield chunk({"content": text})
+                await asyncio.sleep(TOKEN_SECONDS)
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+async def gemini_generate(request):
+    body = await request.json()
+    prompt = body["contents"][-1]["parts"][0]["text"]
+    tool = wants_tool(prompt, "Tool Result" in body["systemInstruction"]["parts"][0]["text"])
+    parts = [json.dumps({"tool": "add_task", "args": json.loads(TOOL_ARGS)})] if tool else ANSWER
+
+    def candidate(text: str) -> dict:
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+    if request.path_params["method"] == "generateContent":
+        await asyncio.sleep(FIRST_TOKEN_SECONDS + TOKEN_SECONDS * len(parts))
+        return JSONResponse(candidate("".join(parts)))
+
+    async def chunks():
+        await asyncio.sleep(FIRST_TOKEN_SECONDS)
+        for text in parts:
+            yield b"data: " + json.dumps(candidate(text)).encode() + b"\r\n\r\n"
+            await asyncio.sleep(TOKEN_SECONDS)
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+provider = Starlette(routes=[
+    Route("/v1/chat/completions", openai_completions, methods=["POST"]),
+    Route("/v1beta/models/{model}:{method}", gemini_generate, methods=["POST"]),
+])
+
+
+# --- Measurement ---
+async def ask_json(api: httpx.AsyncClient, prompt: str) -> tuple:
+    start = time.perf_counter()
+    response = await api.post("/api/chat", json={"messages": [{"role": "user", "content": prompt}]})
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, response.json()["source"]
+
+
+async def ask_stream(api: httpx.AsyncClient, prompt: str) -> tuple:
+    start = time.perf_counter()
+    first = done = None
+    event = None
+    async with api.stream("POST", "/api/chat/stream", json={"messages": [{"role": "user", "content": prompt}]}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event == "token" and first is None:
+                first = time.perf_counter() - start
+            elif line.startswith("data: ") and event in ("done", "error"):
+                done = json.loads(line[6:])
+                if event == "error":
+                    raise RuntimeError(done["message"])
+    return first, time.perf_counter() - start, done["source"]
+
+
+async def measure(api_url: str, path: str) -> None:
+    headers = {"Authorization": f"Bearer {jwt.encode({'sub': 'bench_chat'}, SECRET_KEY, algorithm=ALGORITHM)}"}
+    async with httpx.AsyncClient(base_url=api_url, headers=headers, timeout=60) as api:
+        for _ in range(100):
+            try:
+                await api.get("/api/health")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+        for scenario, prompt in (("answer", "How should I plan my week?"), ("tool call", "Add a task to buy milk")):
+            for endpoint, ask in (("JSON", ask_json), ("stream", ask_stream)):
+                results = [await ask(api, prompt) for _ in range(REPEATS)]
+                ttft = statistics.median(r[0] for r in results) * 1000
+                total = statistics.median(r[1] for r in results) * 1000
+                label = f"{path}, {scenario}, {endpoint}"
+                print(f"{label:<34} | {ttft:>12.0f} | {total:>8.0f} | {results[0][2]}")
+
+
+async def run(url: str) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    engine.dispose()
+
+    server = uvicorn.Server(uvicorn.Config(provider, host=HOST, port=PROVIDER_PORT, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    print(f"fake provider: first token after {FIRST_TOKEN_SECONDS * 1000:.0f} ms, "
+          f"{ANSWER_TOKENS} tokens at {TOKEN_SECONDS * 1000:.0f} ms; {url.split(':')[0]}")
+    print(f"{'variant':<34} | {'first token ms':>12} | {'total ms':>8} | source")
+    try:
+        for path, force_backup in (("openrouter", "False"), ("gemini", "True")):
+            env = dict(
+                os.environ,
+                DATABASE_URL=url,
+                OPENROUTER_API_KEY="bench",
+                GOOGLE_API_KEY="bench",
+                OPENROUTER_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1",
+                GEMINI_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1beta",
+                FORCE_USE_BACKUP=force_backup,
+                PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            )
+            api = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "backend.index:app", "--host", HOST, "--port", str(API_PORT),
+                 "--log-level", "warning"],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,  # the app logs every provider call
+            )
+            try:
+                await measure(f"http://{HOST}:{API_PORT}", path)
+            finally:
+                api.terminate()
+                api.wait()
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
@@ -0,0 +1,171 @@
+"""
+Chat turns with several tool calls ("add milk, eggs and bread"): all of
+them executed in one turn vs one per turn, as when chat.py only ran the
+first call and the user had to ask again for the rest.
+
+1. Turns: POST /api/chat against a fake OpenRouter that answers after
+   MODEL_SECONDS with one add_task call per item named in the message.
+   "one per turn" sends the items one message each; "all in one turn"
+   sends them together. Reported: turns, model calls, total seconds, and
+   whether every task was created.
+2. Tool execution only (in process): READS read-only calls and WRITES
+   task changes, run one after another through execute_tool (a commit per
+   change) vs execute_tools (one batch for the changes, reads concurrent).
+
+Usage:
+    python backend/benchmark_chat_tool_calls.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_chat_tool_calls.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from jose import jwt
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, create_engine, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend.api.v1.endpoints.chat import execute_tool, execute_tools, get_task_service
+from backend.core.security import ALGORITHM, SECRET_KEY
+from backend.database.migrations import migrate
+from backend.database.session import async_database_url
+from backend.models.task import Task
+
+MODEL_SECONDS = 0.8
+ITEMS = ["milk", "eggs", "bread", "butter", "coffee", "apples"]
+READS = [("list_tasks", {"status": "pending"}), ("search_tasks", {"query": "milk"}), ("get_task_analytics", {})]
+WRITES = 6
+REPEATS = 20
+PROVIDER_PORT = 8799
+API_PORT = 8800
+HOST = "127.0.0.1"
+
+model_calls = 0
+
+
+async def completions(request):
+    """An add_task call per item in the message ("add milk, eggs and bread"); a confirmation after tool results."""
+    global model_calls
+    model_calls += 1
+    body = await request.json()
+    await asyncio.sleep(MODEL_SECONDS)
+    message = {"role": "assistant", "content": "Done."}
+    if not any(m["role"] == "tool" for m in body["messages"]):
+        prompt = body["messages"][-1]["content"].replace("\n(Output JSON only)", "")
+        items = [item for item in ITEMS if item in prompt]
+        message = {"role": "assistant", "content": None, "tool_calls": [
+            {"id": f"call_{i}", "type": "function",
+             "function": {"name": "add_task", "arguments": json.dumps({"title": item.capitalize()})}}
+            for i, item in enumerate(items)]}
+    return JSONResponse({"id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "message": message, "finish_reason": "stop"}]})
+
+
+provider = Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+
+
+def reset(url: str) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    engine.dispose()
+
+
+async def turns(url: str) -> None:
+    global model_calls
+    server = uvicorn.Server(uvicorn.Config(provider, host=HOST, port=PROVIDER_PORT, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    reset(url)
+    env = dict(
+        os.environ,
+        DATABASE_URL=url,
+        OPENROUTER_API_KEY="bench",
+        OPENROUTER_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1",
+        LLM_HEDGE_ENABLED="false",
+        CHAT_INTENT_ROUTER="false",
+        PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    api_server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.index:app", "--host", HOST, "--port", str(API_PORT),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    print(f"{len(ITEMS)} items to add, {MODEL_SECONDS}s per model call")
+    print(f"{'variant':<17} | {'turns':>5} | {'model calls':>11} | {'total s':>7} | {'tasks':>5}")
+    engine = create_engine(url)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://{HOST}:{API_PORT}", timeout=60) as api:
+            for _ in range(100):
+                try:
+                    await api.get("/api/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.2)
+            variants = (
+                ("one per turn", [f"Add {item}" for item in ITEMS]),
+                ("all in one turn", ["Add " + ", ".join(ITEMS[:-1]) + " and " + ITEMS[-1]]),
+            )
+            for variant, messages in variants:
+                user_id = f"bench_{variant.replace(' ', '_')}"
+                headers = {"Authorization": "Bearer " + jwt.encode({"sub": user_id}, SECRET_KEY, algorithm=ALGORITHM)}
+                model_calls = 0
+                start = time.perf_counter()
+                for text in messages:
+                    response = await api.post("/api/chat", headers=headers, json={"messages": [{"role": "user", "content": text}]})
+                    response.raise_for_status()
+                elapsed = time.perf_counter() - start
+                with engine.connect() as connection:
+                    created = connection.execute(select(func.count()).select_from(Task).where(Task.user_id == user_id)).scalar()
+                print(f"{variant:<17} | {len(messages):>5} | {model_calls:>11} | {elapsed:>7.2f} | {created:>5}")
+    finally:
+        engine.dispose()
+        api_server.terminate()
+        api_server.wait()
+        server.should_exit = True
+        await serving
+
+
+async def execution(url: str) -> None:
+    reset(url)
+    engine = create_async_engine(async_database_url(url))
+    task_service = get_task_service()
+    print(f"\n{len(READS)} reads + {WRITES} adds per turn, tool execution only, {REPEATS} turns")
+    print(f"{'variant':<26} | {'p50 ms':>7} | {'max ms':>7}")
+    try:
+        for variant in ("execute_tool, one by one", "execute_tools"):
+            times = []
+            for turn in range(REPEATS):
+                calls = [("add_task", {"title": f"Item {turn}.{i}"}) for i in range(WRITES)] + READS
+                session = AsyncSession(engine, expire_on_commit=False)
+                start = time.perf_counter()
+                if variant == "execute_tools":
+                    await execute_tools(calls, session, "bench_execution", task_service)
+                else:
+                    for name, args in calls:
+                        await execute_tool(name, args, session, "bench_execution", task_service)
+                times.append((time.perf_counter() - start) * 1000)
+            print(f"{variant:<26} | {statistics.median(times):>7.1f} | {max(times):>7.1f}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        asyncio.run(turns(url))
+        asyncio.run(execution(url))
@@ -0,0 +1,122 @@
+"""
+Chat turns that run a tool: answered from the tool's template vs phrased
+by the model in a follow-up call (CHAT_SUMMARIZED_TOOLS).
+
+Starts the API under uvicorn on a fresh database, pointed at the fake
+providers of benchmark_chat_stream.py (each call takes FIRST_TOKEN_SECONDS
+plus TOKEN_SECONDS per token; "add" prompts get an add_task call), and
+sends TURNS tool turns through POST /api/chat on each provider path, with
+the command parser off so every turn goes to the model. Reported per turn:
+latency, model calls and request bytes sent to the provider (what input
+tokens are billed on).
+
+Usage:
+    python backend/benchmark_chat_tool_replies.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_chat_tool_replies.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from jose import jwt
+from sqlmodel import SQLModel, create_engine
+
+from backend.benchmark_chat_stream import API_PORT, HOST, PROVIDER_PORT, provider
+from backend.core.security import ALGORITHM, SECRET_KEY
+from backend.database.migrations import migrate
+
+TURNS = 10
+usage = {"calls": 0, "bytes": 0}
+
+
+async def counted(scope, receive, send):
+    """The fake provider, counting model calls and the bytes of their requests."""
+    if scope["type"] == "http":
+        usage["calls"] += 1
+
+        async def receive_counted():
+            message = await receive()
+            usage["bytes"] += len(message.get("body", b""))
+            return message
+
+        return await provider(scope, receive_counted, send)
+    return await provider(scope, receive, send)
+
+
+async def run(url: str) -> None:
+    server = uvicorn.Server(uvicorn.Config(counted, host=HOST, port=PROVIDER_PORT, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    print(f"{TURNS} turns \"Add a task to buy milk #n\" per variant")
+    print(f"{'path':<11} | {'reply':<9} | {'p50 ms':>7} | {'calls/turn':>10} | {'bytes/turn':>10} | example")
+    try:
+        for path, force_backup in (("openrouter", "False"), ("gemini", "True")):
+            for reply, summarized in (("model", '["add_task"]'), ("template", "[]")):
+                engine = create_engine(url)
+                SQLModel.metadata.drop_all(engine)
+                migrate(engine)
+                engine.dispose()
+                env = dict(
+                    os.environ,
+                    DATABASE_URL=url,
+                    OPENROUTER_API_KEY="bench",
+                    GOOGLE_API_KEY="bench",
+                    OPENROUTER_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1",
+                    GEMINI_BASE_URL=f"http://{HOST}:{PROVIDER_PORT}/v1beta",
+                    FORCE_USE_BACKUP=force_backup,
+                    CHAT_INTENT_ROUTER="false",
+                    CHAT_SUMMARIZED_TOOLS=summarized,
+                    LLM_HEDGE_ENABLED="false",
+                    PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                )
+                api_server = subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", "backend.index:app", "--host", HOST, "--port", str(API_PORT),
+                     "--log-level", "warning"],
+                    env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                token = jwt.encode({"sub": f"bench_{path}_{reply}"}, SECRET_KEY, algorithm=ALGORITHM)
+                headers = {"Authorization": f"Bearer {token}"}
+                try:
+                    async with httpx.AsyncClient(base_url=f"http://{HOST}:{API_PORT}", headers=headers, timeout=60) as api:
+                        for _ in range(100):
+                            try:
+                                await api.get("/api/health")
+                                break
+                            except httpx.TransportError:
+                                await asyncio.sleep(0.2)
+                        usage.update(calls=0, bytes=0)
+                        latencies = []
+                        for i in range(TURNS):
+                            history = [{"role": "user", "content": f"Add a task to buy milk #{i}"}]
+                            start = time.perf_counter()
+                            response = await api.post("/api/chat", json={"messages": history})
+                            latencies.append((time.perf_counter() - start) * 1000)
+                            response.raise_for_status()
+                        answer = response.json()["response"]
+                finally:
+                    api_server.terminate()
+                    api_server.wait()
+                print(f"{path:<11} | {reply:<9} | {statistics.median(latencies):>7.0f} | "
+                      f"{usage['calls'] / TURNS:>10.1f} | {usage['bytes'] / TURNS:>10.0f} | {json.dumps(answer[:40], ensure_ascii=False)}")
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
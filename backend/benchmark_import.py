@@ -0,0 +1,110 @@
+"""
+Benchmark bulk task import: one create_task call per row vs the import
+pipeline (incremental parse, TaskCreate validation, COPY on Postgres /
+executemany on SQLite, one commit per batch).
+
+Usage:
+    python backend/benchmark_import.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_import.py
+    BENCH_ROWS=500000 python backend/benchmark_import.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.core.cache import NullCache
+from backend.database.migrations import migrate
+from backend.database.session import async_database_url
+from backend.models.task import TaskCreate
+from backend.repositories.task_repository import AsyncTaskRepository
+from backend.services.task_service import TaskService
+
+ROWS = int(os.getenv("BENCH_ROWS", "100000"))
+PER_ROW_SAMPLE = 2000  # create_task is too slow to run for every row
+CHUNK_SIZE = 64 * 1024
+
+
+def make_rows(count: int) -> list:
+    return [
+        {
+            "description": f"Imported task {i}",
+            "priority": ("High", "Medium", "Low")[i % 3],
+            "category": "Migration",
+            "tags": ["imported", f"batch-{i % 10}"],
+            "completed": i % 4 == 0,
+            "due_date": "2026-01-01T09:00:00Z" if i % 2 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def encode(rows: list, import_format: str) -> bytes:
+    if import_format == "ndjson":
+        return "".join(json.dumps(row) + "\n" for row in rows).encode()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows({**row, "tags": json.dumps(row["tags"]), "due_date": row["due_date"] or ""} for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def body(data: bytes):
+    """The upload as the endpoint sees it: a stream of network-sized chunks."""
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+async def run(url: str) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    engine.dispose()
+    async_engine = create_async_engine(async_database_url(url))
+    repo = AsyncTaskRepository(NullCache())
+    service = TaskService(repo)
+    rows = make_rows(ROWS)
+
+    print(f"{ROWS} rows, {async_engine.dialect.name}")
+    print(f"{'method':<28} | {'rows':>7} | {'seconds':>8} | {'rows / s':>9}")
+
+    sample = [TaskCreate(**row) for row in rows[:PER_ROW_SAMPLE]]
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        start = time.perf_counter()
+        for task in sample:
+            await repo.create_task(session, task, "bench_per_row")
+        elapsed = time.perf_counter() - start
+    print(f"{'create_task per row':<28} | {len(sample):>7} | {elapsed:>8.2f} | {len(sample) / elapsed:>9.0f}")
+
+    for import_format in ("ndjson", "csv"):
+        data = encode(rows, import_format)
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            start = time.perf_counter()
+            result = await service.import_tasks(session, f"bench_{import_format}", body(data), import_format)
+            elapsed = time.perf_counter() - start
+        assert result.imported == ROWS and result.failed == 0, result
+        label = f"import {import_format} ({'COPY' if async_engine.dialect.name == 'postgresql' else 'executemany'})"
+        print(f"{label:<28} | {ROWS:>7} | {elapsed:>8.2f} | {ROWS / elapsed:>9.0f}")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
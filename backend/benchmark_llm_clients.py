@@ -0,0 +1,198 @@
+"""
+Per-turn connection overhead of the chat providers' HTTP clients: a client
+built for each call (as chat.py did) vs the shared clients of
+core/llm_clients.py.
+
+A chat turn that runs a tool makes two model calls. The stub provider
+answers both immediately over HTTPS (self-signed certificate) behind a
+local proxy that adds RTT_MS of round-trip time, so what is left is
+connection setup (TCP + TLS handshakes) and the request itself:
+
+- openrouter: the OpenAI SDK's AsyncOpenAI
+- gemini: httpx, as call_google_direct
+- gemini x CONCURRENT: that many turns at once
+
+Usage:
+    python backend/benchmark_llm_clients.py
+    BENCH_RTT_MS=80 python backend/benchmark_llm_clients.py
+
+The stub is uvicorn, which only speaks HTTP/1.1: the shared clients'
+HTTP/2 is not exercised here.
+"""
+import asyncio
+import datetime
+import ipaddress
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from openai import AsyncOpenAI
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend.core.config import settings
+from backend.core.llm_clients import llm_clients
+
+RTT_MS = float(os.getenv("BENCH_RTT_MS", "20"))
+TURNS = 30
+CONCURRENT = 50
+STUB_PORT = 8793
+PROXY_PORT = 8794
+HOST = "127.0.0.1"
+MESSAGES = [{"role": "user", "content": "Add a task to buy milk"}]
+GEMINI_PAYLOAD = {"contents": [{"role": "user", "parts": [{"text": "Add a task to buy milk"}]}]}
+
+
+# --- Stub provider ---
+async def completions(request):
+    body = await request.json()
+    return JSONResponse({"id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "finish_reason": "stop",
+                                      "message": {"role": "assistant", "content": "Done."}}]})
+
+
+async def generate(request):
+    return JSONResponse({"candidates": [{"content": {"role": "model", "parts": [{"text": "Done."}]}}]})
+
+
+stub = Starlette(routes=[
+    Route("/v1/chat/completions", completions, methods=["POST"]),
+    Route("/v1beta/models/{model}:generateContent", generate, methods=["POST"]),
+])
+
+
+def write_certificate(directory: str) -> tuple:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(HOST))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    certfile, keyfile = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(certfile, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return certfile, keyfile
+
+
+async def proxy(client_reader, client_writer) -> None:
+    """Forward a connection to the stub, delaying each chunk by half the RTT."""
+    upstream_reader, upstream_writer = await asyncio.open_connection(HOST, STUB_PORT)
+
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(RTT_MS / 2000)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    await asyncio.gather(pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer))
+
+
+# --- Turns: two provider calls each ---
+async def openrouter_per_request() -> None:
+    for _ in range(2):
+        async with AsyncOpenAI(base_url=settings.openrouter_base_url, api_key="bench") as client:
+            await client.chat.completions.create(model="bench", messages=MESSAGES)
+
+
+async def openrouter_shared() -> None:
+    for _ in range(2):
+        async with llm_clients.slot("openrouter"):
+            await llm_clients.openrouter().chat.completions.create(model="bench", messages=MESSAGES)
+
+
+async def gemini_per_request() -> None:
+    for _ in range(2):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{settings.gemini_base_url}/models/bench:generateContent",
+                                         params={"key": "bench"}, json=GEMINI_PAYLOAD, timeout=30.0)
+            response.raise_for_status()
+
+
+async def gemini_shared() -> None:
+    for _ in range(2):
+        async with llm_clients.slot("gemini"):
+            response = await llm_clients.http("gemini").post("/models/bench:generateContent",
+                                                             params={"key": "bench"}, json=GEMINI_PAYLOAD, timeout=30.0)
+            response.raise_for_status()
+
+
+def report(label: str, seconds) -> None:
+    ms = [value * 1000 for value in seconds]
+    print(f"{label:<32} | {len(ms):>5} | {statistics.median(ms):>8.1f} | {max(ms):>8.1f}")
+
+
+async def timed_turns(turn) -> list:
+    times = []
+    for _ in range(TURNS):
+        start = time.perf_counter()
+        await turn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+async def run(directory: str) -> None:
+    certfile, keyfile = write_certificate(directory)
+    os.environ["SSL_CERT_FILE"] = certfile  # trusted by every httpx client, OpenAI's included
+    os.environ["OPENROUTER_API_KEY"] = "bench"
+    settings.openrouter_base_url = f"https://{HOST}:{PROXY_PORT}/v1"
+    settings.gemini_base_url = f"https://{HOST}:{PROXY_PORT}/v1beta"
+
+    server = uvicorn.Server(uvicorn.Config(stub, host=HOST, port=STUB_PORT, log_level="warning",
+                                           ssl_certfile=certfile, ssl_keyfile=keyfile))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    relay = await asyncio.start_server(proxy, HOST, PROXY_PORT)
+
+    try:
+        print(f"RTT {RTT_MS:.0f} ms, HTTPS, two provider calls per turn")
+        print(f"{'variant':<32} | {'turns':>5} | {'p50 ms':>8} | {'max ms':>8}")
+        report("openrouter: client per request", await timed_turns(openrouter_per_request))
+        start = time.perf_counter()
+        await llm_clients.start()
+        warmup = time.perf_counter() - start
+        report("openrouter: shared client", await timed_turns(openrouter_shared))
+        report("gemini: client per request", await timed_turns(gemini_per_request))
+        report("gemini: shared client", await timed_turns(gemini_shared))
+
+        for label, turn in (("per request", gemini_per_request), ("shared", gemini_shared)):
+            start = time.perf_counter()
+            await asyncio.gather(*(turn() for _ in range(CONCURRENT)))
+            report(f"gemini x{CONCURRENT} at once: {label}", [time.perf_counter() - start])
+        print(f"startup warm-up (llm_clients.start): {warmup * 1000:.0f} ms, "
+              f"keep-alive {settings.llm_keepalive_expiry_seconds:.0f}s, "
+              f"{settings.llm_max_keepalive_connections} idle connections kept per provider")
+    finally:
+        await llm_clients.close()
+        relay.close()
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
@@ -0,0 +1,150 @@
+"""
+Benchmark list-response serialization: ORM objects through FastAPI's
+response_model (validate, then dump) vs column dicts encoded with orjson
+(core/serialization.py).
+
+Each variant is timed in two parts, reading the rows and producing the
+response body, for GET /api/tasks (cache miss and cache hit) and
+GET /api/chat/history. Peak memory is the tracemalloc high-water mark of
+one full read + encode.
+
+Usage:
+    python backend/benchmark_serialization.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_serialization.py
+
+The target database's tables are dropped and recreated.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.core.cache import NullCache
+from backend.core.serialization import dumps
+from backend.database.migrations import migrate
+from backend.models.chat_message import ChatMessage, ChatMessageRead
+from backend.models.task import Task
+from backend.repositories.chat_repository import ChatRepository
+from backend.repositories.task_repository import TaskRepository
+
+SIZES = [1000, 10000]
+REPEATS = 5
+TASKS_FIELD = create_model_field(name="Response", type_=List[Task], mode="serialization")
+MESSAGES_FIELD = create_model_field(name="Response", type_=List[ChatMessageRead], mode="serialization")
+
+
+def response_model_body(field, content) -> bytes:
+    """What FastAPI does with an endpoint's return value and its response_model."""
+    return asyncio.run(serialize_response(field=field, response_content=content, dump_json=True))
+
+
+def seed(engine, user_id: str, count: int) -> None:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        session.execute(insert(Task).execution_options(render_nulls=True), [
+            {
+                "description": f"Task {i} for the serialization benchmark",
+                "priority": ("High", "Medium", "Low")[i % 3],
+                "category": "Benchmark",
+                "tags": ["bench", f"group-{i % 10}"],
+                "due_date": start + timedelta(hours=i) if i % 2 else None,
+                "user_id": user_id,
+            }
+            for i in range(count)
+        ])
+        session.execute(insert(ChatMessage), [
+            {
+                "user_id": user_id,
+                "role": ("user", "assistant")[i % 2],
+                "content": f"Message {i}: " + "lorem ipsum " * 10,
+                "source": None if i % 2 == 0 else "OpenRouter",
+                "timestamp": start + timedelta(seconds=i),
+            }
+            for i in range(count)
+        ])
+        session.commit()
+
+
+def measure(engine, label: str, count: int, read, encode) -> None:
+    """Median read / encode time over REPEATS runs, then peak memory of one run."""
+    reads, encodes = [], []
+    for _ in range(REPEATS):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            content = read(session)
+            middle = time.perf_counter()
+            body = encode(content)
+            reads.append(middle - start)
+            encodes.append(time.perf_counter() - middle)
+    del content, body
+    with Session(engine) as session:
+        tracemalloc.start()
+        encode(read(session))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    read_ms = statistics.median(reads) * 1000
+    encode_ms = statistics.median(encodes) * 1000
+    print(
+        f"{label:<34} | {count:>6} | {read_ms:>8.1f} | {encode_ms:>9.1f} | "
+        f"{read_ms + encode_ms:>8.1f} | {peak / 1024:>8.0f}"
+    )
+
+
+def run(url: str) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    tasks = TaskRepository(NullCache())
+    chats = ChatRepository()
+
+    print(f"{'variant':<34} | {'rows':>6} | {'read ms':>8} | {'encode ms':>9} | {'total ms':>8} | {'peak KiB':>8}")
+    for count in SIZES:
+        user_id = f"bench_{count}"
+        seed(engine, user_id, count)
+        # the query get_tasks ran before, loading ORM objects
+        query = select(Task).where(Task.user_id == user_id).order_by(Task.id)
+        with Session(engine) as session:
+            rows = tasks.get_task_rows(session, user_id)  # stand-in for a cached result
+
+        measure(engine, "tasks: ORM + response_model", count,
+                lambda s: list(s.exec(query).all()),
+                lambda content: response_model_body(TASKS_FIELD, content))
+        measure(engine, "tasks: rows + orjson", count,
+                lambda s: tasks.get_task_rows(s, user_id),
+                dumps)
+        measure(engine, "tasks (cache hit): construct + rm", count,
+                lambda s: [Task.model_construct(**row) for row in rows],
+                lambda content: response_model_body(TASKS_FIELD, content))
+        measure(engine, "tasks (cache hit): rows + orjson", count,
+                lambda s: rows,
+                dumps)
+        measure(engine, "history: ChatMessageRead + rm", count,
+                lambda s: [
+                    ChatMessageRead.model_validate(m, from_attributes=True)
+                    for m in chats.get_user_messages(s, user_id, count)
+                ],
+                lambda content: response_model_body(MESSAGES_FIELD, content))
+        measure(engine, "history: rows + orjson", count,
+                lambda s: chats.get_user_message_rows(s, user_id, count),
+                dumps)
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        run(database_url)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
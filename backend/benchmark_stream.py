@@ -0,0 +1,235 @@
+"""
+Load test for GET /api/tasks/stream: many concurrent subscribers on one
+worker.
+
+Starts the API under uvicorn (one process) on a fresh database, opens
+STREAMS server-sent event connections spread over USERS users, and reports:
+
+- connect: time until every stream has received its first event
+- memory: the server's RSS growth per open stream
+- idle: the server's CPU use while every stream sits idle (heartbeats only)
+- fan-out: one task write, time until each of that user's streams has the event
+- storm: one write for every user at once, time until all streams have theirs
+- backpressure: writes made while one client does not read arrive as a few
+  merged events once it reads again
+
+Usage:
+    python backend/benchmark_stream.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_stream.py
+    BENCH_STREAMS=10000 BENCH_USERS=1000 python backend/benchmark_stream.py
+
+The target database's tables are dropped and recreated. Needs a file
+descriptor limit above twice BENCH_STREAMS (ulimit -n).
+"""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import psutil
+from jose import jwt
+from sqlmodel import SQLModel, create_engine
+
+from backend.core.security import ALGORITHM, SECRET_KEY
+from backend.database.migrations import migrate
+
+STREAMS = int(os.getenv("BENCH_STREAMS", "5000"))
+USERS = int(os.getenv("BENCH_USERS", "500"))
+HEARTBEAT_SECONDS = 5
+IDLE_SECONDS = 12
+CONNECT_CONCURRENCY = 200
+SLOW_WRITES = 500
+PORT = 8790
+HOST = "127.0.0.1"
+
+
+def token(user_id: str) -> str:
+    return jwt.encode({"sub": user_id}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class Stream:
+    """A minimal SSE client on a raw socket (each HTTP chunk is one event or comment)."""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.events = []  # (arrival time, cursor)
+        self.heartbeats = 0
+        self.arrived = asyncio.Event()
+        self.reader = self.writer = None
+
+    async def open(self, path: str = "/api/tasks/stream?fields=id", receive_buffer: int = 0) -> None:
+        sock = socket.socket()
+        if receive_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (HOST, PORT))
+        self.reader, self.writer = await asyncio.open_connection(sock=sock)
+        self.writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAuthorization: Bearer {token(self.user_id)}\r\n"
+            f"Accept: text/event-stream\r\n\r\n".encode()
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(head.split(b"\r\n")[0].decode())
+
+    async def read(self) -> None:
+        while True:
+            size = int((await self.reader.readline()).strip() or b"0", 16)
+            if size == 0:
+                return
+            chunk = await self.reader.readexactly(size + 2)
+            if chunk.startswith(b"id: "):
+                self.events.append((time.perf_counter(), int(chunk[4:chunk.index(b"\n")])))
+                self.arrived.set()
+            elif chunk.startswith(b":"):
+                self.heartbeats += 1
+
+    async def next_event(self) -> float:
+        await self.arrived.wait()
+        self.arrived.clear()
+        return self.events[-1][0]
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(label: str, latencies) -> None:
+    ms = [value * 1000 for value in latencies]
+    print(f"{label:<26} | {len(ms):>6} | {statistics.median(ms):>7.1f} | {percentile(ms, 0.99):>7.1f} | {max(ms):>7.1f}")
+
+
+async def run(url: str) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    engine.dispose()
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=url,
+        TASK_STREAM_HEARTBEAT_SECONDS=str(HEARTBEAT_SECONDS),
+        TASK_STREAM_MAX_SUBSCRIBERS=str(STREAMS + 100),
+        PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.index:app", "--host", HOST, "--port", str(PORT),
+         "--log-level", "warning", "--backlog", "4096"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    api = httpx.AsyncClient(base_url=f"http://{HOST}:{PORT}", timeout=60)
+    try:
+        for _ in range(100):
+            try:
+                await api.get("/api/health")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+        process = psutil.Process(server.pid)
+        rss_before = process.memory_info().rss
+
+        users = [f"bench_user_{i}" for i in range(USERS)]
+        streams = [Stream(users[i % USERS]) for i in range(STREAMS)]
+        readers = []
+        gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+        async def connect(stream: Stream) -> None:
+            async with gate:
+                await stream.open()
+                readers.append(asyncio.create_task(stream.read()))
+                await stream.next_event()
+
+        start = time.perf_counter()
+        cpu = process.cpu_times()
+        await asyncio.gather(*(connect(stream) for stream in streams))
+        connect_seconds = time.perf_counter() - start
+        connect_cpu = sum(process.cpu_times()[:2]) - sum(cpu[:2])
+        rss_open = process.memory_info().rss
+        print(f"{STREAMS} streams over {USERS} users, {url.split(':')[0]}, heartbeat {HEARTBEAT_SECONDS}s")
+        print(f"connect: all first events after {connect_seconds:.2f}s ({connect_cpu:.2f}s server CPU)")
+        print(f"memory: {rss_before / 2**20:.0f} MiB -> {rss_open / 2**20:.0f} MiB "
+              f"({(rss_open - rss_before) / STREAMS / 1024:.1f} KiB per stream)")
+
+        cpu = process.cpu_times()
+        beats = sum(stream.heartbeats for stream in streams)
+        await asyncio.sleep(IDLE_SECONDS)
+        cpu_used = sum(process.cpu_times()[:2]) - sum(cpu[:2])
+        beats = sum(stream.heartbeats for stream in streams) - beats
+        print(f"idle: {cpu_used / IDLE_SECONDS * 100:.1f}% of one core over {IDLE_SECONDS}s, {beats} heartbeats delivered")
+
+        print(f"{'latency (write -> event)':<26} | {'events':>6} | {'p50 ms':>7} | {'p99 ms':>7} | {'max ms':>7}")
+        headers = {user: {"Authorization": f"Bearer {token(user)}"} for user in users}
+        by_user = {user: [stream for stream in streams if stream.user_id == user] for user in users}
+
+        async def write(user: str) -> tuple:
+            """(latencies from sending the write, latencies from its response, i.e. after the commit)"""
+            waiting = [asyncio.create_task(stream.next_event()) for stream in by_user[user]]
+            sent = time.perf_counter()
+            response = await api.post("/api/tasks", json={"description": "stream benchmark"}, headers=headers[user])
+            committed = time.perf_counter()
+            response.raise_for_status()
+            arrivals = await asyncio.gather(*waiting)
+            return [arrival - sent for arrival in arrivals], [max(0.0, arrival - committed) for arrival in arrivals]
+
+        fan_out = [await write(user) for user in users[:20]]
+        report(f"fan-out ({STREAMS // USERS} streams / user)", [x for sent, _ in fan_out for x in sent])
+        report("  from commit", [x for _, committed in fan_out for x in committed])
+
+        start = time.perf_counter()
+        cpu, client_cpu = process.cpu_times(), time.process_time()
+        storm = await asyncio.gather(*(write(user) for user in users))
+        cpu_used = sum(process.cpu_times()[:2]) - sum(cpu[:2])
+        client_cpu = time.process_time() - client_cpu
+        report(f"storm ({USERS} writes)", [x for sent, _ in storm for x in sent])
+        report("  from commit", [x for _, committed in storm for x in committed])
+        print(f"storm: every stream had its event after {time.perf_counter() - start:.2f}s "
+              f"({cpu_used:.2f}s server CPU, {client_cpu:.2f}s load generator CPU)")
+
+        # Backpressure: a client that stops reading (small receive buffer, full
+        # rows) while its tasks change
+        slow = Stream("bench_slow_reader")
+        await slow.open("/api/tasks/stream", receive_buffer=4096)
+        reading = asyncio.create_task(slow.read())
+        await slow.next_event()
+        reading.cancel()  # idle between chunks, so nothing is lost
+        slow_headers = {"Authorization": f"Bearer {token(slow.user_id)}"}
+        rss_slow = process.memory_info().rss
+        for i in range(SLOW_WRITES):
+            await api.post("/api/tasks", json={"description": f"unread {i} " + "x" * 20000}, headers=slow_headers)
+        rss_slow = process.memory_info().rss - rss_slow
+        received = len(slow.events)
+        reading = asyncio.create_task(slow.read())
+        await asyncio.sleep(2)
+        print(f"backpressure: {SLOW_WRITES} writes (~{SLOW_WRITES * 20 // 1024} MiB of rows) while not reading "
+              f"arrived as {len(slow.events) - received} event(s); server RSS grew {rss_slow / 2**20:.1f} MiB meanwhile")
+        reading.cancel()
+        slow.close()
+    finally:
+        for stream in streams:
+            if stream.writer is not None:
+                stream.close()
+        for task in readers:
+            task.cancel()
+        await api.aclose()
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        asyncio.run(run(database_url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
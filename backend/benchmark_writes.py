@@ -0,0 +1,103 @@
+"""
+Benchmark single-task writes: the previous get / setattr / commit / refresh
+path vs UPDATE ... RETURNING (and DELETE ... RETURNING) in one statement.
+
+Usage:
+    python backend/benchmark_writes.py                  # temporary SQLite file
+    BENCH_DATABASE_URL=postgresql+psycopg://... python backend/benchmark_writes.py
+    BENCH_RTT_MS=20 python backend/benchmark_writes.py  # add a simulated network round trip
+
+Local databases answer in microseconds, so BENCH_RTT_MS sleeps once per
+statement and once per commit to stand in for the round trip to a remote
+pooler such as Neon. The round-trip column counts those same events.
+The target database's tables are dropped and recreated.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from backend.core.cache import NullCache
+from backend.database.migrations import migrate
+from backend.models.task import Task
+from backend.repositories.task_repository import TaskRepository
+
+OPERATIONS = 200
+USER_ID = "bench_user"
+RTT_SECONDS = float(os.getenv("BENCH_RTT_MS", "0")) / 1000
+
+
+def legacy_update(session: Session, task_id: int, user_id: str, task_data: dict):
+    """The previous implementation: load, check owner, setattr, commit, refresh."""
+    db_task = session.get(Task, task_id)
+    if db_task and db_task.user_id == user_id:
+        for key, value in task_data.items():
+            setattr(db_task, key, value)
+        session.add(db_task)
+        session.commit()
+        session.refresh(db_task)
+        return db_task
+    return None
+
+
+def legacy_delete(session: Session, task_id: int, user_id: str) -> bool:
+    db_task = session.get(Task, task_id)
+    if db_task and db_task.user_id == user_id:
+        session.delete(db_task)
+        session.commit()
+        return True
+    return False
+
+
+def run(url: str) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    migrate(engine)
+    repo = TaskRepository(NullCache())
+
+    round_trips = 0
+
+    def on_round_trip(*args) -> None:
+        nonlocal round_trips
+        round_trips += 1
+        if RTT_SECONDS:
+            time.sleep(RTT_SECONDS)
+
+    event.listen(engine, "before_cursor_execute", on_round_trip)
+    event.listen(engine, "commit", on_round_trip)
+
+    def measure(label: str, fn) -> None:
+        nonlocal round_trips
+        with Session(engine) as session:
+            ids = list(session.scalars(insert(Task).returning(Task.id), [
+                {"description": f"Task {i}", "tags": [], "user_id": USER_ID} for i in range(OPERATIONS)
+            ]))
+            session.commit()
+        round_trips = 0
+        start = time.perf_counter()
+        for task_id in ids:
+            # a fresh session per call, as each API request gets one
+            with Session(engine) as session:
+                fn(session, task_id)
+        elapsed = (time.perf_counter() - start) * 1000 / OPERATIONS
+        print(f"{label:<28} | {elapsed:>9.2f} | {round_trips / OPERATIONS:>11.1f}")
+
+    print(f"{'operation':<28} | {'ms / call':>9} | {'round trips':>11}")
+    measure("complete (legacy)", lambda s, i: legacy_update(s, i, USER_ID, {"completed": True}))
+    measure("complete (RETURNING)", lambda s, i: repo.update_task(s, i, USER_ID, {"completed": True}))
+    measure("delete (legacy)", lambda s, i: legacy_delete(s, i, USER_ID))
+    measure("delete (RETURNING)", lambda s, i: repo.delete_task(s, i, USER_ID))
+
+
+if __name__ == "__main__":
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        run(database_url)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
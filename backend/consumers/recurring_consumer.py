@@ -1,16 +1,16 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 import logging
-from sqlmodel import Session, select
-from backend.database.session import engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.models.task import Task
-from backend.services.task_service import TaskService
-from backend.repositories.task_repository import TaskRepository
+from backend.core.cache import task_cache
+from backend.core.change_hub import task_changes
+from backend.models.types import utcnow
 
 # Setup Logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("recurring-consumer")
 
-def process_task_event(event_data: dict, db: Session):
+async def process_task_event(event_data: dict, db: AsyncSession):
     """
     Handles 'task-completed' events.
     If task is recurring, creates the next instance.
@@ -23,7 +23,7 @@ def process_task_event(event_data: dict, db: Session):
 
     logger.info(f"Processing completion event for task {task_id}")
     
-    task = db.get(Task, task_id)
+    task = await db.get(Task, task_id)
     if not task:
         logger.warning(f"Task {task_id} not found")
         return
@@ -38,7 +38,7 @@ def process_task_event(event_data: dict, db: Session):
     
     next_due = None
     pattern = task.recurrence_pattern.lower() if task.recurrence_pattern else ""
-    current_due = datetime.fromisoformat(task.due_date) if task.due_date else datetime.now()
+    current_due = task.due_date or utcnow()
 
     if "daily" in pattern:
         next_due = current_due + timedelta(days=1)
@@ -59,13 +59,15 @@ def process_task_event(event_data: dict, db: Session):
         tags=task.tags,
         is_recurring=True,
         recurrence_pattern=task.recurrence_pattern,
-        due_date=next_due.isoformat(),
+        due_date=next_due,
         completed=False,
         notification_sent=False
     )
     
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
+    task_cache.invalidate(new_task.user_id)
+    task_changes.publish(new_task.user_id)
+    await db.refresh(new_task)
     logger.info(f"♻️ Created next recurring task: {new_task.id} due at {new_task.due_date}")
 
@@ -0,0 +1,136 @@
+"""
+Incremental NDJSON / CSV parsing for bulk uploads.
+
+The request body is read chunk by chunk and cut into complete records (a
+quoted CSV field may contain line breaks), which are handed out in batches,
+so an upload of any size is parsed in constant memory. A record that cannot
+be parsed is passed on with an error message instead of stopping the upload.
+
+The formats are the ones core/export.py writes, so an export can be imported
+again; CSV cells holding lists (tags) may be JSON arrays or comma-separated.
+"""
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+LIST_COLUMNS = {"tags"}
+
+# (line number, fields, error): fields is None when error is set
+ParsedRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def _line_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """Complete lines (newline included) from each body chunk; a partial last line waits for the next chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        if lines:
+            yield [line + "\n" for line in lines]
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield [pending]
+
+
+class _NdjsonRecords:
+    def __init__(self):
+        self.line = 0
+
+    def feed(self, lines: List[str]) -> List[ParsedRecord]:
+        records = []
+        for text in lines:
+            self.line += 1
+            if not text.strip():
+                continue
+            try:
+                fields = json.loads(text)
+            except ValueError as e:
+                records.append((self.line, None, f"invalid JSON: {e}"))
+                continue
+            if isinstance(fields, dict):
+                records.append((self.line, fields, None))
+            else:
+                records.append((self.line, None, "expected a JSON object"))
+        return records
+
+    def finish(self) -> List[ParsedRecord]:
+        return []
+
+
+class _CsvRecords:
+    """CSV with a header row. A record is complete once its quote characters balance."""
+
+    def __init__(self):
+        self.line = 0
+        self.header: Optional[List[str]] = None
+        self.pending: List[str] = []
+        self.pending_start = 0
+        self.quotes = 0
+
+    def feed(self, lines: List[str]) -> List[ParsedRecord]:
+        records = []
+        for text in lines:
+            self.line += 1
+            if not self.pending:
+                self.pending_start = self.line
+            self.pending.append(text)
+            self.quotes += text.count('"')
+            if self.quotes % 2:
+                continue  # inside a quoted field
+            record = self._parse("".join(self.pending), self.pending_start)
+            self.pending = []
+            self.quotes = 0
+            if record:
+                records.append(record)
+        return records
+
+    def finish(self) -> List[ParsedRecord]:
+        if self.pending:
+            return [(self.pending_start, None, "unterminated quoted field")]
+        return []
+
+    def _parse(self, text: str, line: int) -> Optional[ParsedRecord]:
+        try:
+            row = next(csv.reader([text]), [])
+        except csv.Error as e:
+            return line, None, f"invalid CSV: {e}"
+        if not any(cell.strip() for cell in row):
+            return None
+        if self.header is None:
+            self.header = [name.strip() for name in row]
+            return None
+        if len(row) != len(self.header):
+            return line, None, f"expected {len(self.header)} fields, got {len(row)}"
+        fields = {}
+        for name, cell in zip(self.header, row):
+            if cell == "":
+                continue  # empty cell: use the default
+            if name in LIST_COLUMNS:
+                try:
+                    cell = json.loads(cell) if cell.lstrip().startswith("[") else [
+                        item.strip() for item in cell.split(",") if item.strip()
+                    ]
+                except ValueError as e:
+                    return line, None, f"{name}: invalid JSON array: {e}"
+            fields[name] = cell
+        return line, fields, None
+
+
+async def parse_upload(
+    chunks: AsyncIterator[bytes], import_format: str, batch_size: int
+) -> AsyncIterator[List[ParsedRecord]]:
+    """Parse an NDJSON or CSV body into batches of at most batch_size records."""
+    parser = _NdjsonRecords() if import_format == "ndjson" else _CsvRecords()
+    batch: List[ParsedRecord] = []
+    async for lines in _line_chunks(chunks):
+        batch.extend(parser.feed(lines))
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    batch.extend(parser.finish())
+    if batch:
+        yield batch
@@ -0,0 +1,175 @@
+"""
+Read-through query cache.
+
+Entries live in a namespace (one per user) and are dropped wholesale when the
+namespace is invalidated. Every namespace also has a generation number that
+invalidation advances: a reader takes the generation before it queries and
+passes it to `set`, which refuses to store the result if a write committed in
+between, so a slow read can never repopulate the cache with data from before
+that write.
+
+`InMemoryCache` is per process: writers in other processes cannot invalidate
+it, so callers put something those writes change into the key (the task
+lists use the user's data version), and entries expire after a TTL so
+unread ones do not hold memory. A shared backend (Redis, memcached) only
+has to implement `CacheBackend`.
+"""
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+from backend.core.config import settings
+
+
+class CacheBackend(ABC):
+    """Interface the repositories cache through. Values must be picklable."""
+
+    @abstractmethod
+    def generation(self, namespace: str) -> int:
+        """Current generation of the namespace; take it before loading a value."""
+
+    @abstractmethod
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+
+    @abstractmethod
+    def set(self, namespace: str, key: Hashable, value: Any, generation: int) -> None:
+        """Store a value loaded at `generation`; ignored if the namespace has moved on."""
+
+    @abstractmethod
+    def invalidate(self, namespace: str) -> None:
+        """Drop every entry in the namespace and advance its generation."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current size."""
+
+
+class NullCache(CacheBackend):
+    """Backend used when caching is disabled: every lookup is a miss."""
+
+    def generation(self, namespace: str) -> int:
+        return 0
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        return None
+
+    def set(self, namespace: str, key: Hashable, value: Any, generation: int) -> None:
+        pass
+
+    def invalidate(self, namespace: str) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Process-local LRU cache with a TTL and a memory budget.
+
+    Values are stored pickled: the pickle length is what the budget counts,
+    and every hit hands out a fresh copy, so callers cannot mutate shared
+    state.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, bytes]]" = OrderedDict()
+        self._keys: Dict[str, Set[Hashable]] = {}
+        # Generations come from one process-wide counter, so a namespace whose
+        # entry is never removed cannot go back to a value a reader already holds
+        self._generations: Dict[str, int] = {}
+        self._clock = count(1)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                self._remove(namespace, key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+        return pickle.loads(data)
+
+    def set(self, namespace: str, key: Hashable, value: Any, generation: int) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return
+            if (namespace, key) in self._entries:
+                self._remove(namespace, key)
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl_seconds, data)
+            self._keys.setdefault(namespace, set()).add(key)
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                (oldest_namespace, oldest_key), _ = next(iter(self._entries.items()))
+                self._remove(oldest_namespace, oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._generations[namespace] = next(self._clock)
+            for key in list(self._keys.get(namespace, ())):
+                self._remove(namespace, key)
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, namespace: str, key: Hashable) -> None:
+        """Drop one entry; the caller holds the lock."""
+        _, data = self._entries.pop((namespace, key))
+        self._bytes -= len(data)
+        keys = self._keys[namespace]
+        keys.discard(key)
+        if not keys:
+            del self._keys[namespace]
+
+
+def build_task_cache() -> CacheBackend:
+    """Cache for task list queries, configured from settings."""
+    if not settings.task_cache_enabled:
+        return NullCache()
+    return InMemoryCache(
+        max_entries=settings.task_cache_max_entries,
+        max_bytes=settings.task_cache_max_bytes,
+        ttl_seconds=settings.task_cache_ttl_seconds,
+    )
+
+
+# Shared by every TaskRepository in the process
+task_cache = build_task_cache()
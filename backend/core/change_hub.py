@@ -0,0 +1,149 @@
+"""
+In-process pub/sub for task changes.
+
+Writers publish the id of the user whose tasks changed, after the write has
+committed; GET /api/tasks/stream subscribes each connection to its user and
+answers each notification with the delta from GET /api/tasks/changes.
+
+A notification carries no data, only "something changed", and a
+subscription holds at most one pending notification. A burst of writes, or a
+client that reads slowly, therefore costs one delta query and one event
+covering all of it instead of a growing queue: that is the backpressure.
+An idle subscription is a set entry and, while its connection waits, one
+future and one timer, so a worker can hold thousands of them.
+
+The hub is per process, like InMemoryCache: writes made by another process
+are not announced here, but because events are deltas from the client's
+cursor they are delivered with the next local notification rather than
+lost. A shared broker (Redis pub/sub, Postgres LISTEN/NOTIFY) only has to
+call `publish`.
+"""
+import asyncio
+import threading
+from itertools import count
+from typing import Dict, Optional, Set
+from backend.core.config import settings
+
+
+class HubFull(Exception):
+    """The process already holds settings.task_stream_max_subscribers subscriptions."""
+
+
+class Subscription:
+    """One connection's interest in a user's changes. Create through ChangeHub.subscribe."""
+
+    def __init__(self, hub: "ChangeHub", user_id: str, loop: asyncio.AbstractEventLoop):
+        self.hub = hub
+        self.user_id = user_id
+        self.loop = loop
+        self._pending = False
+        self._waiter: Optional[asyncio.Future] = None
+
+    def notify(self) -> None:
+        """Mark the subscription changed and wake its waiter; call on the subscription's loop."""
+        self._pending = True
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a notification; True if there was one (it is consumed)."""
+        if not self._pending:
+            self._waiter = self.loop.create_future()
+            timer = self.loop.call_later(timeout, _resolve, self._waiter)
+            try:
+                await self._waiter
+            finally:
+                timer.cancel()
+                self._waiter = None
+        notified = self._pending
+        self._pending = False
+        return notified
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ChangeHub:
+    """Fan-out of change notifications to the subscriptions of each user."""
+
+    def __init__(self, max_subscribers: int):
+        self.max_subscribers = max_subscribers
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        # Last publish per subscribed user, from one process-wide counter (see generation)
+        self._generations: Dict[str, int] = {}
+        self._clock = count(1)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.published = 0
+        self.notified = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        """Subscribe on the running event loop; raises HubFull at the subscriber limit."""
+        subscription = Subscription(self, user_id, asyncio.get_running_loop())
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise HubFull(f"{self._count} subscribers")
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+                self._generations.pop(subscription.user_id, None)
+            self._count -= 1
+
+    def publish(self, user_id: str) -> None:
+        """
+        Tell the user's subscriptions that their tasks changed. Safe to call
+        from any thread (sync endpoints run in a thread pool); call it after
+        the write has committed.
+        """
+        with self._lock:
+            self.published += 1
+            subscriptions = list(self._subscribers.get(user_id, ()))
+            if not subscriptions:
+                return
+            self._generations[user_id] = next(self._clock)
+            self.notified += len(subscriptions)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for subscription in subscriptions:
+            if subscription.loop is running:
+                subscription.notify()
+            elif not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription.notify)
+
+    def generation(self, user_id: str) -> int:
+        """
+        Identifies the user's latest publish. A read started after this call
+        sees every write announced so far, so subscriptions woken by any of
+        those publishes can share it.
+        """
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "subscribers": self._count,
+                "users": len(self._subscribers),
+                "published": self.published,
+                "notified": self.notified,
+            }
+
+
+# Shared by every publisher and stream in the process
+task_changes = ChangeHub(settings.task_stream_max_subscribers)
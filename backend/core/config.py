@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -8,6 +8,76 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Read analytics from the trigger-maintained task_stats counters (a
+    # primary-key lookup) instead of an aggregate over tasks
+    task_stats_counters: bool = True
+
+    # Largest number of operations accepted by POST /api/tasks/batch
+    task_batch_max_size: int = 500
+
+    # Per-process read-through cache for task list queries (core/cache.py).
+    # Writes through TaskRepository invalidate it; entries are keyed on the
+    # user's data version, so writes made elsewhere are seen on the next read.
+    # The TTL only bounds how long unused entries hold memory.
+    task_cache_enabled: bool = True
+    task_cache_ttl_seconds: float = 30.0
+    task_cache_max_entries: int = 2048
+    task_cache_max_bytes: int = 32 * 1024 * 1024
+
+    # Rows fetched per server-side cursor batch (and per response chunk) by
+    # the streaming export endpoints
+    export_batch_size: int = 1000
+
+    # POST /api/tasks/import: rows written (and committed) per COPY / INSERT
+    # batch, and how many per-row errors the response lists
+    task_import_batch_size: int = 5000
+    task_import_max_errors: int = 1000
+
+    # GET /api/tasks/stream (server-sent events): seconds between keep-alive
+    # comments (which is also how soon a dropped connection is noticed), and
+    # how many streams one process holds open at most
+    task_stream_heartbeat_seconds: float = 15.0
+    task_stream_max_subscribers: int = 10000
+
+    # Chat model providers (core/llm_clients.py). One long-lived client per
+    # provider: connections kept open between chat turns, and requests in
+    # flight per provider (more wait for a slot)
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    gemini_base_url: str = "https://generativelanguage.googleapis.com/v1beta"
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 120.0
+    llm_http2: bool = True
+    openrouter_max_concurrency: int = 64
+    gemini_max_concurrency: int = 64
+    # Open a connection to each provider at startup, waiting at most this long
+    llm_warmup: bool = True
+    llm_warmup_timeout_seconds: float = 5.0
+
+    # Routing between chat providers (core/provider_router.py). A provider's
+    # circuit opens when, over its last llm_breaker_window calls (at least
+    # llm_breaker_min_calls), this share failed or took llm_breaker_slow_seconds
+    # or more; after llm_breaker_open_seconds one probe call is let through.
+    llm_breaker_window: int = 20
+    llm_breaker_min_calls: int = 5
+    llm_breaker_failure_rate: float = 0.5
+    llm_breaker_slow_seconds: float = 10.0
+    llm_breaker_open_seconds: float = 30.0
+    # Hedging: ask the next provider too when the preferred one has not
+    # answered within its p95 latency (clamped to these bounds)
+    llm_hedge_enabled: bool = True
+    llm_hedge_min_seconds: float = 1.0
+    llm_hedge_max_seconds: float = 8.0
+    # Give up on a single model call after this long
+    llm_call_timeout_seconds: float = 30.0
+    # Run recognized chat commands ("add task ...", "/done 12") without the
+    # model (core/intent_router.py); anything else still goes to it
+    chat_intent_router: bool = True
+    # Tools whose result the model phrases in a follow-up call (JSON list,
+    # e.g. ["list_tasks", "search_tasks"]). Every other tool's result is
+    # answered as execute_tool renders it, without a second model call
+    chat_summarized_tools: List[str] = []
+
     # Better Auth
     better_auth_secret: str = ""
     better_auth_url: Optional[str] = None
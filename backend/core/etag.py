@@ -0,0 +1,48 @@
+"""
+Conditional GET support based on the per-user data version.
+
+The version is a single primary-key lookup, so answering a poll with
+304 Not Modified never touches the tasks or chat_messages tables.
+"""
+import hashlib
+from fastapi import Depends, HTTPException, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.core.security import get_current_user_id
+from backend.database.session import get_async_session
+from backend.repositories.data_version_repository import AsyncDataVersionRepository
+
+
+def make_etag(version: int, user_id: str, request: Request) -> str:
+    """Weak ETag for this user's view of the resource at the given data version."""
+    variant = hashlib.sha1(f"{user_id}?{request.url.query}".encode()).hexdigest()[:12]
+    return f'W/"{version}-{variant}"'
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: str = Depends(get_current_user_id)
+) -> str:
+    """
+    Dependency for user-scoped GET endpoints.
+
+    Answers `If-None-Match` with 304 before the endpoint runs when the user's
+    data has not changed; otherwise sets the ETag on the response.
+    """
+    version = await AsyncDataVersionRepository().get_version(session, user_id)
+    # The task list cache keys on the same version (TaskRepository._cached),
+    # so the body sent with this ETag is never older than it
+    session.info.setdefault("data_versions", {})[user_id] = version
+    etag = make_etag(version, user_id, request)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison: W/"x" and "x" are equivalent
+        if "*" in candidates or etag in candidates or etag[2:] in candidates:
+            raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return etag
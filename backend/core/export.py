@@ -0,0 +1,81 @@
+"""
+Streaming NDJSON / CSV exports.
+
+Rows arrive from the repository in batches read through a server-side
+cursor, and each batch is encoded and sent before the next one is fetched,
+so memory stays flat whatever the size of the account. With gzip the
+compressor is flushed after every batch so clients see data as it is read.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Mapping, Sequence
+from fastapi.responses import StreamingResponse
+from backend.models.types import utc_isoformat
+
+Batches = AsyncIterator[Sequence[Mapping[str, Any]]]
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return utc_isoformat(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return utc_isoformat(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+async def ndjson_chunks(batches: Batches, columns: List[str]) -> AsyncIterator[bytes]:
+    """One JSON object per row; one chunk per batch."""
+    async for rows in batches:
+        yield "".join(
+            json.dumps({c: row[c] for c in columns}, default=_json_default) + "\n" for row in rows
+        ).encode()
+
+
+async def csv_chunks(batches: Batches, columns: List[str]) -> AsyncIterator[bytes]:
+    """Header row first (sent before the query runs), then one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(row[c]) for c in columns] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a chunk stream, flushing after every chunk."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    batches: Batches, columns: List[str], export_format: str, filename: str, gzip: bool = False
+) -> StreamingResponse:
+    """Stream `batches` as an NDJSON or CSV attachment, optionally gzip-encoded."""
+    encode = ndjson_chunks if export_format == "ndjson" else csv_chunks
+    body = encode(batches, columns)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[export_format], headers=headers)
@@ -0,0 +1,195 @@
+"""
+Deterministic parsing of common chat commands, so they skip the model.
+
+Most chat messages are short commands ("add task buy milk", "complete 12",
+"list pending", "delete groceries") that the model maps to one tool call
+and then phrases the tool's result, two model round trips. `parse` maps
+them to the same (tool, args) directly, either as slash commands:
+
+    /add <title> [!high|!medium|!low] [#category]
+    /list [all|pending|completed]     /search <query>
+    /done <id or name>                /delete <id or name>
+    /rename <id> <new title>          /priority <id> <high|medium|low>
+    /stats                            /clear
+
+or as the plain-language forms in _PATTERNS. Anything else, or anything
+ambiguous ("delete it", "delete everything", "complete all"), returns None
+and goes to the model as before. The patterns match the whole message, never a prefix of a
+longer request.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from backend.core.config import settings
+
+Command = Tuple[str, Dict[str, Any]]
+
+PRIORITIES = ("high", "medium", "low")
+# Targets that name no particular task: left to the model to clarify
+_VAGUE_TARGETS = {"it", "this", "that", "them", "those", "these", "task", "tasks", "one", "something", "stuff"}
+# Quantifiers ("all", "everything", "anything", "every task", ...) name no task either
+_QUANTIFIER = re.compile(r"(?:all|every|any|each)(?:thing|one)?\b", re.I)
+# Where a task sits, not part of its name: "remove milk from the list"
+_ON_LIST = r"(?: (?:from|off|on|in) (?:the|my)(?: task| todo| to-do)? (?:list|tasks|todos))?"
+_STATUSES = {"pending": "pending", "open": "pending", "incomplete": "pending", "unfinished": "pending",
+             "completed": "completed", "complete": "completed", "done": "completed", "finished": "completed",
+             "all": "all"}
+
+
+def _target(text: str) -> Optional[Dict[str, Any]]:
+    """task_id for "12" / "#12" / "task 12", task_name for a name; None when vague."""
+    text = re.sub(r"^(?:the |my )?(?:task\s+)?", "", text.strip(), flags=re.I).strip(" \"'")
+    if re.fullmatch(r"#?\d+", text):
+        return {"task_id": int(text.lstrip("#"))}
+    if not text or text.lower() in _VAGUE_TARGETS or _QUANTIFIER.match(text):
+        return None
+    return {"task_name": text}
+
+
+def _add(title: str, priority: Optional[str] = None, category: Optional[str] = None) -> Optional[Command]:
+    title = title.strip(" \"'")
+    if not title:
+        return None
+    args: Dict[str, Any] = {"title": title[0].upper() + title[1:]}
+    if priority:
+        args["priority"] = priority.lower()
+    if category:
+        args["category"] = category
+    return "add_task", args
+
+
+def _add_slash(rest: str) -> Optional[Command]:
+    words, priority, category = [], None, None
+    for word in rest.split():
+        if word.startswith("!") and word[1:].lower() in PRIORITIES:
+            priority = word[1:]
+        elif word.startswith("#") and len(word) > 1:
+            category = word[1:]
+        else:
+            words.append(word)
+    return _add(" ".join(words), priority, category)
+
+
+def _list(status: Optional[str] = None) -> Command:
+    return "list_tasks", {"status": _STATUSES.get((status or "all").lower(), "all")}
+
+
+def _on_target(tool: str) -> Callable[[str], Optional[Command]]:
+    def command(text: str) -> Optional[Command]:
+        target = _target(text)
+        return (tool, target) if target else None
+    return command
+
+
+def _search(query: str) -> Optional[Command]:
+    query = query.strip(" \"'")
+    return ("search_tasks", {"query": query}) if query else None
+
+
+def _rename(task_id: str, title: str) -> Optional[Command]:
+    title = title.strip(" \"'")
+    return ("update_task", {"task_id": int(task_id), "new_title": title}) if title else None
+
+
+def _priority(task_id: str, priority: str) -> Command:
+    return "update_task", {"task_id": int(task_id), "new_priority": priority.lower()}
+
+
+def _with(pattern: str, handler: Callable[..., Optional[Command]]) -> Callable[[str], Optional[Command]]:
+    """A slash command whose argument must match `pattern`; its groups are the handler's arguments."""
+    def command(rest: str) -> Optional[Command]:
+        match = re.fullmatch(pattern, rest, re.I)
+        return handler(*match.groups()) if match else None
+    return command
+
+
+# Each takes the text after the command name ("" when there is none)
+_SLASH: Dict[str, Callable[[str], Optional[Command]]] = {
+    "add": _add_slash,
+    "list": _with(r"(all|pending|open|completed|done)?", _list),
+    "done": _on_target("complete_task"),
+    "complete": _on_target("complete_task"),
+    "delete": _on_target("delete_task"),
+    "search": _search,
+    "rename": _with(r"#?(\d+) (.+)", _rename),
+    "priority": _with(r"#?(\d+) (high|medium|low)", _priority),
+    "stats": _with(r"", lambda: ("get_task_analytics", {})),
+    "clear": _with(r"", lambda: ("clear_completed", {})),
+}
+
+_TASK = r"(?:a |an |the |my )?(?:new )?(?:task|todo|to-do)"
+_PATTERNS: List[Tuple[re.Pattern, Callable[..., Optional[Command]]]] = [
+    (re.compile(p, re.I), handler) for p, handler in (
+        # clear before delete: "delete completed tasks" is not a task name
+        (r"(?:clear|delete|remove)(?: all)?(?: my| the)? (?:completed|done|finished)(?: tasks| todos)?", lambda: ("clear_completed", {})),
+        (rf"(?:add|create|new) {_TASK}(?: to| called| named)?:? (.+?)(?:,? with (high|medium|low) priority|,? \((high|medium|low)\))?",
+         lambda title, p1, p2: _add(title, p1 or p2)),
+        (r"remind me to (.+)", _add),
+        (r"(?:list|show)(?: me)?(?: all)?(?: my| the)?(?: (pending|open|incomplete|unfinished|completed|done|finished|all))?(?: tasks| todos)?", _list),
+        (r"(?:what are )?my (?:(pending|open|completed|done) )?tasks", _list),
+        (r"(pending|open|completed|done|finished) tasks", _list),
+        (rf"(?:complete|finish|check off)(?: task)? (.+?){_ON_LIST}", _on_target("complete_task")),
+        (rf"mark (.+?){_ON_LIST} as (?:done|complete|completed|finished)", _on_target("complete_task")),
+        (r"(.+?) is done", lambda text: _on_target("complete_task")(text) if re.fullmatch(r"(?:task )?#?\d+", text, re.I) else None),
+        (rf"(?:delete|remove)(?: task)? (.+?){_ON_LIST}", _on_target("delete_task")),
+        (r"(?:search|find|search for|look for)(?: tasks?)?(?: for| about| with)? (.+)", _search),
+        (r"rename(?: task)? #?(\d+) to (.+)", _rename),
+        (r"(?:set|make|mark)(?: task)? #?(\d+)(?: priority)?(?: to| as)? (high|medium|low)(?: priority)?", _priority),
+        (r"(?:show |get )?(?:my )?(?:task )?(?:stats|statistics|analytics)", lambda: ("get_task_analytics", {})),
+    )
+]
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(r"^(?:please|pls|can you|could you)\s+", "", text, flags=re.I)
+    text = re.sub(r"(?:[\s,]+(?:please|pls))?[.!?\s]*$", "", text, flags=re.I)
+    return text
+
+
+def parse(text: str) -> Optional[Command]:
+    """(tool name, args) for a recognized command, None for everything else."""
+    if len(text) > 200 or "\n" in text.strip():
+        return None
+    text = _normalize(text)
+    if text.startswith("/"):
+        name, _, rest = text[1:].partition(" ")
+        handler = _SLASH.get(name.lower())
+        return handler(rest.strip()) if handler else None
+    for pattern, handler in _PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            command = handler(*match.groups())
+            if command:
+                return command
+    return None
+
+
+class IntentRouter:
+    """parse() over chat turns, counting how many of them skip the model."""
+
+    def __init__(self):
+        self.counts = {"messages": 0, "hits": 0}
+        self.tools: Dict[str, int] = {}
+
+    def route(self, text: str) -> Optional[Command]:
+        if not settings.chat_intent_router:
+            return None
+        command = parse(text)
+        self.counts["messages"] += 1
+        if command:
+            self.counts["hits"] += 1
+            self.tools[command[0]] = self.tools.get(command[0], 0) + 1
+        return command
+
+    def stats(self) -> Dict[str, Any]:
+        messages = self.counts["messages"]
+        return {
+            "enabled": settings.chat_intent_router,
+            **self.counts,
+            "hit_rate": round(self.counts["hits"] / messages, 3) if messages else None,
+            "tools": dict(self.tools),
+        }
+
+
+# Shared by both chat endpoints in the process
+intent_router = IntentRouter()
@@ -0,0 +1,117 @@
+"""
+Long-lived HTTP clients for the chat endpoint's model providers.
+
+A client built per request (`OpenAI(...)`, `httpx.AsyncClient()`) opens a
+new TCP + TLS connection for every model call, twice per chat turn that
+runs a tool. The clients here are created once per process, at startup,
+and keep their connections open between turns; with HTTP/2 (when `h2` is
+installed) concurrent calls to a provider share one connection.
+
+Each provider also has a semaphore bounding its requests in flight, so a
+burst of chats queues in the process instead of opening connections until
+the provider starts refusing them.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import os
+import httpx
+from openai import AsyncOpenAI
+from backend.core.config import settings
+
+try:
+    import h2  # noqa: F401 (httpx's HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+OPENROUTER_HEADERS = {"HTTP-Referer": "https://vercel.app", "X-Title": "TodoApp"}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+    )
+
+
+class ProviderClients:
+    """
+    The shared clients, created on first use when start() was not called
+    (scripts, serverless cold paths). Call close() before the event loop
+    they were used on ends.
+    """
+
+    def __init__(self):
+        self.http2 = settings.llm_http2 and HTTP2_AVAILABLE
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._openrouter: Optional[AsyncOpenAI] = None
+        self._slots = {
+            "openrouter": asyncio.Semaphore(settings.openrouter_max_concurrency),
+            "gemini": asyncio.Semaphore(settings.gemini_max_concurrency),
+        }
+        self._in_flight = {provider: 0 for provider in self._slots}
+
+    def http(self, provider: str) -> httpx.AsyncClient:
+        """The provider's pooled async HTTP client, based at its API URL."""
+        client = self._http.get(provider)
+        if client is None:
+            base_url = settings.openrouter_base_url if provider == "openrouter" else settings.gemini_base_url
+            client = httpx.AsyncClient(base_url=base_url, http2=self.http2, limits=_limits())
+            self._http[provider] = client
+        return client
+
+    def openrouter(self) -> AsyncOpenAI:
+        if self._openrouter is None:
+            self._openrouter = AsyncOpenAI(
+                base_url=settings.openrouter_base_url,
+                api_key=_openrouter_key(),
+                default_headers=OPENROUTER_HEADERS,
+                http_client=self.http("openrouter"),
+                max_retries=0,  # fail fast: core/provider_router.py moves on to Gemini
+            )
+        return self._openrouter
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """Hold one of the provider's concurrent request slots (for a stream, until it ends)."""
+        async with self._slots[provider]:
+            self._in_flight[provider] += 1
+            try:
+                yield
+            finally:
+                self._in_flight[provider] -= 1
+
+    async def start(self) -> None:
+        """Create the clients and, with settings.llm_warmup, open a first connection to each provider."""
+        clients = [self.http("openrouter"), self.http("gemini")]
+        if settings.llm_warmup:
+            await asyncio.gather(*(_warm(client) for client in clients))
+
+    async def close(self) -> None:
+        """Close every connection (the app's shutdown); clients are recreated if used again."""
+        clients, self._http = list(self._http.values()), {}
+        for client in clients:
+            await client.aclose()
+        self._openrouter = None
+
+    def stats(self) -> Dict[str, object]:
+        return {"http2": self.http2, "in_flight": dict(self._in_flight)}
+
+
+def _openrouter_key() -> str:
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key: raise Exception("Missing OPENROUTER_API_KEY")
+    return api_key
+
+
+async def _warm(client: httpx.AsyncClient) -> None:
+    """Any response (even 404) leaves the connection, TLS included, in the pool."""
+    try:
+        await asyncio.wait_for(client.head(""), settings.llm_warmup_timeout_seconds)
+    except Exception as e:
+        print(f"LLM client warm-up failed for {client.base_url}: {e}")
+
+
+llm_clients = ProviderClients()
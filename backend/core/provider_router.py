@@ -0,0 +1,251 @@
+"""
+Routing of chat model calls between providers: circuit breakers, hedging
+and per-provider metrics.
+
+`first` runs one model call against providers in order of preference and
+returns the first answer:
+
+- A provider whose circuit is open is skipped, so while OpenRouter is down
+  chats go straight to Gemini instead of each waiting for it to fail. The
+  circuit opens when too many of the provider's recent calls failed or were
+  slow, and after a pause lets one probe call through (half-open): the
+  probe's outcome closes it or opens it again.
+- Hedging: if the preferred provider has not answered within its p95
+  latency, the next one is asked too and the first answer wins (the other
+  call is cancelled). Only side-effect-free calls go through here; tools
+  run once, on the winning answer.
+- Every call has a timeout, so a hung provider costs at most that.
+
+The state is per process and only touched from the event loop.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from backend.core.config import settings
+
+
+class ProviderUnavailable(Exception):
+    """Every provider asked for is behind an open circuit."""
+
+
+class CircuitBreaker:
+    """closed -> open (too many failures) -> half-open (one probe) -> closed or open."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self._window = deque(maxlen=settings.llm_breaker_window)  # True for each failed call
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Whether a call may start now; in half-open, the one probe call."""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < settings.llm_breaker_open_seconds:
+                return False
+            self.state = "half-open"
+        if self.state == "half-open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def record(self, failed: Optional[bool]) -> None:
+        """A started call's outcome; None when it gave none (cancelled early)."""
+        if self.state == "half-open":
+            self._probing = False
+            if failed is not None:
+                self._window.clear()
+                self._set("open" if failed else "closed")
+            return
+        if failed is None or self.state == "open":
+            return
+        self._window.append(failed)
+        if (len(self._window) >= settings.llm_breaker_min_calls
+                and sum(self._window) / len(self._window) >= settings.llm_breaker_failure_rate):
+            self._window.clear()
+            self._set("open")
+
+    def _set(self, state: str) -> None:
+        if state == "open":
+            self._opened_at = time.monotonic()
+        if state != self.state:
+            print(f"⚡ {self.name} circuit {state}")
+        self.state = state
+
+
+class ProviderStats:
+    """One provider's breaker and call metrics."""
+
+    def __init__(self, name: str):
+        self.breaker = CircuitBreaker(name)
+        self.latencies = deque(maxlen=500)  # seconds, successful calls
+        self.counts = {"calls": 0, "errors": 0, "slow": 0, "cancelled": 0, "rejected": 0, "hedged": 0, "hedge_wins": 0}
+
+    def record(self, seconds: float, ok: Optional[bool], overtaken: bool = False) -> None:
+        """
+        ok: True (answered), False (raised or timed out), None (cancelled).
+        overtaken: cancelled because a hedge started while it ran answered first.
+        """
+        slow = seconds >= settings.llm_breaker_slow_seconds
+        self.counts["calls"] += 1
+        if ok:
+            self.latencies.append(seconds)
+            self.counts["slow"] += slow
+        elif ok is False:
+            self.counts["errors"] += 1
+        else:
+            self.counts["cancelled"] += 1
+        # A call cancelled before it was slow says nothing about the provider.
+        # One overtaken by a hedge that won was slower than its p95 and beaten:
+        # it counts against its circuit like a failure, or a provider that only
+        # ever loses (down, browning out) would never trip
+        if ok is None and not (slow or overtaken):
+            self.breaker.record(None)
+        else:
+            self.breaker.record(ok is False or slow or overtaken)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def hedge_delay(self) -> float:
+        """How long to wait for this provider before asking the next one."""
+        p95 = self.percentile(0.95) if len(self.latencies) >= 20 else None
+        if p95 is None:
+            return settings.llm_hedge_max_seconds
+        return min(max(p95, settings.llm_hedge_min_seconds), settings.llm_hedge_max_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            **self.counts,
+            "circuit": self.breaker.state,
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+
+class ProviderRouter:
+    def __init__(self):
+        self._providers: Dict[str, ProviderStats] = {}
+
+    def provider(self, name: str) -> ProviderStats:
+        if name not in self._providers:
+            self._providers[name] = ProviderStats(name)
+        return self._providers[name]
+
+    async def first(self, calls: List[Tuple[str, Callable[[], Awaitable[Any]]]]) -> Tuple[str, Any]:
+        """
+        (provider, result) of the first of `calls` [(provider, make_call)],
+        in order of preference, to answer. The next provider starts when the
+        running one fails, or, with hedging, when it is slower than its p95.
+        Raises the last call's error, or ProviderUnavailable if no circuit
+        let a call through.
+        """
+        queue = list(calls)
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+        overtaken = set()  # calls that were still running when a hedge started
+        beaten = set()  # overtaken calls whose hedge answered first
+        error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            while queue:
+                name, make_call = queue.pop(0)
+                stats = self.provider(name)
+                if stats.breaker.allow():
+                    task = asyncio.ensure_future(self._timed(stats, make_call, beaten))
+                    task.add_done_callback(_retrieve)
+                    running[task] = (name, time.monotonic())
+                    return True
+                stats.counts["rejected"] += 1
+            return False
+
+        launch()
+        try:
+            while running:
+                timeout = None
+                if queue and settings.llm_hedge_enabled:
+                    name, started = min(running.values(), key=lambda item: item[1])
+                    timeout = max(0.0, started + self.provider(name).hedge_delay() - time.monotonic())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = list(running)
+                    if launch():
+                        overtaken.update(hedged)
+                        for task in hedged:
+                            self.provider(running[task][0]).counts["hedged"] += 1
+                    continue
+                for task in done:
+                    name, _ = running.pop(task)
+                    if task.exception() is None:
+                        if running:
+                            self.provider(name).counts["hedge_wins"] += 1
+                        # Recorded by _timed when the cancellation below reaches them
+                        beaten.update(running.keys() & overtaken)
+                        return name, task.result()
+                    error = task.exception()
+                if not running:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+        raise error or ProviderUnavailable(f"circuit open for {', '.join(name for name, _ in calls)}")
+
+    async def stream(self, name: str, events: AsyncIterator) -> AsyncIterator:
+        """
+        Pass a provider's stream through its circuit (ProviderUnavailable
+        before anything is sent if open), recording time to the first item
+        as its latency.
+        """
+        stats = self.provider(name)
+        if not stats.breaker.allow():
+            stats.counts["rejected"] += 1
+            raise ProviderUnavailable(f"circuit open for {name}")
+        start = time.monotonic()
+        first, ok = None, None
+        try:
+            async with aclosing(events):
+                async for item in events:
+                    if first is None:
+                        first = time.monotonic() - start
+                    yield item
+            ok = True
+        except Exception:
+            ok = False
+            raise
+        finally:
+            stats.record(first if first is not None else time.monotonic() - start, ok)
+
+    async def _timed(self, stats: ProviderStats, make_call: Callable[[], Awaitable[Any]], beaten: set) -> Any:
+        """One call with its timeout; its outcome is recorded here, once."""
+        start = time.monotonic()
+        ok = None
+        try:
+            result = await asyncio.wait_for(make_call(), settings.llm_call_timeout_seconds)
+            ok = True
+            return result
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            ok = False
+            raise
+        finally:
+            stats.record(time.monotonic() - start, ok, overtaken=asyncio.current_task() in beaten)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.snapshot() for name, stats in self._providers.items()}
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    """Mark a losing call's error as seen (it is recorded in the metrics)."""
+    if not task.cancelled():
+        task.exception()
+
+
+# Shared by both chat endpoints in the process
+provider_router = ProviderRouter()
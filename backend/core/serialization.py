@@ -0,0 +1,71 @@
+"""
+Fast JSON responses for list endpoints.
+
+When an endpoint returns objects, FastAPI validates them against the
+response_model and then serializes the validated copy, so every row of a
+list response is checked and converted again after it was read. Rows that
+come straight from the database as column dicts are already valid:
+`json_response` encodes them in one orjson call and returns the bytes, and
+the endpoint's response_model only describes the schema in OpenAPI.
+
+`event_stream` does the same for server-sent events.
+"""
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Tuple
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from backend.models.types import utc_isoformat
+
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return utc_isoformat(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain data (dicts, lists, scalars, datetimes) the way the API's models serialize it."""
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> Response:
+    """
+    A ready-made JSON response for `content`, bypassing response_model.
+
+    Pass the endpoint's injected `response` to keep the headers set on it
+    (ETag, X-Next-Cursor): FastAPI only merges them into responses it builds.
+    """
+    fast = Response(dumps(content), media_type="application/json")
+    if response is not None:
+        fast.headers.raw.extend(response.headers.raw)
+    return fast
+
+
+# A server-sent event as (event name, data, id or None); None sends a keep-alive comment
+ServerSentEvent = Optional[Tuple[str, Any, Any]]
+
+
+def sse_event(event: str, data: Any, event_id: Any = None) -> bytes:
+    """One event; `data` is JSON-encoded (orjson output never contains a newline)."""
+    head = b"id: %s\n" % str(event_id).encode() if event_id is not None else b""
+    return head + b"event: %s\ndata: %s\n\n" % (event.encode(), dumps(data))
+
+
+async def _sse_chunks(events: AsyncIterator[ServerSentEvent], retry_ms: Optional[int]) -> AsyncIterator[bytes]:
+    if retry_ms is not None:
+        yield b"retry: %d\n\n" % retry_ms
+    async for item in events:
+        yield b": keep-alive\n\n" if item is None else sse_event(*item)
+
+
+def event_stream(events: AsyncIterator[ServerSentEvent], retry_ms: Optional[int] = 3000) -> StreamingResponse:
+    """
+    A text/event-stream response, one chunk per event as it is produced.
+    Event ids are what clients send back as Last-Event-ID when they
+    reconnect (after retry_ms).
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # no proxy buffering
+    return StreamingResponse(_sse_chunks(events, retry_ms), media_type="text/event-stream", headers=headers)
@@ -0,0 +1,74 @@
+"""
+Task events published through the Dapr sidecar (todo-pubsub, topic
+task-events).
+
+One pooled client per process keeps its connections to the sidecar open,
+so an event costs a request instead of a new connection, and the events
+of a batch are sent concurrently: a batch waits at most about one timeout
+for all of them, not one per event. Publishing is best effort. A failed
+event is logged and dropped; the write that produced it has already
+committed.
+"""
+import asyncio
+import time
+from typing import List, Optional
+import httpx
+from backend.core.config import settings
+from backend.models.task import Task
+
+PUBLISH_URL = "http://localhost:3500/v1.0/publish/todo-pubsub/task-events"
+TIMEOUT_SECONDS = 1.0
+KEEPALIVE_CONNECTIONS = 20
+
+
+class TaskEventPublisher:
+    """
+    The shared sidecar client, created on first use. A client belongs to
+    the event loop that created it; a new loop (scripts calling
+    asyncio.run more than once) gets a new one.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Room for a full batch at once (the sidecar is local), so a stalled
+            # sidecar costs a batch one timeout rather than one per pool-sized wave
+            limits = httpx.Limits(
+                max_connections=settings.task_batch_max_size, max_keepalive_connections=KEEPALIVE_CONNECTIONS
+            )
+            self._client = httpx.AsyncClient(timeout=TIMEOUT_SECONDS, limits=limits)
+            self._loop = loop
+        return self._client
+
+    async def completed(self, tasks: List[Task]) -> None:
+        """Publish a 'completed' event for each task, concurrently."""
+        if tasks:
+            client = self.client()
+            await asyncio.gather(*(self._publish(client, "completed", task) for task in tasks))
+
+    async def _publish(self, client: httpx.AsyncClient, event_type: str, task: Task) -> None:
+        try:
+            payload = {
+                "event_type": event_type,
+                "task_id": task.id,
+                "user_id": task.user_id,
+                "timestamp": str(time.time()),
+                "data": task.model_dump(mode="json")
+            }
+            await client.post(PUBLISH_URL, json=payload)
+        except Exception as e:
+            print(f"⚠️ Failed to publish task event: {e}")
+
+    async def close(self) -> None:
+        """Close the client's connections (the app's shutdown)."""
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+
+# Shared by every request in the process
+task_events = TaskEventPublisher()
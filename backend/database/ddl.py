@@ -0,0 +1,382 @@
+"""
+Dialect-specific DDL that SQLModel.metadata cannot express.
+
+Derived structures (the task_tags table, the task_stats counters, the
+per-user data versions, task change stamps and tombstones, the SQLite
+full-text index) are kept in sync with
+`tasks` and `chat_messages` by database triggers, so every writer -
+repositories, consumers, cron jobs, one-off scripts and bulk statements -
+maintains them inside its own transaction. Postgres uses statement-level
+triggers over transition tables (one set-based statement per write
+statement); SQLite uses row-level triggers.
+
+The installers are idempotent and are applied by the versioned migrations in
+backend/database/migrations.py.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+# --- task_tags ---------------------------------------------------------------
+
+# Postgres: tags may be a json or jsonb column depending on how the table was
+# created, so everything goes through ::jsonb and ignores non-array values.
+_PG_TAGS_OF = "jsonb_array_elements_text(CASE WHEN jsonb_typeof({row}.tags::jsonb) = 'array' THEN {row}.tags::jsonb ELSE '[]'::jsonb END)"
+
+PG_TASK_TAGS = [
+    f"""
+    CREATE OR REPLACE FUNCTION task_tags_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO task_tags (task_id, user_id, tag)
+            SELECT DISTINCT n.id, n.user_id, t.tag
+            FROM new_rows n, {_PG_TAGS_OF.format(row="n")} AS t(tag);
+        ELSIF TG_OP = 'UPDATE' THEN
+            DELETE FROM task_tags tt
+            USING old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE tt.task_id = o.id
+              AND (o.tags::jsonb IS DISTINCT FROM n.tags::jsonb OR o.user_id IS DISTINCT FROM n.user_id);
+            INSERT INTO task_tags (task_id, user_id, tag)
+            SELECT DISTINCT n.id, n.user_id, t.tag
+            FROM old_rows o JOIN new_rows n ON n.id = o.id, {_PG_TAGS_OF.format(row="n")} AS t(tag)
+            WHERE o.tags::jsonb IS DISTINCT FROM n.tags::jsonb OR o.user_id IS DISTINCT FROM n.user_id;
+        ELSE
+            DELETE FROM task_tags tt USING old_rows o WHERE tt.task_id = o.id;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    "DROP TRIGGER IF EXISTS task_tags_ai ON tasks",
+    "DROP TRIGGER IF EXISTS task_tags_au ON tasks",
+    "DROP TRIGGER IF EXISTS task_tags_ad ON tasks",
+    """CREATE TRIGGER task_tags_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION task_tags_sync()""",
+    """CREATE TRIGGER task_tags_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION task_tags_sync()""",
+    """CREATE TRIGGER task_tags_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION task_tags_sync()""",
+    "DELETE FROM task_tags",
+    f"""INSERT INTO task_tags (task_id, user_id, tag)
+        SELECT DISTINCT tasks.id, tasks.user_id, t.tag FROM tasks, {_PG_TAGS_OF.format(row="tasks")} AS t(tag)""",
+]
+
+# SQLite: CASE short-circuits, so json_type() never sees malformed JSON
+_SQLITE_TAGS_OF = "json_each(COALESCE(CASE WHEN json_valid({row}.tags) THEN CASE WHEN json_type({row}.tags) = 'array' THEN {row}.tags END END, '[]'))"
+
+SQLITE_TASK_TAGS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_tags_ai AFTER INSERT ON tasks BEGIN
+        INSERT OR IGNORE INTO task_tags (task_id, user_id, tag)
+        SELECT NEW.id, NEW.user_id, value FROM {_SQLITE_TAGS_OF.format(row="NEW")} WHERE type = 'text';
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_tags_au AFTER UPDATE OF tags, user_id ON tasks BEGIN
+        DELETE FROM task_tags WHERE task_id = OLD.id;
+        INSERT OR IGNORE INTO task_tags (task_id, user_id, tag)
+        SELECT NEW.id, NEW.user_id, value FROM {_SQLITE_TAGS_OF.format(row="NEW")} WHERE type = 'text';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_tags_ad AFTER DELETE ON tasks BEGIN
+        DELETE FROM task_tags WHERE task_id = OLD.id;
+    END
+    """,
+    "DELETE FROM task_tags",
+    f"""INSERT OR IGNORE INTO task_tags (task_id, user_id, tag)
+        SELECT tasks.id, tasks.user_id, value FROM tasks, {_SQLITE_TAGS_OF.format(row="tasks")} WHERE type = 'text'""",
+]
+
+
+# --- full-text search ---------------------------------------------------------
+
+# Postgres: an expression GIN index needs no sync. Queries must use this exact
+# expression (with literal arguments) for the planner to match the index.
+PG_TASK_SEARCH_DOCUMENT = "to_tsvector('simple', coalesce(tasks.description, '') || ' ' || coalesce(tasks.category, ''))"
+
+PG_TASK_SEARCH = [
+    f"CREATE INDEX IF NOT EXISTS ix_tasks_fts ON tasks USING gin ({PG_TASK_SEARCH_DOCUMENT})",
+]
+
+# SQLite: an external-content FTS5 table over tasks, synced by triggers
+SQLITE_TASK_SEARCH = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(description, category, content='tasks', content_rowid='id')",
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, description, category) VALUES (NEW.id, NEW.description, NEW.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF description, category ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, description, category) VALUES ('delete', OLD.id, OLD.description, OLD.category);
+        INSERT INTO tasks_fts (rowid, description, category) VALUES (NEW.id, NEW.description, NEW.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, description, category) VALUES ('delete', OLD.id, OLD.description, OLD.category);
+    END
+    """,
+    "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+]
+
+
+# --- task_stats --------------------------------------------------------------
+
+_STATS_COLUMNS = "user_id, total, completed, high, medium, low"
+_STATS_INCREMENT = ", ".join(
+    f"{c} = {{target}}.{c} + excluded.{c}" for c in ("total", "completed", "high", "medium", "low")
+)
+
+# Postgres: fold each statement's changed rows into one signed delta per user
+_PG_STATS_UPSERT = f"""
+            INSERT INTO task_stats AS s ({_STATS_COLUMNS})
+            SELECT user_id, sum(sign),
+                   sum(CASE WHEN completed THEN sign ELSE 0 END),
+                   sum(CASE WHEN priority = 'high' THEN sign ELSE 0 END),
+                   sum(CASE WHEN priority = 'medium' THEN sign ELSE 0 END),
+                   sum(CASE WHEN priority = 'low' THEN sign ELSE 0 END)
+            FROM ({{deltas}}) d
+            GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET {_STATS_INCREMENT.format(target="s")};"""
+
+_PG_STATS_CHANGED = "(o.user_id, o.completed, lower(o.priority)) IS DISTINCT FROM (n.user_id, n.completed, lower(n.priority))"
+
+_PG_STATS_UPDATE_DELTAS = f"""
+                SELECT o.user_id, o.completed, lower(o.priority) AS priority, -1 AS sign
+                FROM old_rows o JOIN new_rows n ON n.id = o.id WHERE {_PG_STATS_CHANGED}
+                UNION ALL
+                SELECT n.user_id, n.completed, lower(n.priority), 1
+                FROM old_rows o JOIN new_rows n ON n.id = o.id WHERE {_PG_STATS_CHANGED}"""
+
+PG_TASK_STATS = [
+    f"""
+    CREATE OR REPLACE FUNCTION task_stats_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{_PG_STATS_UPSERT.format(deltas="SELECT user_id, completed, lower(priority) AS priority, 1 AS sign FROM new_rows")}
+        ELSIF TG_OP = 'UPDATE' THEN{_PG_STATS_UPSERT.format(deltas=_PG_STATS_UPDATE_DELTAS)}
+        ELSE{_PG_STATS_UPSERT.format(deltas="SELECT user_id, completed, lower(priority) AS priority, -1 AS sign FROM old_rows")}
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    "DROP TRIGGER IF EXISTS task_stats_ai ON tasks",
+    "DROP TRIGGER IF EXISTS task_stats_au ON tasks",
+    "DROP TRIGGER IF EXISTS task_stats_ad ON tasks",
+    """CREATE TRIGGER task_stats_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION task_stats_sync()""",
+    """CREATE TRIGGER task_stats_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION task_stats_sync()""",
+    """CREATE TRIGGER task_stats_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION task_stats_sync()""",
+    "DELETE FROM task_stats",
+    f"""INSERT INTO task_stats ({_STATS_COLUMNS})
+        SELECT user_id, count(*),
+               sum(CASE WHEN completed THEN 1 ELSE 0 END),
+               sum(CASE WHEN lower(priority) = 'high' THEN 1 ELSE 0 END),
+               sum(CASE WHEN lower(priority) = 'medium' THEN 1 ELSE 0 END),
+               sum(CASE WHEN lower(priority) = 'low' THEN 1 ELSE 0 END)
+        FROM tasks GROUP BY user_id""",
+]
+
+# SQLite: one upsert per affected row; booleans and comparisons are 0/1
+_SQLITE_STATS_UPSERT = f"""
+        INSERT INTO task_stats ({_STATS_COLUMNS}) VALUES (
+            {{row}}.user_id, {{sign}}, {{sign}} * {{row}}.completed,
+            {{sign}} * (lower({{row}}.priority) = 'high'),
+            {{sign}} * (lower({{row}}.priority) = 'medium'),
+            {{sign}} * (lower({{row}}.priority) = 'low'))
+        ON CONFLICT (user_id) DO UPDATE SET {_STATS_INCREMENT.format(target="task_stats")};"""
+
+SQLITE_TASK_STATS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_ai AFTER INSERT ON tasks BEGIN{_SQLITE_STATS_UPSERT.format(row="NEW", sign="1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_au AFTER UPDATE OF user_id, completed, priority ON tasks BEGIN{_SQLITE_STATS_UPSERT.format(row="OLD", sign="-1")}{_SQLITE_STATS_UPSERT.format(row="NEW", sign="1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_ad AFTER DELETE ON tasks BEGIN{_SQLITE_STATS_UPSERT.format(row="OLD", sign="-1")}
+    END
+    """,
+    "DELETE FROM task_stats",
+    f"""INSERT INTO task_stats ({_STATS_COLUMNS})
+        SELECT user_id, count(*), sum(completed),
+               sum(lower(priority) = 'high'), sum(lower(priority) = 'medium'), sum(lower(priority) = 'low')
+        FROM tasks GROUP BY user_id""",
+]
+
+
+# --- user_data_versions --------------------------------------------------------
+
+# Tables whose writes change what a user sees from GET /api/tasks and /api/chat/history
+VERSIONED_TABLES = ("tasks", "chat_messages")
+
+_PG_VERSION_BUMP = """
+            INSERT INTO user_data_versions AS v (user_id, version)
+            SELECT user_id, 1 FROM ({users}) u WHERE user_id IS NOT NULL ORDER BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET version = v.version + 1;"""
+
+PG_DATA_VERSIONS = [
+    f"""
+    CREATE OR REPLACE FUNCTION user_data_version_bump() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{_PG_VERSION_BUMP.format(users="SELECT DISTINCT user_id FROM new_rows")}
+        ELSIF TG_OP = 'UPDATE' THEN{_PG_VERSION_BUMP.format(users="SELECT user_id FROM old_rows UNION SELECT user_id FROM new_rows")}
+        ELSE{_PG_VERSION_BUMP.format(users="SELECT DISTINCT user_id FROM old_rows")}
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+]
+for _table in VERSIONED_TABLES:
+    PG_DATA_VERSIONS += [
+        f"DROP TRIGGER IF EXISTS {_table}_version_ai ON {_table}",
+        f"DROP TRIGGER IF EXISTS {_table}_version_au ON {_table}",
+        f"DROP TRIGGER IF EXISTS {_table}_version_ad ON {_table}",
+        f"""CREATE TRIGGER {_table}_version_ai AFTER INSERT ON {_table} REFERENCING NEW TABLE AS new_rows
+           FOR EACH STATEMENT EXECUTE FUNCTION user_data_version_bump()""",
+        f"""CREATE TRIGGER {_table}_version_au AFTER UPDATE ON {_table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+           FOR EACH STATEMENT EXECUTE FUNCTION user_data_version_bump()""",
+        f"""CREATE TRIGGER {_table}_version_ad AFTER DELETE ON {_table} REFERENCING OLD TABLE AS old_rows
+           FOR EACH STATEMENT EXECUTE FUNCTION user_data_version_bump()""",
+    ]
+
+# SQLite: the WHERE clause lets the parser accept ON CONFLICT after INSERT ... SELECT
+_SQLITE_VERSION_BUMP = """
+        INSERT INTO user_data_versions (user_id, version) SELECT {user}, 1 WHERE {condition}
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;"""
+
+SQLITE_DATA_VERSIONS = []
+for _table in VERSIONED_TABLES:
+    SQLITE_DATA_VERSIONS += [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {_table}_version_ai AFTER INSERT ON {_table} BEGIN{_SQLITE_VERSION_BUMP.format(user="NEW.user_id", condition="NEW.user_id IS NOT NULL")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {_table}_version_au AFTER UPDATE ON {_table} BEGIN{_SQLITE_VERSION_BUMP.format(user="NEW.user_id", condition="NEW.user_id IS NOT NULL")}{_SQLITE_VERSION_BUMP.format(user="OLD.user_id", condition="OLD.user_id IS NOT NEW.user_id")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {_table}_version_ad AFTER DELETE ON {_table} BEGIN{_SQLITE_VERSION_BUMP.format(user="OLD.user_id", condition="OLD.user_id IS NOT NULL")}
+        END
+        """,
+    ]
+
+
+# --- task change tracking -------------------------------------------------------
+
+# Every task write stamps the row with updated_at (and created_at on insert)
+# and a per-user change sequence number; deletes leave a tombstone carrying
+# one. The sequence is the user's data version: the write holds the user's
+# user_data_versions row locked until commit and stamps version + 1, which is
+# what user_data_version_bump then advances the counter to, so a number only
+# becomes visible once every smaller one for that user has committed. That
+# is what lets GET /api/tasks/changes use the version as its cursor.
+
+# Postgres: a BEFORE ROW trigger can set NEW directly; it runs before the
+# statement-level version bump above, and COPY fires it too.
+PG_TASK_CHANGES = [
+    """
+    CREATE OR REPLACE FUNCTION task_change_stamp() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        owner text;
+        current_version bigint;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            owner := OLD.user_id;
+        ELSE
+            owner := NEW.user_id;
+        END IF;
+        SELECT version INTO current_version FROM user_data_versions WHERE user_id = owner FOR UPDATE;
+        IF NOT FOUND THEN
+            INSERT INTO user_data_versions (user_id, version) VALUES (owner, 0) ON CONFLICT (user_id) DO NOTHING;
+            SELECT version INTO current_version FROM user_data_versions WHERE user_id = owner FOR UPDATE;
+        END IF;
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO task_tombstones (task_id, user_id, change_seq, deleted_at)
+            VALUES (OLD.id, owner, current_version + 1, now())
+            ON CONFLICT (task_id) DO UPDATE
+            SET user_id = excluded.user_id, change_seq = excluded.change_seq, deleted_at = excluded.deleted_at;
+            RETURN OLD;
+        END IF;
+        IF TG_OP = 'INSERT' THEN
+            NEW.created_at := coalesce(NEW.created_at, now());
+        END IF;
+        NEW.updated_at := now();
+        NEW.change_seq := current_version + 1;
+        RETURN NEW;
+    END $$
+    """,
+    "DROP TRIGGER IF EXISTS task_change_stamp ON tasks",
+    """CREATE TRIGGER task_change_stamp BEFORE INSERT OR UPDATE OR DELETE ON tasks
+       FOR EACH ROW EXECUTE FUNCTION task_change_stamp()""",
+]
+
+# SQLite: triggers cannot assign NEW, so the tasks version triggers are
+# replaced by ones that bump the counter and then stamp the row (or write
+# the tombstone) with it. The stamping UPDATE changes change_seq, which the
+# WHEN clause uses to keep it from triggering another stamp. SQLite's
+# RETURNING does not see these values; callers that need them re-read the row.
+_SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+_SQLITE_USER_VERSION = "coalesce((SELECT version FROM user_data_versions WHERE user_id = {row}.user_id), 0)"
+
+SQLITE_TASK_CHANGES = [
+    "DROP TRIGGER IF EXISTS tasks_version_ai",
+    "DROP TRIGGER IF EXISTS tasks_version_au",
+    "DROP TRIGGER IF EXISTS tasks_version_ad",
+    f"""
+    CREATE TRIGGER tasks_version_ai AFTER INSERT ON tasks BEGIN{_SQLITE_VERSION_BUMP.format(user="NEW.user_id", condition="NEW.user_id IS NOT NULL")}
+        UPDATE tasks SET change_seq = {_SQLITE_USER_VERSION.format(row="NEW")},
+                         created_at = coalesce(created_at, {_SQLITE_NOW}), updated_at = {_SQLITE_NOW}
+        WHERE id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_version_au AFTER UPDATE ON tasks WHEN NEW.change_seq IS OLD.change_seq BEGIN{_SQLITE_VERSION_BUMP.format(user="NEW.user_id", condition="NEW.user_id IS NOT NULL")}{_SQLITE_VERSION_BUMP.format(user="OLD.user_id", condition="OLD.user_id IS NOT NEW.user_id")}
+        UPDATE tasks SET change_seq = {_SQLITE_USER_VERSION.format(row="NEW")}, updated_at = {_SQLITE_NOW}
+        WHERE id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_version_ad AFTER DELETE ON tasks BEGIN{_SQLITE_VERSION_BUMP.format(user="OLD.user_id", condition="OLD.user_id IS NOT NULL")}
+        INSERT INTO task_tombstones (task_id, user_id, change_seq, deleted_at)
+        VALUES (OLD.id, OLD.user_id, {_SQLITE_USER_VERSION.format(row="OLD")}, {_SQLITE_NOW})
+        ON CONFLICT (task_id) DO UPDATE
+        SET user_id = excluded.user_id, change_seq = excluded.change_seq, deleted_at = excluded.deleted_at;
+    END
+    """,
+]
+
+
+def _run(conn: Connection, statements: dict) -> None:
+    for statement in statements.get(conn.dialect.name, []):
+        conn.execute(text(statement))
+
+
+def install_task_tags(conn: Connection) -> None:
+    """Create the task_tags sync triggers and backfill the table from tasks.tags."""
+    _run(conn, {"postgresql": PG_TASK_TAGS, "sqlite": SQLITE_TASK_TAGS})
+
+
+def install_task_search(conn: Connection) -> None:
+    """Create the full-text index over task description and category."""
+    _run(conn, {"postgresql": PG_TASK_SEARCH, "sqlite": SQLITE_TASK_SEARCH})
+
+
+def install_task_stats(conn: Connection) -> None:
+    """Create the task_stats counter triggers and seed the counters from tasks."""
+    _run(conn, {"postgresql": PG_TASK_STATS, "sqlite": SQLITE_TASK_STATS})
+
+
+def install_data_versions(conn: Connection) -> None:
+    """Create the triggers that bump user_data_versions on task and message writes."""
+    _run(conn, {"postgresql": PG_DATA_VERSIONS, "sqlite": SQLITE_DATA_VERSIONS})
+
+
+def install_task_changes(conn: Connection) -> None:
+    """Create the triggers that stamp task writes with a change sequence and record deletes."""
+    _run(conn, {"postgresql": PG_TASK_CHANGES, "sqlite": SQLITE_TASK_CHANGES})
@@ -0,0 +1,253 @@
+"""
+Versioned schema migrations.
+
+Each migration has a version number and runs in its own transaction together
+with the insert that records it in schema_migrations, so a failed migration
+leaves no trace and is retried on the next run. Every step is idempotent, so
+databases created by the old create_all / migrate_*.py scripts converge to
+the same schema as fresh ones.
+
+Startup calls `migrate(engine)`. When the database is current that is a
+single SELECT of the recorded version. Run this module directly to apply
+migrations ahead of a deploy:
+
+    python -m backend.database.migrations
+"""
+from typing import Callable, List, Tuple
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlmodel import SQLModel
+
+# Register every table with the metadata the baseline creates
+from backend.models.user import User  # noqa: F401
+from backend.models.task import Task  # noqa: F401
+from backend.models.conversation import Conversation  # noqa: F401
+from backend.models.chat_message import ChatMessage  # noqa: F401
+from backend.models.data_version import UserDataVersion  # noqa: F401
+from backend.models.schema_migration import SchemaMigration
+from backend.models.types import UTCDateTime, as_utc, utcnow
+from backend.database.ddl import (
+    install_data_versions, install_task_changes, install_task_search, install_task_stats, install_task_tags,
+)
+
+
+def create_tables(conn: Connection) -> None:
+    """Create any table in the SQLModel metadata that does not exist yet."""
+    SQLModel.metadata.create_all(conn)
+
+
+# Columns added to existing tables by the former migrate_*.py scripts:
+# (table, column, {dialect: column DDL})
+LEGACY_COLUMNS = [
+    ("tasks", "tags", {"postgresql": "JSONB DEFAULT '[]'::jsonb", "sqlite": "JSON DEFAULT '[]'"}),
+    ("tasks", "due_date", {"postgresql": "VARCHAR", "sqlite": "VARCHAR"}),
+    ("tasks", "is_recurring", {"postgresql": "BOOLEAN DEFAULT FALSE", "sqlite": "BOOLEAN DEFAULT 0"}),
+    ("tasks", "recurrence_pattern", {"postgresql": "VARCHAR", "sqlite": "VARCHAR"}),
+    ("tasks", "next_occurrence", {"postgresql": "VARCHAR", "sqlite": "VARCHAR"}),
+    ("tasks", "notification_sent", {"postgresql": "BOOLEAN DEFAULT FALSE", "sqlite": "BOOLEAN DEFAULT 0"}),
+    ("chat_messages", "conversation_id", {"postgresql": "INTEGER", "sqlite": "INTEGER"}),
+    ("conversations", "session_id", {"postgresql": "UUID DEFAULT gen_random_uuid()", "sqlite": "CHAR(32)"}),
+    ("user", "name", {"postgresql": "VARCHAR", "sqlite": "VARCHAR"}),
+    ("user", "password_hash", {"postgresql": "VARCHAR", "sqlite": "VARCHAR"}),
+    ("user", "email_verified", {"postgresql": "BOOLEAN DEFAULT FALSE", "sqlite": "BOOLEAN DEFAULT 0"}),
+    ("user", "image", {"postgresql": "VARCHAR", "sqlite": "VARCHAR"}),
+    ("user", "created_at", {"postgresql": "TIMESTAMP WITH TIME ZONE", "sqlite": "DATETIME"}),
+    ("user", "updated_at", {"postgresql": "TIMESTAMP WITH TIME ZONE", "sqlite": "DATETIME"}),
+]
+
+
+def add_legacy_columns(conn: Connection) -> None:
+    """Add columns that tables created before they existed are missing."""
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table, column, ddl in LEGACY_COLUMNS:
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        if column in existing:
+            continue
+        conn.execute(text(f"ALTER TABLE {quote(table)} ADD COLUMN {column} {ddl[conn.dialect.name]}"))
+        if (table, column) == ("conversations", "session_id"):
+            if conn.dialect.name == "sqlite":
+                # SQLite cannot default to a random value; fill existing rows here
+                conn.execute(text(
+                    "UPDATE conversations SET session_id = lower(hex(randomblob(16))) WHERE session_id IS NULL"
+                ))
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ix_conversations_session_id ON conversations (session_id)"
+            ))
+
+
+# Composite indexes for the per-user queries every request runs
+HOT_PATH_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_tasks_user_completed ON tasks (user_id, completed)",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_user_due_date ON tasks (user_id, due_date)",
+    "CREATE INDEX IF NOT EXISTS ix_chat_messages_user_conversation_timestamp "
+    "ON chat_messages (user_id, conversation_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_conversations_user_updated_at ON conversations (user_id, updated_at)",
+]
+
+
+def create_hot_path_indexes(conn: Connection) -> None:
+    """Create the composite indexes behind task filters, history and the conversation list."""
+    for statement in HOT_PATH_INDEXES:
+        conn.execute(text(statement))
+
+
+# Columns that used to hold ISO 8601 strings: (table, column, nullable)
+TIMESTAMP_COLUMNS = [
+    ("tasks", "due_date", True),
+    ("tasks", "next_occurrence", True),
+    ("chat_messages", "timestamp", False),
+    ("conversations", "created_at", False),
+    ("conversations", "updated_at", False),
+]
+
+# Parses the stored strings; values without an offset were written as UTC.
+# Unparseable values become NULL rather than failing the migration.
+PG_PARSE_TIMESTAMP = r"""
+CREATE OR REPLACE FUNCTION pg_temp.parse_utc_timestamp(value text) RETURNS timestamptz LANGUAGE plpgsql AS $$
+BEGIN
+    IF value IS NULL OR btrim(value) = '' THEN
+        RETURN NULL;
+    END IF;
+    IF value ~ '\d{2}:\d{2}(:\d{2}(\.\d+)?)?\s*(Z|[+-]\d{2}(:?\d{2})?)$' THEN
+        RETURN value::timestamptz;
+    END IF;
+    RETURN value::timestamp AT TIME ZONE 'UTC';
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END $$
+"""
+
+# Pending reminders due before a threshold (the cron job's only query)
+REMINDER_INDEX = {
+    "postgresql": "CREATE INDEX IF NOT EXISTS ix_tasks_reminder_due ON tasks (due_date) "
+                  "WHERE NOT completed AND NOT notification_sent",
+    "sqlite": "CREATE INDEX IF NOT EXISTS ix_tasks_reminder_due ON tasks (due_date) "
+              "WHERE completed = 0 AND notification_sent = 0",
+}
+
+
+def convert_timestamp_columns(conn: Connection) -> None:
+    """Turn the ISO string columns into timezone-aware timestamps and index reminders."""
+    quote = conn.dialect.identifier_preparer.quote
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(PG_PARSE_TIMESTAMP))
+        for table, column, nullable in TIMESTAMP_COLUMNS:
+            data_type = conn.execute(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+            ), {"table": table, "column": column}).scalar()
+            if data_type == "timestamp with time zone":
+                continue
+            parsed = f"pg_temp.parse_utc_timestamp({quote(column)}::text)"
+            if not nullable:
+                parsed = f"COALESCE({parsed}, now())"
+            conn.execute(text(
+                f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(column)} TYPE TIMESTAMPTZ USING {parsed}"
+            ))
+    else:
+        # SQLite columns are untyped: rewrite the values in the format UTCDateTime stores
+        for table, column, nullable in TIMESTAMP_COLUMNS:
+            rows = conn.execute(text(
+                f"SELECT rowid, {quote(column)} FROM {quote(table)} WHERE {quote(column)} IS NOT NULL"
+            )).all()
+            update = text(f"UPDATE {quote(table)} SET {quote(column)} = :value WHERE rowid = :rowid").bindparams(
+                bindparam("value", type_=UTCDateTime())
+            )
+            for rowid, value in rows:
+                try:
+                    value = as_utc(value)
+                except (TypeError, ValueError):
+                    value = None if nullable else utcnow()
+                conn.execute(update, {"rowid": rowid, "value": value})
+    conn.execute(text(REMINDER_INDEX[conn.dialect.name]))
+
+
+# Change tracking columns: (column, {dialect: column DDL})
+TASK_CHANGE_COLUMNS = [
+    ("created_at", {"postgresql": "TIMESTAMP WITH TIME ZONE", "sqlite": "DATETIME"}),
+    ("updated_at", {"postgresql": "TIMESTAMP WITH TIME ZONE", "sqlite": "DATETIME"}),
+    ("change_seq", {"postgresql": "BIGINT NOT NULL DEFAULT 0", "sqlite": "BIGINT NOT NULL DEFAULT 0"}),
+]
+
+
+def track_task_changes(conn: Connection) -> None:
+    """Add task timestamps, change sequence and tombstones, stamp existing rows, install the triggers."""
+    create_tables(conn)  # task_tombstones
+    existing = {c["name"] for c in inspect(conn).get_columns("tasks")}
+    for column, ddl in TASK_CHANGE_COLUMNS:
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE tasks ADD COLUMN {column} {ddl[conn.dialect.name]}"))
+    # Existing rows count as changed at the owner's next version, so clients
+    # syncing from any earlier cursor receive them once
+    conn.execute(text(
+        "UPDATE tasks SET created_at = coalesce(created_at, :now), updated_at = coalesce(updated_at, :now), "
+        "change_seq = coalesce((SELECT version FROM user_data_versions v WHERE v.user_id = tasks.user_id), 0) + 1 "
+        "WHERE change_seq = 0"
+    ).bindparams(bindparam("now", type_=UTCDateTime())), {"now": utcnow()})
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_user_change_seq ON tasks (user_id, change_seq)"))
+    install_task_changes(conn)
+
+
+# (version, name, apply); append only - never renumber or edit an applied step
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "baseline_tables", create_tables),
+    (2, "legacy_columns", add_legacy_columns),
+    (3, "hot_path_indexes", create_hot_path_indexes),
+    (4, "task_tags", install_task_tags),
+    (5, "task_search", install_task_search),
+    (6, "task_stats", install_task_stats),
+    (7, "data_versions", install_data_versions),
+    (8, "native_timestamps", convert_timestamp_columns),
+    (9, "task_changes", track_task_changes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(engine: Engine) -> int:
+    """Highest applied migration version (0 for a database never migrated)."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT max(version) FROM schema_migrations")).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return 0  # schema_migrations does not exist yet
+
+
+def _lock(conn: Connection) -> None:
+    """Serialize concurrent migrators (cold starts); the lock ends with the transaction."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))"))
+
+
+def migrate(engine: Engine) -> int:
+    """Apply every pending migration in order; returns the resulting version."""
+    version = current_version(engine)
+    if version >= LATEST_VERSION:
+        return version
+
+    with engine.begin() as conn:
+        _lock(conn)
+        SchemaMigration.__table__.create(conn, checkfirst=True)
+
+    for number, name, apply in MIGRATIONS:
+        with engine.begin() as conn:
+            _lock(conn)
+            applied = conn.execute(
+                text("SELECT 1 FROM schema_migrations WHERE version = :version"), {"version": number}
+            ).first()
+            if not applied:
+                apply(conn)
+                conn.execute(SchemaMigration.__table__.insert().values(
+                    **SchemaMigration(version=number, name=name).model_dump()
+                ))
+                print(f"Applied migration {number:04d} {name}")
+        version = number
+    return version
+
+
+if __name__ == "__main__":
+    from backend.database.session import engine
+
+    print(f"Schema at version {migrate(engine)}")
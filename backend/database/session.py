@@ -1,22 +1,33 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.core.config import settings
 
 
 # Create the database engine with connection pooling for performance
 # CRITICAL: Neon DB pooler does NOT support statement_timeout in options
-engine = create_engine(
-    settings.database_url,
-    echo=False,  # Set to True for debugging SQL queries
-    pool_pre_ping=True,  # Test connections before use (handles stale connections)
-    pool_size=10,  # Number of connections to maintain in the pool
-    max_overflow=20,  # Max additional connections beyond pool_size
-    pool_recycle=3600,  # Recycle connections after 1 hour (3600 seconds)
-    connect_args={
-        "connect_timeout": 10,  # Connection timeout in seconds
-        # NOTE: Removed "options": "-c statement_timeout=30000" 
-        # because Neon's transaction pooler doesn't support it
-    }
-)
+if settings.database_url.startswith("sqlite"):
+    # Local development database (sqlite3 has no connect_timeout argument)
+    engine = create_engine(
+        settings.database_url,
+        echo=False,
+        connect_args={"check_same_thread": False}
+    )
+else:
+    engine = create_engine(
+        settings.database_url,
+        echo=False,  # Set to True for debugging SQL queries
+        pool_pre_ping=True,  # Test connections before use (handles stale connections)
+        pool_size=10,  # Number of connections to maintain in the pool
+        max_overflow=20,  # Max additional connections beyond pool_size
+        pool_recycle=3600,  # Recycle connections after 1 hour (3600 seconds)
+        connect_args={
+            "connect_timeout": 10,  # Connection timeout in seconds
+            # NOTE: Removed "options": "-c statement_timeout=30000" 
+            # because Neon's transaction pooler doesn't support it
+        }
+    )
 
 
 def get_session():
@@ -31,4 +42,43 @@ def get_session():
         except:
             print(f"FAILED TO WRITE DB LOG: {e}")
         print(f"DB CONNECTION ERROR: {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+
+def async_database_url(url: str) -> str:
+    """The same database through an asyncio driver (psycopg 3 async / aiosqlite)."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if url.get_backend_name() == "postgresql" and url.drivername not in ("postgresql+psycopg", "postgresql+asyncpg"):
+        return url.set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine for the request path: queries await the socket instead of
+# holding a worker thread, so one worker serves many concurrent requests.
+# The sync engine above remains for migrations, scripts and the auth/cron endpoints.
+if settings.database_url.startswith("sqlite"):
+    async_engine = create_async_engine(async_database_url(settings.database_url), echo=False)
+else:
+    async_engine = create_async_engine(
+        async_database_url(settings.database_url),
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,
+        connect_args={"connect_timeout": 10}
+    )
+
+
+async def get_async_session():
+    """
+    Request-scoped AsyncSession.
+
+    expire_on_commit=False: objects returned by a repository stay readable
+    after its commit, where an expired attribute would need a lazy load
+    (which asyncio sessions cannot do implicitly).
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
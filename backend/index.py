@@ -21,8 +21,14 @@ from contextlib import asynccontextmanager
 from backend.api.v1.endpoints import tasks, auth, chat, conversations, cron, events
 from backend.core.config import settings
 
-from sqlmodel import SQLModel
 from backend.database.session import engine
+from backend.database.migrations import migrate
+from backend.core.cache import task_cache
+from backend.core.change_hub import task_changes
+from backend.core.intent_router import intent_router
+from backend.core.llm_clients import llm_clients
+from backend.core.provider_router import provider_router
+from backend.core.task_events import task_events
 
 # Disable redirect_slashes to avoid 307 redirects
 app = FastAPI(title="Todo API", version="1.0.0", redirect_slashes=False)
@@ -30,14 +36,29 @@ app = FastAPI(title="Todo API", version="1.0.0", redirect_slashes=False)
 
 @app.on_event("startup")
 def on_startup():
-    """Create database tables on startup"""
+    """Bring the schema up to date (a single version check when it already is)"""
     try:
-        SQLModel.metadata.create_all(engine)
-        print("Database tables created/verified")
+        print(f"Database schema at version {migrate(engine)}")
     except Exception as e:
         print(f"Database initialization warning: {e}")
 
 
+@app.on_event("startup")
+async def start_llm_clients():
+    """Create the shared chat provider clients and open their first connections"""
+    await llm_clients.start()
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await llm_clients.close()
+
+
+@app.on_event("shutdown")
+async def close_task_events():
+    await task_events.close()
+
+
 # CORS middleware - Allow all origins for Vercel deployment
 app.add_middleware(
     CORSMiddleware,
@@ -75,7 +96,15 @@ def dapr_subscribe():
 
 @app.get("/api/health")
 def health_check():
-    return {"status": "healthy", "environment": "production" if os.getenv("VERCEL") else "development"}
+    return {
+        "status": "healthy",
+        "environment": "production" if os.getenv("VERCEL") else "development",
+        "task_cache": task_cache.stats(),
+        "task_streams": task_changes.stats(),
+        "llm_clients": llm_clients.stats(),
+        "llm_providers": provider_router.stats(),
+        "chat_commands": intent_router.stats()
+    }
 
 
 @app.get("/")
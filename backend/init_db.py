@@ -1,16 +1,10 @@
-from sqlmodel import SQLModel
 from backend.database.session import engine
-# Explicitly import models to register them with metadata
-from backend.models.user import User
-from backend.models.task import Task
-from backend.models.conversation import Conversation
-from backend.models.chat_message import ChatMessage
+from backend.database.migrations import migrate
 
 def init_db():
     print("Initializing database...")
     try:
-        SQLModel.metadata.create_all(engine)
-        print("Tables created successfully!")
+        print(f"Schema migrated to version {migrate(engine)}")
     except Exception as e:
         print(f"Error creating tables: {e}")
 
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from sqlmodel import SQLModel, Field
 from typing import Optional
-from datetime import datetime
+from backend.models.types import ApiDateTime, UTCDateTime, utcnow
 
 
 # SQLModel table for chat messages
@@ -14,7 +14,7 @@ class ChatMessage(SQLModel, table=True):
     role: str  # 'user' or 'assistant'
     content: str
     source: Optional[str] = None  # AI source used (e.g., "OpenRouter", "Google")
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: ApiDateTime = Field(default_factory=utcnow, sa_type=UTCDateTime)
 
 
 # Pydantic models for API
@@ -31,5 +31,5 @@ class ChatMessageRead(BaseModel):
     role: str
     content: str
     source: Optional[str] = None
-    timestamp: str
+    timestamp: ApiDateTime
     conversation_id: Optional[int] = None
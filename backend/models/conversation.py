@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from sqlmodel import SQLModel, Field
 from typing import Optional
-from datetime import datetime
+from backend.models.types import ApiDateTime, UTCDateTime, utcnow
 import uuid
 
 
@@ -13,8 +13,8 @@ class Conversation(SQLModel, table=True):
     session_id: uuid.UUID = Field(default_factory=uuid.uuid4, unique=True, index=True)
     user_id: str = Field(index=True)  # Links to user.id
     title: str = "New Chat"  # Conversation title
-    created_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
-    updated_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    created_at: ApiDateTime = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    updated_at: ApiDateTime = Field(default_factory=utcnow, sa_type=UTCDateTime)
 
 
 # Pydantic models for API
@@ -26,5 +26,5 @@ class ConversationRead(BaseModel):
     id: int
     session_id: uuid.UUID
     title: str
-    created_at: str
-    updated_at: str
+    created_at: ApiDateTime
+    updated_at: ApiDateTime
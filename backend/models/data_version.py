@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+
+
+# Per-user counter bumped by database triggers on every task or chat message
+# write (see backend/database/ddl.py); used as the ETag for conditional GETs.
+class UserDataVersion(SQLModel, table=True):
+    __tablename__ = "user_data_versions"
+
+    user_id: str = Field(primary_key=True)
+    version: int = 0
@@ -1,7 +1,8 @@
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import List, Literal, Optional
+from pydantic import BaseModel, model_validator
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON
+from sqlalchemy import BigInteger, Column, Index, JSON
+from backend.models.types import ApiDateTime, UTCDateTime
 
 # SQLModel table that maps to the existing 'tasks' table in Neon DB
 class Task(SQLModel, table=True):
@@ -14,12 +15,55 @@ class Task(SQLModel, table=True):
     priority: str = "Medium"
     tags: List[str] = Field(default=[], sa_column=Column(JSON))
     # Recurring Task Fields
-    due_date: Optional[str] = None  # ISO8601 string
+    due_date: Optional[ApiDateTime] = Field(default=None, sa_type=UTCDateTime)
     is_recurring: bool = False
     recurrence_pattern: Optional[str] = None  # e.g., "daily", "cron: 0 9 * * *"
-    next_occurrence: Optional[str] = None
+    next_occurrence: Optional[ApiDateTime] = Field(default=None, sa_type=UTCDateTime)
     notification_sent: bool = Field(default=False)
     user_id: str = Field(index=True)
+    # Change tracking, set by database triggers on every write (see
+    # backend/database/ddl.py); change_seq is the owner's data version at the
+    # task's last change and orders GET /api/tasks/changes.
+    created_at: Optional[ApiDateTime] = Field(default=None, sa_type=UTCDateTime)
+    updated_at: Optional[ApiDateTime] = Field(default=None, sa_type=UTCDateTime)
+    change_seq: int = Field(default=0, sa_type=BigInteger, sa_column_kwargs={"server_default": "0"})
+
+
+# One row per (task, tag), derived from Task.tags by database triggers
+# (see backend/database/ddl.py) so tag filters are an index lookup.
+class TaskTag(SQLModel, table=True):
+    __tablename__ = "task_tags"
+    __table_args__ = (Index("ix_task_tags_user_tag", "user_id", "tag", "task_id"),)
+
+    task_id: int = Field(primary_key=True)
+    tag: str = Field(primary_key=True)
+    user_id: str
+
+
+# Left behind by deleted tasks (by database triggers) so delta sync can
+# report deletions; change_seq is the owner's data version at the delete.
+class TaskTombstone(SQLModel, table=True):
+    __tablename__ = "task_tombstones"
+    __table_args__ = (Index("ix_task_tombstones_user_change_seq", "user_id", "change_seq"),)
+
+    task_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    user_id: str
+    change_seq: int = Field(sa_type=BigInteger)
+    deleted_at: ApiDateTime = Field(sa_type=UTCDateTime)
+
+
+# Per-user task counters, maintained by database triggers when
+# settings.task_stats_counters is enabled (see backend/database/ddl.py).
+class TaskStats(SQLModel, table=True):
+    __tablename__ = "task_stats"
+
+    user_id: str = Field(primary_key=True)
+    total: int = 0
+    completed: int = 0
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+
 
     # Pydantic models for API request/response
     # ...
@@ -30,7 +74,7 @@ class TaskCreate(BaseModel):
     category: str = "General"
     priority: str = "Medium"
     tags: List[str] = []
-    due_date: Optional[str] = None
+    due_date: Optional[ApiDateTime] = None
     is_recurring: bool = False
     recurrence_pattern: Optional[str] = None
 
@@ -42,7 +86,7 @@ class TaskRead(BaseModel):
     category: str
     priority: str
     tags: List[str] = []
-    due_date: Optional[str] = None
+    due_date: Optional[ApiDateTime] = None
     is_recurring: bool
     recurrence_pattern: Optional[str] = None
     notification_sent: bool = False
@@ -55,6 +99,54 @@ class TaskUpdate(BaseModel):
     category: Optional[str] = None
     priority: Optional[str] = None
     tags: Optional[List[str]] = None
-    due_date: Optional[str] = None
+    due_date: Optional[ApiDateTime] = None
     is_recurring: Optional[bool] = None
-    recurrence_pattern: Optional[str] = None
\ No newline at end of file
+    recurrence_pattern: Optional[str] = None
+
+
+class TaskBatchOperation(BaseModel):
+    op: Literal["create", "update", "complete", "delete"]
+    task_id: Optional[int] = None  # required for update/complete/delete
+    task: Optional[TaskCreate] = None  # required for create
+    changes: Optional[TaskUpdate] = None  # required for update
+    completed: bool = True  # used by complete
+
+    @model_validator(mode="after")
+    def check_arguments(self):
+        if self.op == "create" and self.task is None:
+            raise ValueError("'create' operations need 'task'")
+        if self.op != "create" and self.task_id is None:
+            raise ValueError(f"'{self.op}' operations need 'task_id'")
+        if self.op == "update" and self.changes is None:
+            raise ValueError("'update' operations need 'changes'")
+        return self
+
+
+class TaskBatchRequest(BaseModel):
+    operations: List[TaskBatchOperation]
+
+
+class TaskBatchResult(BaseModel):
+    index: int  # position in the request's operations list
+    op: str
+    status: Literal["ok", "not_found"]
+    task_id: Optional[int] = None
+    task: Optional[Task] = None  # current state after the batch (None for deletes)
+
+
+class TaskImportError(BaseModel):
+    line: int  # line of the upload the record starts on (CSV header is line 1)
+    error: str
+
+
+class TaskImportResult(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[TaskImportError] = []  # the first settings.task_import_max_errors failures
+
+
+class TaskChanges(BaseModel):
+    changes: List[Task] = []  # current state of tasks created or updated after `since`
+    deleted: List[int] = []  # ids of tasks deleted after `since`; apply before `changes`
+    cursor: int  # pass as `since` on the next call
+    reset: bool = False  # `since` is unknown to the server: `changes` replaces the local copy
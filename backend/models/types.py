@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+from typing import Annotated, Optional, Union
+from pydantic import PlainSerializer
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+def utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: Union[datetime, str]) -> datetime:
+    """Parse/normalize to an aware UTC datetime; naive values are taken as UTC."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def utc_isoformat(value: datetime) -> str:
+    """The API's timestamp format: naive ISO 8601 in UTC, as datetime.utcnow().isoformat() produced."""
+    return as_utc(value).replace(tzinfo=None).isoformat()
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware timestamp column (TIMESTAMPTZ on Postgres).
+
+    Accepts datetimes or ISO strings and always returns aware UTC datetimes.
+    SQLite has no timezone support, so values are stored there as naive UTC.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[Union[datetime, str]], dialect) -> Optional[datetime]:
+        if value is None:
+            return None
+        value = as_utc(value)
+        return value.replace(tzinfo=None) if dialect.name == "sqlite" else value
+
+    def process_result_value(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        return None if value is None else as_utc(value)
+
+
+# datetime field that keeps the previous string format in JSON responses
+ApiDateTime = Annotated[datetime, PlainSerializer(utc_isoformat, return_type=str, when_used="json")]
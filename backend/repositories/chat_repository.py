@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence
 from sqlmodel import Session, select, delete
-from backend.models.chat_message import ChatMessage, ChatMessageCreate
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.models.chat_message import ChatMessage, ChatMessageCreate, ChatMessageRead
 from backend.models.conversation import Conversation
-from datetime import datetime
+from backend.models.types import utcnow
 
 
 class ChatRepository:
@@ -33,13 +34,36 @@ class ChatRepository:
         
         return db_message
     
-    def get_user_messages(self, session: Session, user_id: str, limit: Optional[int] = None) -> List[ChatMessage]:
-        """Get all messages for a specific user, ordered by timestamp."""
+    def _user_messages_query(self, user_id: str, limit: Optional[int]):
         query = select(ChatMessage).where(ChatMessage.user_id == user_id).order_by(ChatMessage.timestamp)
         if limit:
             query = query.limit(limit)
-        result = session.exec(query)
+        return query
+
+    def _recent_messages_query(self, user_id: str, limit: int, conversation_id: Optional[int]):
+        """Newest first; callers reverse the result into chronological order."""
+        query = select(ChatMessage).where(ChatMessage.user_id == user_id)
+        
+        if conversation_id is not None:
+            query = query.where(ChatMessage.conversation_id == conversation_id)
+        
+        return query.order_by(ChatMessage.timestamp.desc()).limit(limit)
+
+    def _message_rows(self, session: Session, query) -> List[dict]:
+        """Run a select(ChatMessage) query as ChatMessageRead-shaped column dicts (no ORM objects)."""
+        columns = [ChatMessage.__table__.c[name] for name in ChatMessageRead.model_fields]
+        result = session.connection().execute(query.with_only_columns(*columns))
+        keys = list(result.keys())
+        return [dict(zip(keys, row)) for row in result.all()]
+
+    def get_user_messages(self, session: Session, user_id: str, limit: Optional[int] = None) -> List[ChatMessage]:
+        """Get all messages for a specific user, ordered by timestamp."""
+        result = session.exec(self._user_messages_query(user_id, limit))
         return list(result.all())
+
+    def get_user_message_rows(self, session: Session, user_id: str, limit: Optional[int] = None) -> List[dict]:
+        """get_user_messages as column dicts."""
+        return self._message_rows(session, self._user_messages_query(user_id, limit))
     
     def get_recent_messages(
         self, 
@@ -49,16 +73,20 @@ class ChatRepository:
         conversation_id: Optional[int] = None
     ) -> List[ChatMessage]:
         """Get the most recent N messages for a user, optionally filtered by conversation."""
-        query = select(ChatMessage).where(ChatMessage.user_id == user_id)
-        
-        if conversation_id is not None:
-            query = query.where(ChatMessage.conversation_id == conversation_id)
-        
-        query = query.order_by(ChatMessage.timestamp.desc()).limit(limit)
-        
-        result = session.exec(query)
+        result = session.exec(self._recent_messages_query(user_id, limit, conversation_id))
         messages = list(result.all())
         return list(reversed(messages))  # Return in chronological order
+
+    def get_recent_message_rows(
+        self,
+        session: Session,
+        user_id: str,
+        limit: int = 10,
+        conversation_id: Optional[int] = None
+    ) -> List[dict]:
+        """get_recent_messages as column dicts."""
+        rows = self._message_rows(session, self._recent_messages_query(user_id, limit, conversation_id))
+        return list(reversed(rows))
     
     def clear_user_messages(self, session: Session, user_id: str) -> int:
         """Delete all messages for a user. Returns count of deleted messages."""
@@ -94,8 +122,8 @@ class ChatRepository:
         conversation = Conversation(
             user_id=user_id,
             title=title,
-            created_at=datetime.utcnow().isoformat(),
-            updated_at=datetime.utcnow().isoformat()
+            created_at=utcnow(),
+            updated_at=utcnow()
         )
         session.add(conversation)
         session.commit()
@@ -125,7 +153,7 @@ class ChatRepository:
         conversation = self.get_conversation(session, conversation_id, user_id)
         if conversation:
             conversation.title = title
-            conversation.updated_at = datetime.utcnow().isoformat()
+            conversation.updated_at = utcnow()
             session.add(conversation)
             session.commit()
             session.refresh(conversation)
@@ -153,6 +181,88 @@ class ChatRepository:
         """Update conversation's updated_at timestamp."""
         conversation = self.get_conversation(session, conversation_id, user_id)
         if conversation:
-            conversation.updated_at = datetime.utcnow().isoformat()
+            conversation.updated_at = utcnow()
             session.add(conversation)
             session.commit()
+
+
+class AsyncChatRepository:
+    """
+    ChatRepository for an AsyncSession (runs each method through
+    AsyncSession.run_sync; the streaming reader uses AsyncSession.stream).
+    """
+
+    def __init__(self):
+        self.sync = ChatRepository()
+
+    async def save_message(
+        self,
+        session: AsyncSession,
+        message: ChatMessageCreate,
+        user_id: str,
+        conversation_id: Optional[int] = None
+    ) -> ChatMessage:
+        return await session.run_sync(self.sync.save_message, message, user_id, conversation_id)
+
+    async def get_user_messages(self, session: AsyncSession, user_id: str, limit: Optional[int] = None) -> List[ChatMessage]:
+        return await session.run_sync(self.sync.get_user_messages, user_id, limit)
+
+    async def get_recent_messages(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        limit: int = 10,
+        conversation_id: Optional[int] = None
+    ) -> List[ChatMessage]:
+        return await session.run_sync(self.sync.get_recent_messages, user_id, limit, conversation_id)
+
+    async def get_user_message_rows(self, session: AsyncSession, user_id: str, limit: Optional[int] = None) -> List[dict]:
+        return await session.run_sync(self.sync.get_user_message_rows, user_id, limit)
+
+    async def get_recent_message_rows(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        limit: int = 10,
+        conversation_id: Optional[int] = None
+    ) -> List[dict]:
+        return await session.run_sync(self.sync.get_recent_message_rows, user_id, limit, conversation_id)
+
+    async def clear_user_messages(self, session: AsyncSession, user_id: str) -> int:
+        return await session.run_sync(self.sync.clear_user_messages, user_id)
+
+    async def delete_message(self, session: AsyncSession, message_id: int, user_id: str) -> bool:
+        return await session.run_sync(self.sync.delete_message, message_id, user_id)
+
+    async def create_conversation(self, session: AsyncSession, user_id: str, title: str = "New Chat") -> Conversation:
+        return await session.run_sync(self.sync.create_conversation, user_id, title)
+
+    async def get_user_conversations(self, session: AsyncSession, user_id: str) -> List[Conversation]:
+        return await session.run_sync(self.sync.get_user_conversations, user_id)
+
+    async def get_conversation(self, session: AsyncSession, conversation_id: int, user_id: str) -> Optional[Conversation]:
+        return await session.run_sync(self.sync.get_conversation, conversation_id, user_id)
+
+    async def update_conversation_title(
+        self, session: AsyncSession, conversation_id: int, user_id: str, title: str
+    ) -> Optional[Conversation]:
+        return await session.run_sync(self.sync.update_conversation_title, conversation_id, user_id, title)
+
+    async def delete_conversation(self, session: AsyncSession, conversation_id: int, user_id: str) -> bool:
+        return await session.run_sync(self.sync.delete_conversation, conversation_id, user_id)
+
+    async def touch_conversation(self, session: AsyncSession, conversation_id: int, user_id: str):
+        await session.run_sync(self.sync.touch_conversation, conversation_id, user_id)
+
+    async def stream_conversation_messages(
+        self, session: AsyncSession, conversation_id: int, user_id: str, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+        """Yield a conversation's messages oldest first, batch_size rows at a time, through a server-side cursor."""
+        result = await session.stream(
+            select(*ChatMessage.__table__.c)
+            .where(ChatMessage.conversation_id == conversation_id, ChatMessage.user_id == user_id)
+            .order_by(ChatMessage.timestamp, ChatMessage.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.mappings().partitions():
+            yield rows
@@ -0,0 +1,21 @@
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.models.data_version import UserDataVersion
+
+
+class DataVersionRepository:
+    """Repository for the per-user data version counter."""
+
+    def get_version(self, session: Session, user_id: str) -> int:
+        """Current data version for the user (0 if they have never written anything)."""
+        query = select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+        return session.exec(query).first() or 0
+
+
+class AsyncDataVersionRepository:
+    """DataVersionRepository for an AsyncSession."""
+
+    async def get_version(self, session: AsyncSession, user_id: str) -> int:
+        """Current data version for the user (0 if they have never written anything)."""
+        query = select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+        return (await session.exec(query)).first() or 0
@@ -1,24 +1,188 @@
+import base64
+import json
+import re
+from datetime import datetime
 from sqlmodel import Session, select
-from typing import List, Optional
-from backend.models.task import Task, TaskCreate
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy import and_, column, delete, func, insert, literal, literal_column, or_, table, text, update
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+from backend.core.cache import CacheBackend, task_cache
+from backend.core.change_hub import task_changes
+from backend.database.ddl import PG_TASK_SEARCH_DOCUMENT
+from backend.repositories.data_version_repository import DataVersionRepository
+from backend.models.data_version import UserDataVersion
+from backend.models.task import Task, TaskBatchOperation, TaskBatchResult, TaskCreate, TaskStats, TaskTag, TaskTombstone
+
+
+# Columns the task list may be ordered by. Every ordering is made total by
+# appending the primary key, which is what keyset pagination seeks on.
+SORTABLE_FIELDS = ("id", "description", "category", "priority", "completed", "due_date", "created_at", "updated_at")
+# Sortable timestamps written by the database's triggers rather than the ORM
+_TRIGGER_STAMPED = ("created_at", "updated_at")
+
+# Columns a client may select with ?fields= (every column of tasks).
+SELECTABLE_FIELDS = tuple(Task.__table__.c.keys())
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Validate a comma-separated ?fields= value against SELECTABLE_FIELDS.
+
+    Returns the names in table order with id always included (so equivalent
+    requests share a cache entry), or None for every column.
+    """
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names.difference(SELECTABLE_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(SELECTABLE_FIELDS)}"
+        )
+    return tuple(name for name in SELECTABLE_FIELDS if name == "id" or name in names)
+
+
+def encode_cursor(sort_by: str, order: str, value: Any, last_id: int) -> str:
+    """Encode the position after the last row of a page as an opaque token."""
+    if isinstance(value, datetime):
+        # Sent as ISO 8601; UTCDateTime parses it back when the cursor is bound
+        value = value.isoformat()
+    payload = json.dumps({"s": sort_by, "o": order, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> Tuple[Any, int]:
+    """Decode a cursor, rejecting tokens issued for a different ordering."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, last_id = payload["v"], int(payload["id"])
+        issued_for = (payload["s"], payload["o"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if issued_for != (sort_by, order):
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, last_id
+
+
+# SQLite full-text index over tasks (external-content FTS5 table, see ddl.py)
+tasks_fts = table("tasks_fts", column("rowid"), column("rank"))
+
+
+def search_terms(query: str) -> List[str]:
+    """Split free text into lowercase word tokens for the full-text index."""
+    return re.findall(r"\w+", query.lower())
 
 
 class TaskRepository:
-    def create_task(self, session: Session, task: TaskCreate, user_id: str) -> Task:
-        """Create a new task linked to the authenticated user."""
-        db_task = Task(
+    def __init__(self, cache: Optional[CacheBackend] = None):
+        # Task list reads go through this cache; every write method below
+        # invalidates the user's entries once its transaction has committed
+        self.cache = cache if cache is not None else task_cache
+
+    def _cached(
+        self, session: Session, user_id: str, key: Hashable, load: Callable[[], Tuple[List[dict], Any]]
+    ) -> Tuple[List[dict], Any]:
+        """
+        Read-through lookup for a (task rows, extra) query result.
+
+        Rows are plain column dicts, which is also what the cache stores, so a
+        hit is handed out as-is. The generation is taken before loading so a
+        result read across a concurrent write is not stored.
+
+        Entries are keyed on the user's data version as well: a write from
+        another process or straight SQL advances it (the triggers do), so the
+        next read misses instead of pairing the new ETag with an old body.
+        """
+        key = (self._data_version(session, user_id), key)
+        cached = self.cache.get(user_id, key)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation(user_id)
+        rows, extra = load()
+        self.cache.set(user_id, key, (rows, extra), generation)
+        return rows, extra
+
+    def _data_version(self, session: Session, user_id: str) -> int:
+        """
+        The user's data version: the one conditional_get read for this
+        request's ETag when it did (core/etag.py), else a primary-key lookup.
+        """
+        versions = session.info.get("data_versions", {})
+        if user_id in versions:
+            return versions[user_id]
+        return DataVersionRepository().get_version(session, user_id)
+
+    def _rows(self, session: Session, query, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """
+        Run a select(Task) query as column dicts, skipping ORM object construction.
+
+        Only `fields` are selected when given (see parse_fields); None selects every column.
+        """
+        columns = Task.__table__.c if fields is None else [Task.__table__.c[name] for name in fields]
+        result = session.connection().execute(query.with_only_columns(*columns))
+        keys = list(result.keys())
+        return [dict(zip(keys, row)) for row in result.all()]
+
+    def _list_key(
+        self,
+        priority: Optional[str],
+        tags: Optional[List[str]],
+        search: Optional[str],
+        key: str,
+        order: str,
+        tag_mode: str
+    ) -> tuple:
+        """Cache key for a filtered task list; equivalent filters share a key."""
+        return (
+            priority.lower() if priority else None,
+            tuple(sorted(set(tags))) if tags else (),
+            tuple(search_terms(search)) if search else (),
+            key,
+            order,
+            tag_mode if tags else "any",
+        )
+
+    def _invalidate(self, user_id: str) -> None:
+        """Drop the user's cached task lists and notify their change streams; call after the write has committed."""
+        self.cache.invalidate(user_id)
+        task_changes.publish(user_id)
+
+    def _new_task_values(self, task: TaskCreate, user_id: str) -> dict:
+        """Column values for a new task linked to the authenticated user."""
+        return dict(
             description=task.description,
             completed=task.completed,
             category=task.category,
             priority=task.priority,
             tags=task.tags,
+            due_date=task.due_date,
+            is_recurring=task.is_recurring,
+            recurrence_pattern=task.recurrence_pattern,
             user_id=user_id  # Link task to the authenticated user
         )
+
+    def create_task(self, session: Session, task: TaskCreate, user_id: str) -> Task:
+        """Create a new task linked to the authenticated user."""
+        db_task = Task(**self._new_task_values(task, user_id))
         session.add(db_task)
         session.commit()
+        self._invalidate(user_id)
         session.refresh(db_task)
         return db_task
 
+    def bulk_create_tasks(self, session: Session, user_id: str, tasks: List[TaskCreate]) -> None:
+        """Insert many tasks with one executemany INSERT and commit (no RETURNING, no ORM objects)."""
+        # render_nulls: keep None values in every row so the rows share one
+        # column list and go to the driver as a single executemany
+        session.execute(
+            insert(Task).execution_options(render_nulls=True),
+            [self._new_task_values(task, user_id) for task in tasks]
+        )
+        session.commit()
+        self._invalidate(user_id)
+
     def get_task(self, session: Session, task_id: int, user_id: str) -> Optional[Task]:
         """Get a task by ID, but only if it belongs to the user."""
         task = session.get(Task, task_id)
@@ -26,84 +190,669 @@ class TaskRepository:
             return task
         return None  # Return None if task doesn't exist or doesn't belong to user
 
-    def get_tasks(
-        self, 
-        session: Session, 
+    def get_task_row(
+        self, session: Session, task_id: int, user_id: str, fields: Optional[Tuple[str, ...]] = None
+    ) -> Optional[dict]:
+        """get_task as a column dict, selecting only `fields` when given."""
+        rows = self._rows(session, select(Task).where(Task.id == task_id, Task.user_id == user_id), fields)
+        return rows[0] if rows else None
+
+    def _sort_spec(self, sort_by: Optional[str], order: str) -> Tuple[str, str]:
+        """Normalize sort parameters; unknown fields fall back to insertion (id) order."""
+        key = sort_by if sort_by in SORTABLE_FIELDS else "id"
+        return key, "desc" if order == "desc" else "asc"
+
+    def _fts5_match(self, terms: List[str]):
+        """MATCH clause for the SQLite FTS5 table; quoting keeps terms literal."""
+        return text("tasks_fts MATCH :fts_query").bindparams(
+            fts_query=" ".join(f'"{t}"*' for t in terms)
+        )
+
+    def _search_match(self, session: Session, terms: List[str]):
+        """
+        Full-text match for the search terms (each term is a prefix match).
+
+        Returns (condition, rank): a WHERE clause restricting Task rows to matches
+        and a sort expression that puts the best match first (None if unranked).
+        On SQLite the rank column is only valid once tasks_fts is joined.
+        """
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            document = literal_column(PG_TASK_SEARCH_DOCUMENT)
+            tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{t}:*" for t in terms))
+            return document.op("@@")(tsquery), func.ts_rank(document, tsquery).desc()
+        if dialect == "sqlite":
+            return Task.id.in_(select(tasks_fts.c.rowid).where(self._fts5_match(terms))), tasks_fts.c.rank
+
+        # No full-text index on other dialects: fall back to substring matching
+        condition = and_(*[
+            Task.description.ilike(f"%{t}%") | Task.category.ilike(f"%{t}%") for t in terms
+        ])
+        return condition, None
+
+    def _filtered_query(
+        self,
+        session: Session,
         user_id: str,
         priority: Optional[str] = None,
         tags: Optional[List[str]] = None,
         search: Optional[str] = None,
-        sort_by: Optional[str] = None,
-        order: str = "asc"
-    ) -> List[Task]:
-        """Get tasks with filtering, searching, and sorting."""
+        tag_mode: str = "any",
+    ):
+        """Base SELECT for a user's tasks with all filters applied in SQL."""
         query = select(Task).where(Task.user_id == user_id)
-        
+
         # 1. Filter by Priority
         if priority:
             query = query.where(Task.priority.ilike(priority))
-            
-        # 2. Search (Title/Description) - checking description as title is not in DB schema yet?
-        # Wait, Task model has 'description', but TaskCreate has 'title'. 
-        # In current schema, 'title' is likely stored in description or separate?
-        # Looking at Task model: just description. 'title' in TaskCreate is transient?
-        # Let's check how create_task uses title. 
-        # Answer: It ignores title or appends.
-        # So we search description.
-        if search:
-            query = query.where(
-                (Task.description.ilike(f"%{search}%")) | 
-                (Task.category.ilike(f"%{search}%"))
-            )
-            
-        # 3. Sort
-        if sort_by:
-            attr = getattr(Task, sort_by, None)
-            if attr:
-                if order == "desc":
-                    query = query.order_by(attr.desc())
-                else:
-                    query = query.order_by(attr.asc())
-        
-        # Execute
-        tasks = list(session.exec(query).all())
-        
-        # 4. Filter by Tags (Python-side filtering for JSON compatibility)
+
+        # 2. Filter by Tags through the (user_id, tag) index on task_tags
         if tags:
-            filtered_tasks = []
-            for t in tasks:
-                if t.tags and any(tag in t.tags for tag in tags):
-                    filtered_tasks.append(t)
-            return filtered_tasks
-            
-        return tasks
+            query = query.where(Task.id.in_(self._tagged_task_ids(user_id, tags, tag_mode)))
+
+        # 3. Full-text search over description (TaskCreate.title is stored as the description) and category
+        if search:
+            terms = search_terms(search)
+            if terms:
+                query = query.where(self._search_match(session, terms)[0])
+        return query
+
+    def _sort_expression(self, session: Session, key: str, value=None):
+        """
+        The sort column (or a value bound as it), as orderings and cursors compare it.
+
+        SQLite stores timestamps as text. Its triggers stamp created_at and
+        updated_at with millisecond precision while the ORM binds
+        microseconds, so both sides are brought to the triggers' format there;
+        otherwise a cursor value would never equal the row it was taken from.
+        """
+        expression = getattr(Task, key) if value is None else value
+        if key in _TRIGGER_STAMPED and session.get_bind().dialect.name == "sqlite":
+            return func.strftime("%Y-%m-%d %H:%M:%f", expression)
+        return expression
+
+    def _order_by(self, session: Session, query, key: str, order: str):
+        """Apply a total ordering of (sort key, id); NULL sort keys always come last."""
+        column = self._sort_expression(session, key)
+        descending = order == "desc"
+        if key != "id":
+            if Task.__table__.c[key].nullable:
+                query = query.order_by(column.is_(None))
+            query = query.order_by(column.desc() if descending else column.asc())
+        return query.order_by(Task.id.desc() if descending else Task.id.asc())
+
+    def _after_cursor(self, session: Session, key: str, order: str, value: Any, last_id: int):
+        """Keyset predicate selecting the rows that sort strictly after (value, last_id)."""
+        descending = order == "desc"
+        id_after = Task.id < last_id if descending else Task.id > last_id
+        if key == "id":
+            return id_after
+
+        column = self._sort_expression(session, key)
+        nullable = Task.__table__.c[key].nullable
+        if nullable and value is None:
+            return and_(column.is_(None), id_after)
+        # Bind through literal() so boolean keys compare as values, not IS TRUE/FALSE
+        value = self._sort_expression(session, key, literal(value, type_=Task.__table__.c[key].type))
+        beyond = column < value if descending else column > value
+        predicate = or_(beyond, and_(column == value, id_after))
+        if nullable:
+            predicate = or_(predicate, column.is_(None))
+        return predicate
+
+    def _tagged_task_ids(self, user_id: str, tags: List[str], tag_mode: str):
+        """Subquery of task ids carrying any (or, with tag_mode="all", every) tag."""
+        wanted = set(tags)
+        query = select(TaskTag.task_id).where(TaskTag.user_id == user_id, TaskTag.tag.in_(sorted(wanted)))
+        if tag_mode == "all":
+            query = query.group_by(TaskTag.task_id).having(func.count() == len(wanted))
+        return query
+
+    def get_task_rows(
+        self,
+        session: Session,
+        user_id: str,
+        priority: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        search: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        order: str = "asc",
+        tag_mode: str = "any",
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> List[dict]:
+        """
+        Get tasks with filtering, searching, and sorting as column dicts (cached per user).
+
+        `fields` (from parse_fields) limits the SELECT to those columns.
+        """
+        key, order = self._sort_spec(sort_by, order)
+
+        def load():
+            query = self._filtered_query(session, user_id, priority, tags, search, tag_mode)
+            return self._rows(session, self._order_by(session, query, key, order), fields), None
+
+        cache_key = ("list", *self._list_key(priority, tags, search, key, order, tag_mode), fields)
+        return self._cached(session, user_id, cache_key, load)[0]
+
+    def get_task_rows_page(
+        self,
+        session: Session,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        priority: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        search: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        order: str = "asc",
+        tag_mode: str = "any",
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get one page of tasks as column dicts using keyset pagination.
+
+        Rows are ordered by (sort key, id) and the cursor records the last
+        row returned, so each page is a range scan that starts where the
+        previous one stopped instead of skipping over OFFSET rows.
+        Returns the page and the cursor for the next one (None on the last page).
+        `fields` (from parse_fields) limits the SELECT to those columns.
+        """
+        key, order = self._sort_spec(sort_by, order)
+        query = self._filtered_query(session, user_id, priority, tags, search, tag_mode)
+        if cursor:
+            value, last_id = decode_cursor(cursor, key, order)
+            query = query.where(self._after_cursor(session, key, order, value, last_id))
+        query = self._order_by(session, query, key, order)
+
+        # The cursor needs the sort key even when the client did not ask for it
+        selected = fields if fields is None or key in fields else fields + (key,)
+
+        def load():
+            # Fetch one extra row to learn whether another page exists
+            rows = self._rows(session, query.limit(limit + 1), selected)
+
+            page = rows[:limit]
+            next_cursor = None
+            if len(rows) > limit:
+                last = page[-1]
+                next_cursor = encode_cursor(key, order, last[key], last["id"])
+            if selected is not fields:
+                for row in page:
+                    del row[key]
+            return page, next_cursor
+
+        cache_key = ("page", *self._list_key(priority, tags, search, key, order, tag_mode), limit, cursor, fields)
+        return self._cached(session, user_id, cache_key, load)
+
+    def get_tasks(
+        self,
+        session: Session,
+        user_id: str,
+        priority: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        search: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        order: str = "asc",
+        tag_mode: str = "any"
+    ) -> List[Task]:
+        """
+        Get tasks with filtering, searching, and sorting as Task objects.
+
+        The tasks are attached to the session, so callers can refresh, update
+        or delete them. Not cached: read-only hot paths use get_task_rows.
+        """
+        key, order = self._sort_spec(sort_by, order)
+        query = self._filtered_query(session, user_id, priority, tags, search, tag_mode)
+        return list(session.exec(self._order_by(session, query, key, order)).all())
+
+    def get_task_page(
+        self,
+        session: Session,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        priority: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        search: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        order: str = "asc",
+        tag_mode: str = "any"
+    ) -> Tuple[List[Task], Optional[str]]:
+        """get_task_rows_page as session-attached Task objects (not cached)."""
+        key, order = self._sort_spec(sort_by, order)
+        query = self._filtered_query(session, user_id, priority, tags, search, tag_mode)
+        if cursor:
+            value, last_id = decode_cursor(cursor, key, order)
+            query = query.where(self._after_cursor(session, key, order, value, last_id))
+        tasks = list(session.exec(self._order_by(session, query, key, order).limit(limit + 1)).all())
+
+        page = tasks[:limit]
+        next_cursor = None
+        if len(tasks) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(key, order, getattr(last, key), last.id)
+        return page, next_cursor
+
+    def get_changes(
+        self, session: Session, user_id: str, since: int, fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[dict], List[int], int, bool]:
+        """
+        Tasks written and ids of tasks deleted after change sequence `since`,
+        as (rows, deleted ids, cursor, reset).
+
+        The cursor is the user's data version, which every task write moves
+        past the change_seq it stamps. An up-to-date client costs one primary
+        key lookup. A `since` ahead of the version (a restored database) is
+        answered as a full resync with reset=True.
+        """
+        version = session.get(UserDataVersion, user_id)
+        cursor = version.version if version else 0
+        reset = since > cursor
+        if reset:
+            since = 0
+        if since >= cursor:
+            return [], [], cursor, reset
+        rows = self._rows(
+            session,
+            select(Task).where(Task.user_id == user_id, Task.change_seq > since).order_by(Task.change_seq, Task.id),
+            fields,
+        )
+        deleted: List[int] = []
+        if since > 0:  # a client starting from scratch has nothing to delete
+            deleted = list(session.exec(
+                select(TaskTombstone.task_id)
+                .where(TaskTombstone.user_id == user_id, TaskTombstone.change_seq > since)
+                .order_by(TaskTombstone.change_seq)
+            ).all())
+        return rows, deleted, cursor, reset
 
     def update_task(self, session: Session, task_id: int, user_id: str, task_data: dict) -> Optional[Task]:
-        """Update a task, but only if it belongs to the user."""
+        """
+        Update a task, but only if it belongs to the user.
+
+        Ownership check, write and read-back are one UPDATE ... RETURNING
+        statement. The returned task is detached before the commit so the
+        commit does not expire it and force a refresh SELECT. SQLite's
+        RETURNING does not see the change stamps its AFTER triggers write,
+        so it takes the load / refresh path. A task the caller already holds
+        in the session is updated in place and stays attached.
+        """
+        if not task_data:
+            return self.get_task(session, task_id, user_id)
+        dialect = session.get_bind().dialect
+        if not dialect.update_returning or dialect.name == "sqlite":
+            return self._update_task_fetch(session, task_id, user_id, task_data)
+
+        held = session.identity_key(Task, task_id) in session.identity_map
+        db_task = session.scalars(
+            update(Task)
+            .where(Task.id == task_id, Task.user_id == user_id)
+            .values(**task_data)
+            .returning(Task)
+        ).first()
+        if db_task is None:
+            return None
+        if not held:
+            session.expunge(db_task)
+        session.commit()
+        self._invalidate(user_id)
+        return db_task
+
+    def _update_task_fetch(self, session: Session, task_id: int, user_id: str, task_data: dict) -> Optional[Task]:
+        """update_task for dialects without UPDATE ... RETURNING: load, modify, commit, refresh."""
         db_task = self.get_task(session, task_id, user_id)
         if db_task:
             for key, value in task_data.items():
                 setattr(db_task, key, value)
             session.add(db_task)
             session.commit()
+            self._invalidate(user_id)
             session.refresh(db_task)
         return db_task
 
     def delete_task(self, session: Session, task_id: int, user_id: str) -> bool:
-        """Delete a task, but only if it belongs to the user."""
-        db_task = self.get_task(session, task_id, user_id)
-        if db_task:
-            session.delete(db_task)
-            session.commit()
-            return True
-        return False
-
-    def search_tasks(self, session: Session, query: str, user_id: str) -> List[Task]:
-        """Search tasks by description or category containing the query."""
-        # Fetch all users tasks and filter in Python for robustness across DBs (Case-insensitive)
-        user_tasks = self.get_tasks(session, user_id)
-        query_lower = query.lower()
-        return [
-            t for t in user_tasks 
-            if query_lower in t.description.lower() or query_lower in t.category.lower()
-        ]
\ No newline at end of file
+        """Delete a task, but only if it belongs to the user (one DELETE ... RETURNING id)."""
+        if session.get_bind().dialect.delete_returning:
+            deleted_id = session.scalars(
+                delete(Task).where(Task.id == task_id, Task.user_id == user_id).returning(Task.id)
+            ).first()
+        else:
+            db_task = self.get_task(session, task_id, user_id)
+            deleted_id = db_task.id if db_task else None
+            if db_task:
+                session.delete(db_task)
+        if deleted_id is None:
+            return False
+        session.commit()
+        self._invalidate(user_id)
+        return True
+
+    def delete_completed_tasks(self, session: Session, user_id: str) -> List[int]:
+        """Delete all of the user's completed tasks in one statement; returns the deleted ids."""
+        statement = (
+            delete(Task)
+            .where(Task.user_id == user_id, Task.completed == True)
+            .execution_options(synchronize_session=False)
+        )
+        if session.get_bind().dialect.delete_returning:
+            deleted_ids = list(session.execute(statement.returning(Task.id)).scalars())
+        else:
+            # No DELETE ... RETURNING: collect the ids first inside the same transaction
+            deleted_ids = list(session.exec(
+                select(Task.id).where(Task.user_id == user_id, Task.completed == True)
+            ).all())
+            if deleted_ids:
+                session.execute(statement.where(Task.id.in_(deleted_ids)))
+        session.commit()
+        if deleted_ids:
+            self._invalidate(user_id)
+        return deleted_ids
+
+    def apply_batch(
+        self, session: Session, user_id: str, operations: List[TaskBatchOperation]
+    ) -> List[TaskBatchResult]:
+        """
+        Apply a batch of create/update/complete/delete operations in one transaction.
+
+        The effect is that of running the operations in request order. They
+        run as bulk statements grouped by kind (creates, updates, completes,
+        deletes), which only differs from request order when a task is named
+        twice; the batch is cut before each repeat and the runs are applied
+        one after another. Operations on tasks that do not exist, belong to
+        another user or were deleted earlier in the batch are reported as
+        "not_found" and skipped.
+        """
+        targets = {op.task_id for op in operations if op.op != "create"}
+        owned = set()
+        if targets:
+            owned = set(session.exec(
+                select(Task.id).where(Task.user_id == user_id, Task.id.in_(targets))
+            ).all())
+
+        results = [
+            TaskBatchResult(
+                index=i,
+                op=op.op,
+                status="ok" if op.op == "create" or op.task_id in owned else "not_found",
+                task_id=op.task_id
+            )
+            for i, op in enumerate(operations)
+        ]
+        applied = [(result, op) for result, op in zip(results, operations) if result.status == "ok"]
+
+        # Operations on different tasks do not interact (a create's id is not
+        # known to the rest of the batch), so within a run naming each task at
+        # most once, grouping by kind keeps the request's order
+        deleted = set()
+        run, named = [], set()
+        for result, op in applied:
+            if op.op != "create" and op.task_id in named:
+                deleted |= self._apply_batch_run(session, user_id, run, deleted)
+                run, named = [], set()
+            run.append((result, op))
+            if op.op != "create":
+                named.add(op.task_id)
+        deleted |= self._apply_batch_run(session, user_id, run, deleted)
+        session.commit()
+        applied = [(result, op) for result, op in applied if result.status == "ok"]
+        if applied:
+            self._invalidate(user_id)
+
+        # Report the final state of every surviving task in one SELECT
+        touched = {result.task_id for result, op in applied if op.op != "delete"} - deleted
+        if touched:
+            current = {t.id: t for t in session.exec(select(Task).where(Task.id.in_(touched))).all()}
+            for result, op in applied:
+                if op.op != "delete":
+                    result.task = current.get(result.task_id)
+        return results
+
+    def _apply_batch_run(
+        self, session: Session, user_id: str, run: List[Tuple[TaskBatchResult, TaskBatchOperation]], gone: set
+    ) -> set:
+        """
+        Apply one run of apply_batch (no task named twice) as bulk statements.
+        Operations on tasks in `gone` (deleted by an earlier run) are marked
+        "not_found". Returns the ids this run deleted.
+        """
+        for result, op in run:
+            if op.op != "create" and op.task_id in gone:
+                result.status = "not_found"
+        applied = [(result, op) for result, op in run if result.status == "ok"]
+        dialect = session.get_bind().dialect
+
+        # 1. Creates: one multi-row INSERT ... RETURNING id
+        creates = [(result, op) for result, op in applied if op.op == "create"]
+        if creates:
+            rows = [self._new_task_values(op.task, user_id) for _, op in creates]
+            if dialect.insert_executemany_returning_sort_by_parameter_order:
+                new_ids = list(session.scalars(
+                    insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+                ))
+            else:
+                new_tasks = [Task(**row) for row in rows]
+                session.add_all(new_tasks)
+                session.flush()
+                new_ids = [t.id for t in new_tasks]
+            for (result, _), new_id in zip(creates, new_ids):
+                result.task_id = new_id
+
+        # 2. Updates: bulk UPDATE by primary key (ownership was checked above)
+        updates = [
+            {"id": op.task_id, **op.changes.model_dump(exclude_unset=True)}
+            for _, op in applied if op.op == "update"
+        ]
+        updates = [values for values in updates if len(values) > 1]
+        if updates:
+            session.execute(update(Task), updates)
+
+        # 3. Completes: one UPDATE per target state
+        for completed in (True, False):
+            ids = [op.task_id for _, op in applied if op.op == "complete" and op.completed is completed]
+            if ids:
+                session.execute(
+                    update(Task)
+                    .where(Task.user_id == user_id, Task.id.in_(ids))
+                    .values(completed=completed)
+                    .execution_options(synchronize_session=False)
+                )
+
+        # 4. Deletes: one DELETE ... WHERE id IN (...)
+        deleted = {op.task_id for _, op in applied if op.op == "delete"}
+        if deleted:
+            session.execute(
+                delete(Task)
+                .where(Task.user_id == user_id, Task.id.in_(deleted))
+                .execution_options(synchronize_session=False)
+            )
+        return deleted
+
+    def search_tasks(self, session: Session, query: str, user_id: str, limit: int = 20) -> List[Task]:
+        """Search tasks by description or category, best matches first."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        condition, rank = self._search_match(session, terms)
+        statement = select(Task).where(Task.user_id == user_id)
+        if session.get_bind().dialect.name == "sqlite":
+            # Join the FTS table directly so bm25 ordering comes from the index
+            statement = statement.join(tasks_fts, tasks_fts.c.rowid == Task.id).where(self._fts5_match(terms))
+        else:
+            statement = statement.where(condition)
+        if rank is not None:
+            statement = statement.order_by(rank)
+        return list(session.exec(statement.order_by(Task.id).limit(limit)).all())
+
+    def count_tasks(self, session: Session, user_id: str) -> TaskStats:
+        """Count the user's tasks by completion and priority in one GROUP BY query."""
+        priority = func.lower(Task.priority)
+        query = (
+            select(Task.completed, priority, func.count())
+            .where(Task.user_id == user_id)
+            .group_by(Task.completed, priority)
+        )
+        stats = TaskStats(user_id=user_id)
+        for completed, level, count in session.exec(query).all():
+            stats.total += count
+            if completed:
+                stats.completed += count
+            if level in ("high", "medium", "low"):
+                setattr(stats, level, getattr(stats, level) + count)
+        return stats
+
+    def get_task_stats(self, session: Session, user_id: str) -> TaskStats:
+        """Read the trigger-maintained counters (a primary-key lookup)."""
+        return session.get(TaskStats, user_id) or TaskStats(user_id=user_id)
+
+
+# Every column but id, with the model's defaults for those TaskCreate lacks
+COPY_COLUMNS = [c.name for c in Task.__table__.c if c.name != "id"]
+COPY_DEFAULTS = {
+    c.name: c.default.arg if c.default is not None and c.default.is_scalar else None
+    for c in Task.__table__.c if c.name != "id"
+}
+COPY_TASKS = f"COPY tasks ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+
+
+def _error_message(error: DBAPIError) -> str:
+    """First line of the driver's message (drops SQLAlchemy's statement and parameters)."""
+    message = str(error.orig).strip()
+    return message.splitlines()[0] if message else type(error.orig).__name__
+
+
+class AsyncTaskRepository:
+    """
+    TaskRepository for an AsyncSession.
+
+    Every method runs the TaskRepository implementation through
+    AsyncSession.run_sync: SQLAlchemy executes it in a greenlet on the event
+    loop and each statement inside awaits the async driver, so the queries
+    and the cache handling exist once and no worker thread is held. The
+    exceptions are the streaming readers (a generator cannot yield out of
+    run_sync, so they use AsyncSession.stream) and COPY, which psycopg only
+    offers on the driver connection.
+    """
+
+    def __init__(self, cache: Optional[CacheBackend] = None):
+        self.sync = TaskRepository(cache)
+
+    async def create_task(self, session: AsyncSession, task: TaskCreate, user_id: str) -> Task:
+        return await session.run_sync(self.sync.create_task, task, user_id)
+
+    async def get_task(self, session: AsyncSession, task_id: int, user_id: str) -> Optional[Task]:
+        return await session.run_sync(self.sync.get_task, task_id, user_id)
+
+    async def get_task_row(
+        self, session: AsyncSession, task_id: int, user_id: str, fields: Optional[Tuple[str, ...]] = None
+    ) -> Optional[dict]:
+        return await session.run_sync(self.sync.get_task_row, task_id, user_id, fields)
+
+    async def bulk_create_tasks(self, session: AsyncSession, user_id: str, tasks: List[TaskCreate]) -> Dict[int, str]:
+        """
+        Insert many tasks in one transaction: COPY on Postgres (psycopg), one
+        executemany INSERT elsewhere.
+
+        If the database rejects the batch, the tasks are retried one per
+        transaction so that only the offending ones fail. Returns
+        {index in tasks: error} for those.
+        """
+        dialect = session.bind.dialect
+        try:
+            if dialect.name == "postgresql" and dialect.driver == "psycopg":
+                await self._copy_tasks(session, user_id, tasks)
+            else:
+                await session.run_sync(self.sync.bulk_create_tasks, user_id, tasks)
+            return {}
+        except DBAPIError as e:
+            await session.rollback()
+            if len(tasks) == 1:
+                return {0: _error_message(e)}
+
+        errors = {}
+        for index, task in enumerate(tasks):
+            try:
+                await session.run_sync(self.sync.bulk_create_tasks, user_id, [task])
+            except DBAPIError as e:
+                await session.rollback()
+                errors[index] = _error_message(e)
+        return errors
+
+    async def _copy_tasks(self, session: AsyncSession, user_id: str, tasks: List[TaskCreate]) -> None:
+        """COPY the tasks into the table through the session's psycopg connection and commit."""
+        import psycopg
+
+        connection = await session.connection()
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        try:
+            async with driver_connection.cursor() as cursor:
+                async with cursor.copy(COPY_TASKS) as copy:
+                    for task in tasks:
+                        values = {**COPY_DEFAULTS, **self.sync._new_task_values(task, user_id)}
+                        values["tags"] = json.dumps(values["tags"])
+                        await copy.write_row([values[name] for name in COPY_COLUMNS])
+        except psycopg.Error as e:
+            # Raw driver call: wrap like SQLAlchemy would so callers see one error type
+            raise DBAPIError.instance(COPY_TASKS, None, e, psycopg.Error) from e
+        await session.commit()
+        self.sync._invalidate(user_id)
+
+    async def get_tasks(self, session: AsyncSession, user_id: str, **filters) -> List[Task]:
+        return await session.run_sync(self.sync.get_tasks, user_id, **filters)
+
+    async def get_task_page(
+        self, session: AsyncSession, user_id: str, limit: int, **filters
+    ) -> Tuple[List[Task], Optional[str]]:
+        return await session.run_sync(self.sync.get_task_page, user_id, limit, **filters)
+
+    async def get_task_rows(self, session: AsyncSession, user_id: str, **filters) -> List[dict]:
+        return await session.run_sync(self.sync.get_task_rows, user_id, **filters)
+
+    async def get_task_rows_page(
+        self, session: AsyncSession, user_id: str, limit: int, **filters
+    ) -> Tuple[List[dict], Optional[str]]:
+        return await session.run_sync(self.sync.get_task_rows_page, user_id, limit, **filters)
+
+    async def get_changes(
+        self, session: AsyncSession, user_id: str, since: int, fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[dict], List[int], int, bool]:
+        return await session.run_sync(self.sync.get_changes, user_id, since, fields)
+
+    async def update_task(self, session: AsyncSession, task_id: int, user_id: str, task_data: dict) -> Optional[Task]:
+        return await session.run_sync(self.sync.update_task, task_id, user_id, task_data)
+
+    async def delete_task(self, session: AsyncSession, task_id: int, user_id: str) -> bool:
+        return await session.run_sync(self.sync.delete_task, task_id, user_id)
+
+    async def delete_completed_tasks(self, session: AsyncSession, user_id: str) -> List[int]:
+        return await session.run_sync(self.sync.delete_completed_tasks, user_id)
+
+    async def apply_batch(
+        self, session: AsyncSession, user_id: str, operations: List[TaskBatchOperation]
+    ) -> List[TaskBatchResult]:
+        return await session.run_sync(self.sync.apply_batch, user_id, operations)
+
+    async def search_tasks(self, session: AsyncSession, query: str, user_id: str, limit: int = 20) -> List[Task]:
+        return await session.run_sync(self.sync.search_tasks, query, user_id, limit)
+
+    async def count_tasks(self, session: AsyncSession, user_id: str) -> TaskStats:
+        return await session.run_sync(self.sync.count_tasks, user_id)
+
+    async def get_task_stats(self, session: AsyncSession, user_id: str) -> TaskStats:
+        return await session.run_sync(self.sync.get_task_stats, user_id)
+
+    async def stream_tasks(
+        self, session: AsyncSession, user_id: str, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+        """
+        Yield all of the user's tasks in id order as column mappings, batch_size
+        rows at a time, through a server-side cursor (no ORM objects are built).
+        """
+        result = await session.stream(
+            select(*Task.__table__.c)
+            .where(Task.user_id == user_id)
+            .order_by(Task.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.mappings().partitions():
+            yield rows
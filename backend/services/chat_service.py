@@ -1,56 +1,48 @@
 from typing import List, Optional
-from sqlmodel import Session
-from backend.models.chat_message import ChatMessage, ChatMessageCreate, ChatMessageRead
-from backend.repositories.chat_repository import ChatRepository
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.models.chat_message import ChatMessage, ChatMessageCreate
+from backend.repositories.chat_repository import AsyncChatRepository
 
 
 class ChatService:
     """Service for chat message business logic."""
     
-    def __init__(self, repository: ChatRepository):
+    def __init__(self, repository: AsyncChatRepository):
         self.repository = repository
     
-    def save_message(
+    async def save_message(
         self, 
-        session: Session, 
+        session: AsyncSession, 
         message: ChatMessageCreate, 
         user_id: str,
         conversation_id: Optional[int] = None
     ) -> ChatMessage:
         """Save a chat message."""
-        return self.repository.save_message(session, message, user_id, conversation_id)
+        return await self.repository.save_message(session, message, user_id, conversation_id)
     
-    def get_user_history(
+    async def get_user_history(
         self, 
-        session: Session, 
+        session: AsyncSession, 
         user_id: str, 
         limit: Optional[int] = 20,
         conversation_id: Optional[int] = None
-    ) -> List[ChatMessageRead]:
-        """Get chat history for a user, optionally filtered by conversation."""
+    ) -> List[dict]:
+        """
+        Get chat history for a user, optionally filtered by conversation.
+
+        Messages are returned as ChatMessageRead-shaped column dicts, ready
+        for json_response without building a model per row.
+        """
         # Use optimized get_recent_messages for small limits (faster query)
         if limit and limit <= 50:
-            messages = self.repository.get_recent_messages(session, user_id, limit, conversation_id)
-        else:
-            # For larger limits or no limit, use standard method
-            messages = self.repository.get_user_messages(session, user_id, limit)
-        
-        return [
-            ChatMessageRead(
-                id=msg.id,
-                role=msg.role,
-                content=msg.content,
-                source=msg.source,
-                timestamp=msg.timestamp,
-                conversation_id=msg.conversation_id
-            )
-            for msg in messages
-        ]
+            return await self.repository.get_recent_message_rows(session, user_id, limit, conversation_id)
+        # For larger limits or no limit, use standard method
+        return await self.repository.get_user_message_rows(session, user_id, limit)
     
-    def clear_history(self, session: Session, user_id: str) -> int:
+    async def clear_history(self, session: AsyncSession, user_id: str) -> int:
         """Clear all chat history for a user."""
-        return self.repository.clear_user_messages(session, user_id)
+        return await self.repository.clear_user_messages(session, user_id)
     
-    def delete_message(self, session: Session, message_id: int, user_id: str) -> bool:
+    async def delete_message(self, session: AsyncSession, message_id: int, user_id: str) -> bool:
         """Delete a specific message."""
-        return self.repository.delete_message(session, message_id, user_id)
+        return await self.repository.delete_message(session, message_id, user_id)
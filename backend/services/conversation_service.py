@@ -1,19 +1,20 @@
-from typing import List, Optional
-from sqlmodel import Session
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.core.config import settings
 from backend.models.chat_message import ChatMessage, ChatMessageCreate, ChatMessageRead
 from backend.models.conversation import Conversation, ConversationRead
-from backend.repositories.chat_repository import ChatRepository
+from backend.repositories.chat_repository import AsyncChatRepository
 
 
 class ConversationService:
     """Service for conversation business logic."""
     
-    def __init__(self, repository: ChatRepository):
+    def __init__(self, repository: AsyncChatRepository):
         self.repository = repository
     
-    def create_conversation(self, session: Session, user_id: str, title: str = "New Chat") -> ConversationRead:
+    async def create_conversation(self, session: AsyncSession, user_id: str, title: str = "New Chat") -> ConversationRead:
         """Create a new conversation."""
-        conversation = self.repository.create_conversation(session, user_id, title)
+        conversation = await self.repository.create_conversation(session, user_id, title)
         return ConversationRead(
             id=conversation.id,
             session_id=conversation.session_id,
@@ -22,9 +23,9 @@ class ConversationService:
             updated_at=conversation.updated_at
         )
     
-    def get_user_conversations(self, session: Session, user_id: str) -> List[ConversationRead]:
+    async def get_user_conversations(self, session: AsyncSession, user_id: str) -> List[ConversationRead]:
         """Get all conversations for a user."""
-        conversations = self.repository.get_user_conversations(session, user_id)
+        conversations = await self.repository.get_user_conversations(session, user_id)
         return [
             ConversationRead(
                 id=conv.id,
@@ -36,9 +37,9 @@ class ConversationService:
             for conv in conversations
         ]
     
-    def rename_conversation(self, session: Session, conversation_id: int, user_id: str, title: str) -> Optional[ConversationRead]:
+    async def rename_conversation(self, session: AsyncSession, conversation_id: int, user_id: str, title: str) -> Optional[ConversationRead]:
         """Rename a conversation."""
-        conversation = self.repository.update_conversation_title(session, conversation_id, user_id, title)
+        conversation = await self.repository.update_conversation_title(session, conversation_id, user_id, title)
         if conversation:
             return ConversationRead(
                 id=conversation.id,
@@ -49,9 +50,19 @@ class ConversationService:
             )
         return None
     
-    def delete_conversation(self, session: Session, conversation_id: int, user_id: str) -> bool:
+    async def delete_conversation(self, session: AsyncSession, conversation_id: int, user_id: str) -> bool:
         """Delete a conversation and its messages."""
-        return self.repository.delete_conversation(session, conversation_id, user_id)
+        return await self.repository.delete_conversation(session, conversation_id, user_id)
+    
+    async def export_conversation(
+        self, session: AsyncSession, conversation_id: int, user_id: str
+    ) -> Optional[AsyncIterator[Sequence[Mapping[str, Any]]]]:
+        """The conversation's messages as batches of column mappings, or None if it is not the user's."""
+        if not await self.repository.get_conversation(session, conversation_id, user_id):
+            return None
+        return self.repository.stream_conversation_messages(
+            session, conversation_id, user_id, settings.export_batch_size
+        )
     
     def auto_generate_title(self, first_message: str) -> str:
         """Generate a title from the first message (first 50 characters)."""
@@ -1,110 +1,251 @@
-from typing import List, Optional
-from sqlmodel import Session
-from backend.models.task import Task, TaskCreate, TaskUpdate
-from backend.repositories.task_repository import TaskRepository
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Tuple
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.core.bulk_import import parse_upload
+from backend.core.change_hub import task_changes
+from backend.core.config import settings
+from backend.core.task_events import task_events
+from backend.models.task import (
+    Task, TaskBatchOperation, TaskBatchResult, TaskCreate, TaskImportError, TaskImportResult, TaskUpdate
+)
+from backend.repositories.task_repository import AsyncTaskRepository
+
+# get_changes reads in flight for woken change streams, shared by the streams
+# of one user (see TaskService._shared_changes)
+_change_reads: Dict[tuple, asyncio.Future] = {}
 
 
 class TaskService:
-    def __init__(self, repository: TaskRepository):
+    def __init__(self, repository: AsyncTaskRepository):
         self.repository = repository
 
-    def create_task(self, session: Session, task: TaskCreate, user_id: str) -> Task:
+    async def create_task(self, session: AsyncSession, task: TaskCreate, user_id: str) -> Task:
         """Create a new task for the authenticated user."""
-        return self.repository.create_task(session, task, user_id)
+        return await self.repository.create_task(session, task, user_id)
 
-    def get_task(self, session: Session, task_id: int, user_id: str) -> Optional[Task]:
+    async def get_task(self, session: AsyncSession, task_id: int, user_id: str) -> Optional[Task]:
         """Get a task if it belongs to the user."""
-        return self.repository.get_task(session, task_id, user_id)
+        return await self.repository.get_task(session, task_id, user_id)
+
+    async def get_task_row(
+        self, session: AsyncSession, task_id: int, user_id: str, fields: Optional[Tuple[str, ...]] = None
+    ) -> Optional[dict]:
+        """get_task as a column dict with only `fields` selected (None: every column)."""
+        return await self.repository.get_task_row(session, task_id, user_id, fields)
 
-    def get_all_tasks(
+    async def get_all_tasks(
         self, 
-        session: Session, 
+        session: AsyncSession, 
         user_id: str,
         priority: Optional[str] = None,
         tags: Optional[List[str]] = None,
         search: Optional[str] = None,
         sort_by: Optional[str] = None,
-        order: str = "asc"
+        order: str = "asc",
+        tag_mode: str = "any"
     ) -> List[Task]:
         """Get all tasks for the authenticated user with optional filtering."""
-        return self.repository.get_tasks(
+        return await self.repository.get_tasks(
             session, 
             user_id, 
             priority=priority, 
             tags=tags, 
             search=search, 
             sort_by=sort_by, 
-            order=order
+            order=order,
+            tag_mode=tag_mode
         )
 
-    def update_task(self, session: Session, task_id: int, user_id: str, task_update: TaskUpdate) -> Optional[Task]:
+    async def get_task_page(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        priority: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        search: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        order: str = "asc",
+        tag_mode: str = "any"
+    ) -> Tuple[List[Task], Optional[str]]:
+        """Get one page of the user's tasks and the cursor for the next page."""
+        return await self.repository.get_task_page(
+            session,
+            user_id,
+            limit,
+            cursor=cursor,
+            priority=priority,
+            tags=tags,
+            search=search,
+            sort_by=sort_by,
+            order=order,
+            tag_mode=tag_mode
+        )
+
+    async def get_task_rows(self, session: AsyncSession, user_id: str, **filters) -> List[dict]:
+        """get_all_tasks as column dicts, for responses encoded without re-validation."""
+        return await self.repository.get_task_rows(session, user_id, **filters)
+
+    async def get_task_rows_page(
+        self, session: AsyncSession, user_id: str, limit: int, **filters
+    ) -> Tuple[List[dict], Optional[str]]:
+        """get_task_page as column dicts."""
+        return await self.repository.get_task_rows_page(session, user_id, limit, **filters)
+
+    async def get_changes(
+        self, session: AsyncSession, user_id: str, since: int, fields: Optional[Tuple[str, ...]] = None
+    ) -> dict:
+        """What changed in the user's tasks after cursor `since` (the TaskChanges shape)."""
+        rows, deleted, cursor, reset = await self.repository.get_changes(session, user_id, since, fields)
+        return {"changes": rows, "deleted": deleted, "cursor": cursor, "reset": reset}
+
+    def watch_changes(
+        self, session: AsyncSession, user_id: str, since: int, fields: Optional[Tuple[str, ...]] = None
+    ) -> AsyncIterator[Optional[dict]]:
+        """
+        get_changes as a stream: the delta after `since` first, then one delta
+        whenever the user's tasks change, and None after every
+        settings.task_stream_heartbeat_seconds without one.
+
+        Subscribes to the change hub right away (raising HubFull at its
+        limit), before the first read, so no write can fall between the two.
+        """
+        return self._watch_changes(session, task_changes.subscribe(user_id), since, fields)
+
+    async def _watch_changes(self, session, subscription, since, fields) -> AsyncIterator[Optional[dict]]:
+        user_id = subscription.user_id
+        try:
+            changes = await self.get_changes(session, user_id, since, fields)
+            await session.close()  # hold no pooled connection while waiting
+            yield changes  # always sent: it tells the client the cursor
+            since = changes["cursor"]
+            while True:
+                if not await subscription.wait(settings.task_stream_heartbeat_seconds):
+                    yield None
+                    continue
+                changes = await self._shared_changes(session, user_id, since, fields)
+                since = changes["cursor"]
+                if changes["changes"] or changes["deleted"]:
+                    yield changes
+        finally:
+            subscription.close()
+
+    async def _shared_changes(self, session, user_id, since, fields) -> dict:
+        """
+        get_changes for a woken stream. A user's streams at the same cursor
+        share one read, provided it started after the publish that woke them
+        (the hub generation is part of the key), so a change costs one query
+        per user rather than one per open connection. The read has its own
+        session: it must not depend on whichever stream started it.
+        """
+        key = (user_id, since, fields, task_changes.generation(user_id))
+        read = _change_reads.get(key)
+        if read is None:
+            read = asyncio.ensure_future(self._read_changes(session.bind, user_id, since, fields))
+            _change_reads[key] = read
+            read.add_done_callback(lambda _: _change_reads.pop(key, None))
+        return await asyncio.shield(read)
+
+    async def _read_changes(self, bind, user_id, since, fields) -> dict:
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            return await self.get_changes(session, user_id, since, fields)
+
+    async def update_task(self, session: AsyncSession, task_id: int, user_id: str, task_update: TaskUpdate) -> Optional[Task]:
         """Update a task if it belongs to the user."""
         task_data = task_update.model_dump(exclude_unset=True)
-        return self.repository.update_task(session, task_id, user_id, task_data)
+        return await self.repository.update_task(session, task_id, user_id, task_data)
 
-    def delete_task(self, session: Session, task_id: int, user_id: str) -> bool:
+    async def delete_task(self, session: AsyncSession, task_id: int, user_id: str) -> bool:
         """Delete a task if it belongs to the user."""
-        return self.repository.delete_task(session, task_id, user_id)
+        return await self.repository.delete_task(session, task_id, user_id)
 
-    def complete_task(self, session: Session, task_id: int, user_id: str, completed: bool) -> Optional[Task]:
+    async def complete_task(self, session: AsyncSession, task_id: int, user_id: str, completed: bool) -> Optional[Task]:
         """Toggle task completion if it belongs to the user."""
-        updated_task = self.repository.update_task(session, task_id, user_id, {"completed": completed})
+        updated_task = await self.repository.update_task(session, task_id, user_id, {"completed": completed})
         
         # Publish Event if completed
         if updated_task and completed:
-            try:
-                import requests
-                import time
-                payload = {
-                    "event_type": "completed",
-                    "task_id": updated_task.id,
-                    "user_id": updated_task.user_id,
-                    "timestamp": str(time.time()),
-                    "data": updated_task.model_dump()
-                }
-                requests.post(
-                    "http://localhost:3500/v1.0/publish/todo-pubsub/task-events",
-                    json=payload,
-                    timeout=1
-                )
-            except Exception as e:
-                print(f"⚠️ Failed to publish task event: {e}")
+            await task_events.completed([updated_task])
                 
         return updated_task
 
-    def search_tasks(self, session: Session, query: str, user_id: str) -> List[Task]:
-        """Search for tasks."""
-        return self.repository.search_tasks(session, query, user_id)
+    async def apply_batch(
+        self, session: AsyncSession, user_id: str, operations: List[TaskBatchOperation]
+    ) -> List[TaskBatchResult]:
+        """Apply a batch of task operations in one transaction, then publish its completions together."""
+        results = await self.repository.apply_batch(session, user_id, operations)
+        await task_events.completed([
+            result.task for result, op in zip(results, operations)
+            if op.op == "complete" and op.completed and result.task
+        ])
+        return results
 
-    def get_task_analytics(self, session: Session, user_id: str) -> dict:
+    async def search_tasks(self, session: AsyncSession, query: str, user_id: str, limit: int = 20) -> List[Task]:
+        """Search for tasks, best matches first."""
+        return await self.repository.search_tasks(session, query, user_id, limit)
+
+    async def get_task_analytics(self, session: AsyncSession, user_id: str) -> dict:
         """Get counts and statistics for tasks."""
-        tasks = self.get_all_tasks(session, user_id)
-        total = len(tasks)
-        completed = sum(1 for t in tasks if t.completed)
-        pending = total - completed
-        
-        # Priority Stats (Case-insensitive safety)
-        high = sum(1 for t in tasks if str(t.priority).lower() == 'high')
-        medium = sum(1 for t in tasks if str(t.priority).lower() == 'medium')
-        low = sum(1 for t in tasks if str(t.priority).lower() == 'low')
-        
+        if settings.task_stats_counters:
+            stats = await self.repository.get_task_stats(session, user_id)
+        else:
+            stats = await self.repository.count_tasks(session, user_id)
+
         return {
-            "total": total,
-            "completed": completed,
-            "pending": pending,
+            "total": stats.total,
+            "completed": stats.completed,
+            "pending": stats.total - stats.completed,
             "priority_breakdown": {
-                "high": high,
-                "medium": medium,
-                "low": low
+                "high": stats.high,
+                "medium": stats.medium,
+                "low": stats.low
             }
         }
 
-    def clear_completed_tasks(self, session: Session, user_id: str) -> int:
-        """Delete all completed tasks."""
-        tasks = self.get_all_tasks(session, user_id)
-        count = 0
-        for t in tasks:
-            if t.completed:
-                if self.repository.delete_task(session, t.id, user_id):
-                    count += 1
-        return count
\ No newline at end of file
+    async def clear_completed_tasks(self, session: AsyncSession, user_id: str) -> List[int]:
+        """Delete all completed tasks; returns the ids that were deleted."""
+        return await self.repository.delete_completed_tasks(session, user_id)
+
+    def export_tasks(self, session: AsyncSession, user_id: str) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+        """All of the user's tasks as batches of column mappings, for streaming export."""
+        return self.repository.stream_tasks(session, user_id, settings.export_batch_size)
+
+    async def import_tasks(
+        self, session: AsyncSession, user_id: str, chunks: AsyncIterator[bytes], import_format: str
+    ) -> TaskImportResult:
+        """
+        Create tasks from an NDJSON or CSV upload, batch by batch as it is read.
+
+        Each record is validated as a TaskCreate; records that fail to parse,
+        validate or insert are counted and reported by line, the rest are written.
+        """
+        result = TaskImportResult()
+
+        def fail(line: int, error: str) -> None:
+            result.failed += 1
+            if len(result.errors) < settings.task_import_max_errors:
+                result.errors.append(TaskImportError(line=line, error=error))
+
+        async for records in parse_upload(chunks, import_format, settings.task_import_batch_size):
+            lines, tasks = [], []
+            for line, fields, error in records:
+                if error is None:
+                    try:
+                        tasks.append(TaskCreate.model_validate(fields))
+                        lines.append(line)
+                        continue
+                    except ValidationError as e:
+                        error = "; ".join(
+                            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                        )
+                fail(line, error)
+            if not tasks:
+                continue
+            rejected = await self.repository.bulk_create_tasks(session, user_id, tasks)
+            result.imported += len(tasks) - len(rejected)
+            for index, error in sorted(rejected.items()):
+                fail(lines[index], error)
+        result.errors.sort(key=lambda e: e.line)
+        return result
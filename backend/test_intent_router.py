@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.intent_router import parse
+
+# Messages that must go to the model: vague or destructive-without-a-target
+# commands would otherwise act on whatever task best matches the words
+FALLTHROUGH = [
+    "delete it",
+    "delete everything",
+    "delete anything",
+    "delete all my tasks",
+    "delete every task",
+    "delete them",
+    "/delete everything",
+    "/done all",
+    "remove everything from my list",
+    "complete everything",
+    "complete all",
+    "finish anything on my list",
+    "mark everything as done",
+    "mark them as done",
+    "What should I focus on first today?",
+    "add task",
+    "/unknown 3",
+]
+
+PARSED = [
+    ("delete groceries", ("delete_task", {"task_name": "groceries"})),
+    ("remove milk from the list", ("delete_task", {"task_name": "milk"})),
+    ("remove eggs off my list", ("delete_task", {"task_name": "eggs"})),
+    ("delete allergy meds", ("delete_task", {"task_name": "allergy meds"})),
+    ("delete task 7", ("delete_task", {"task_id": 7})),
+    ("check off milk from my list", ("complete_task", {"task_name": "milk"})),
+    ("complete 12", ("complete_task", {"task_id": 12})),
+    ("mark 3 as done", ("complete_task", {"task_id": 3})),
+    ("add task buy milk", ("add_task", {"title": "Buy milk"})),
+    ("/add book flights !high #Travel", ("add_task", {"title": "Book flights", "priority": "high", "category": "Travel"})),
+    ("list pending", ("list_tasks", {"status": "pending"})),
+    ("clear completed", ("clear_completed", {})),
+]
+
+
+def test_vague_commands_go_to_the_model():
+    for text in FALLTHROUGH:
+        assert parse(text) is None, f"{text!r} was parsed as {parse(text)}"
+
+
+def test_commands_are_parsed():
+    for text, expected in PARSED:
+        assert parse(text) == expected, f"{text!r} was parsed as {parse(text)}, expected {expected}"
+
+
+if __name__ == "__main__":
+    test_vague_commands_go_to_the_model()
+    test_commands_are_parsed()
+    print(f"✅ {len(FALLTHROUGH)} messages left to the model, {len(PARSED)} parsed")
@@ -18,47 +18,48 @@ BASE_URL = "http://localhost:8000/api/v1"
 # However, we want to verify the HTTP query params too.
 # Let's try direct service calls first to ensure logic is sound.
 
-from backend.database.session import get_session
+import asyncio
+from backend.database.session import get_async_session
 from backend.services.task_service import TaskService
-from backend.repositories.task_repository import TaskRepository
+from backend.repositories.task_repository import AsyncTaskRepository
 from backend.models.task import TaskCreate
 
-def verify_logic():
+async def verify_logic():
     print("🧪 Verifying Task Service Logic...")
-    session = next(get_session())
-    repo = TaskRepository()
+    session = await anext(get_async_session())
+    repo = AsyncTaskRepository()
     service = TaskService(repo)
     
     # Mock User
     user_id = "test_user_advanced_1"
     
     # Clean up
-    tasks = service.get_all_tasks(session, user_id)
+    tasks = await service.get_all_tasks(session, user_id)
     for t in tasks:
-        service.delete_task(session, t.id, user_id)
+        await service.delete_task(session, t.id, user_id)
         
     print("1. Creating Tasks...")
-    t1 = service.create_task(session, TaskCreate(title="High Priority Work", description="High Priority Work", priority="High", category="Work", tags=["urgent", "office"]), user_id)
-    t2 = service.create_task(session, TaskCreate(title="Low Priority Home", description="Low Priority Home", priority="Low", category="Home", tags=["chill"]), user_id)
-    t3 = service.create_task(session, TaskCreate(title="Medium Priority Work", description="Medium Priority Work", priority="Medium", category="Work", tags=["office"]), user_id)
+    t1 = await service.create_task(session, TaskCreate(title="High Priority Work", description="High Priority Work", priority="High", category="Work", tags=["urgent", "office"]), user_id)
+    t2 = await service.create_task(session, TaskCreate(title="Low Priority Home", description="Low Priority Home", priority="Low", category="Home", tags=["chill"]), user_id)
+    t3 = await service.create_task(session, TaskCreate(title="Medium Priority Work", description="Medium Priority Work", priority="Medium", category="Work", tags=["office"]), user_id)
     
     print("2. Testing Priority Filter (High)...")
-    high_tasks = service.get_all_tasks(session, user_id, priority="High")
+    high_tasks = await service.get_all_tasks(session, user_id, priority="High")
     assert len(high_tasks) == 1
     assert high_tasks[0].priority == "High"
     print("✅ Priority Filter Passed")
 
     print("3. Testing Tag Filter (office)...")
-    tasks_all = service.get_all_tasks(session, user_id)
+    tasks_all = await service.get_all_tasks(session, user_id)
     print(f"DEBUG: All Tasks: {[(t.description, t.tags, type(t.tags)) for t in tasks_all]}")
     
-    office_tasks = service.get_all_tasks(session, user_id, tags=["office"])
+    office_tasks = await service.get_all_tasks(session, user_id, tags=["office"])
     print(f"DEBUG: Office Tasks: {[t.description for t in office_tasks]}")
     assert len(office_tasks) == 2 # t1 and t3
     print("✅ Tag Filter Passed")
 
     print("4. Testing Search (Home)...")
-    home_tasks = service.get_all_tasks(session, user_id, search="home")
+    home_tasks = await service.get_all_tasks(session, user_id, search="home")
     assert len(home_tasks) == 1
     assert home_tasks[0].category == "Home"
     print("✅ Search Passed")
@@ -70,7 +71,7 @@ def verify_logic():
     # 'Medium' vs 'Low'. L comes first.
     # Alphabetical: High, Low, Medium.
     # Let's test Sort by Created At to be safe.
-    sorted_tasks = service.get_all_tasks(session, user_id, sort_by="category", order="asc") 
+    sorted_tasks = await service.get_all_tasks(session, user_id, sort_by="category", order="asc") 
     # Home, Work, Work.
     assert sorted_tasks[0].category == "Home"
     print("✅ Sort Passed")
@@ -79,7 +80,7 @@ def verify_logic():
 
 if __name__ == "__main__":
     try:
-        verify_logic()
+        asyncio.run(verify_logic())
     except Exception as e:
         print(f"❌ Verification Failed: {e}")
         import traceback
@@ -1,4 +1,4 @@
-import { Task, TaskCreate, TaskUpdate } from '../types/task'
+import { Task, TaskBatchOperation, TaskBatchResult, TaskChanges, TaskCreate, TaskUpdate } from '../types/task'
 
 // API calls go directly to FastAPI backend with JWT auth
 const API_BASE_URL = process.env.NODE_ENV === 'production' ? '' : (process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000')
@@ -27,7 +27,8 @@ class TaskService {
   async getAllTasks(): Promise<Task[]> {
     const response = await fetch(`${API_BASE_URL}/api/tasks`, {
       headers: this.getHeaders(),
-      cache: 'no-store',
+      // revalidate with If-None-Match; the API answers 304 while nothing changed
+      cache: 'no-cache',
     })
     if (!response.ok) {
       if (response.status === 401) {
@@ -59,16 +60,14 @@ class TaskService {
       tags.forEach(tag => params.append('tags', tag))
     }
 
-    // Add timestamp to prevent caching artifacts
-    params.append('_t', Date.now().toString())
-
     if (params.toString()) {
       url += `?${params.toString()}`
     }
 
     const response = await fetch(url, {
       headers: this.getHeaders(),
-      cache: 'no-store',
+      // revalidate with If-None-Match; the API answers 304 while nothing changed
+      cache: 'no-cache',
     })
     if (!response.ok) {
       throw new Error('Failed to fetch tasks')
@@ -76,6 +75,49 @@ class TaskService {
     return response.json()
   }
 
+  // Delta sync: pass the previous response's cursor; apply `deleted` before `changes`
+  async getTaskChanges(since: number): Promise<TaskChanges> {
+    const response = await fetch(`${API_BASE_URL}/api/tasks/changes?since=${since}`, {
+      headers: this.getHeaders(),
+      cache: 'no-store',
+    })
+    if (!response.ok) {
+      throw new Error('Failed to fetch task changes')
+    }
+    return response.json()
+  }
+
+  // Push version of getTaskChanges over server-sent events (fetch, since
+  // EventSource cannot send the Authorization header). Resolves when the
+  // stream ends; reconnect with the last cursor passed to onChanges.
+  async streamTaskChanges(
+    since: number,
+    onChanges: (changes: TaskChanges) => void,
+    signal?: AbortSignal
+  ): Promise<void> {
+    const response = await fetch(`${API_BASE_URL}/api/tasks/stream?since=${since}`, {
+      headers: { ...this.getHeaders(), Accept: 'text/event-stream' },
+      cache: 'no-store',
+      signal,
+    })
+    if (!response.ok || !response.body) {
+      throw new Error('Failed to open task change stream')
+    }
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    for (;;) {
+      const { value, done } = await reader.read()
+      if (done) return
+      buffer += value
+      let end
+      while ((end = buffer.indexOf('\n\n')) >= 0) {
+        const data = buffer.slice(0, end).split('\n').find(line => line.startsWith('data: '))
+        buffer = buffer.slice(end + 2)
+        if (data) onChanges(JSON.parse(data.slice(6)))
+      }
+    }
+  }
+
   // OPTIMISTIC: Create task with immediate UI update
   async createTask(taskData: TaskCreate): Promise<Task> {
     const response = await fetch(`${API_BASE_URL}/api/tasks`, {
@@ -128,6 +170,19 @@ class TaskService {
       throw new Error('Failed to delete task')
     }
   }
+
+  // Apply many create/update/complete/delete operations in one request and one transaction
+  async batch(operations: TaskBatchOperation[]): Promise<TaskBatchResult[]> {
+    const response = await fetch(`${API_BASE_URL}/api/tasks/batch`, {
+      method: 'POST',
+      headers: this.getHeaders(),
+      body: JSON.stringify({ operations }),
+    })
+    if (!response.ok) {
+      throw new Error('Failed to apply task changes')
+    }
+    return response.json()
+  }
 }
 
 export const taskService = new TaskService()
\ No newline at end of file
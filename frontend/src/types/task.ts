@@ -7,6 +7,7 @@ export interface Task {
   tags?: string[];
   created_at: string;
   updated_at: string;
+  change_seq?: number;
 }
 
 export interface TaskCreate {
@@ -22,4 +23,25 @@ export interface TaskUpdate {
   category?: string;
   priority?: string;
   tags?: string[];
-}
\ No newline at end of file
+}
+
+export type TaskBatchOperation =
+  | { op: 'create'; task: TaskCreate }
+  | { op: 'update'; task_id: string; changes: TaskUpdate }
+  | { op: 'complete'; task_id: string; completed?: boolean }
+  | { op: 'delete'; task_id: string };
+
+export interface TaskBatchResult {
+  index: number;
+  op: TaskBatchOperation['op'];
+  status: 'ok' | 'not_found';
+  task_id: string | null;
+  task: Task | null;
+}
+
+export interface TaskChanges {
+  changes: Task[];
+  deleted: string[];
+  cursor: number;
+  reset: boolean;
+}